@@ -0,0 +1,132 @@
+# allocs.py
+# Pixel Adventures — Debug allocation counter for hot loops.
+#
+# Wrap a per-frame region in `with allocs.region("odelia.update"):` and,
+# when enabled, every pass through it records:
+#   gc      tracked objects (lists, dicts, instances ...) left alive; these
+#           are what fill GC generation 0 and trigger collections
+#   blocks  memory blocks left allocated (sys.getallocatedblocks)
+#   churn   bytes allocated and freed again inside the pass: the traced
+#           high-water mark above whatever the pass started and ended with
+#           (tracemalloc). A frame that builds a new tuple per NPC and drops
+#           last frame's leaves gc and blocks at 0 but churns their bytes;
+#           boxed ints above 256 and floats add 28-32 bytes each, a Vector2
+#           or Rect ~50
+# CPython counts no allocation events, so churn is the only measure of
+# short-lived allocations; it is a lower bound, as a pass that allocates
+# and frees the same block twice peaks once. The collector is paused
+# inside a region, so a collection can neither hide survivors nor add its
+# own frees to a pass. A steady-state frame should keep all three at 0 but
+# for a handful of scalars.
+#
+# Off by default; PIXEL_ALLOCS=1 enables it and prints a table at exit.
+# While disabled region() returns a shared no-op context.
+
+import atexit
+import contextlib
+import gc
+import os
+import sys
+import tracemalloc
+
+_enabled = False
+_regions = {}   # name -> Region
+_NOOP = contextlib.nullcontext()
+_bias = (0, 0, 0)   # what an empty pass reads as (gc, blocks, churn)
+
+
+class Region:
+    __slots__ = ("name", "passes", "dirty", "gc", "blocks", "churn", "max_churn",
+                 "_gc0", "_blocks0", "_mem0", "_gc_on")
+
+    def __init__(self, name):
+        self.name = name
+        self.passes = 0
+        self.dirty = 0      # passes that allocated anything
+        self.gc = 0
+        self.blocks = 0
+        self.churn = 0      # summed over passes
+        self.max_churn = 0
+
+    def __enter__(self):
+        self._gc_on = gc.isenabled()
+        gc.disable()
+        self._gc0 = gc.get_count()[0]
+        self._blocks0 = sys.getallocatedblocks()
+        self._mem0 = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()    # last, so the reads above don't count
+        return self
+
+    def __exit__(self, *exc):
+        mem, peak = tracemalloc.get_traced_memory()
+        churn = peak - max(mem, self._mem0)
+        del mem, peak
+        blocks = sys.getallocatedblocks() - self._blocks0
+        objs = gc.get_count()[0] - self._gc0
+        if self._gc_on:
+            gc.enable()
+        objs, blocks, churn = objs - _bias[0], blocks - _bias[1], churn - _bias[2]
+        self.passes += 1
+        self.gc += objs
+        self.blocks += blocks
+        self.churn += churn
+        self.max_churn = max(self.max_churn, churn)
+        if objs > 0 or blocks > 0 or churn > 0:
+            self.dirty += 1
+        return False
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled, _bias
+    _enabled = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(1)
+    # the counter reads themselves create and drop a few objects
+    _bias = (0, 0, 0)
+    empty = Region("empty")
+    for _ in range(8):   # warm up, then keep the last pass
+        gc0, blocks0, churn0 = empty.gc, empty.blocks, empty.churn
+        with empty:
+            pass
+    _bias = (empty.gc - gc0, empty.blocks - blocks0, empty.churn - churn0)
+
+
+def region(name):
+    """Context manager measuring one pass through `name`."""
+    if not _enabled:
+        return _NOOP
+    r = _regions.get(name)
+    if r is None:
+        r = _regions[name] = Region(name)
+    return r
+
+
+def stats(name):
+    return _regions.get(name)
+
+
+def reset():
+    _regions.clear()
+
+
+def report():
+    lines = ["region                  passes  dirty %   gc/pass  blocks/pass  churn B avg   max"]
+    for r in _regions.values():
+        n = r.passes or 1
+        lines.append("%-22s %8d %8.1f %9.2f %12.2f %12.0f %5d" % (
+            r.name, r.passes, 100 * r.dirty / n, r.gc / n, r.blocks / n, r.churn / n, r.max_churn))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _regions:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_ALLOCS"):
+    enable()
+    atexit.register(_report_at_exit)
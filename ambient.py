@@ -0,0 +1,94 @@
+# ambient.py
+# Pixel Adventures — Ambient particle field (stars, drifting dots) for menus.
+# Points live in flat contiguous arrays: one vectorized step moves every point
+# and one indexed write plots them all, so menus can afford 10k+ points.
+
+import random
+from array import array
+
+import pygame
+
+try:  # surfarray needs NumPy; without it we fall back to a PixelArray loop
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the install
+    np = None
+
+
+class AmbientField:
+    """Parallax field of single-pixel points falling down the canvas.
+
+    `layers` is a sequence of ``(speed, density, color)`` tuples; each layer
+    receives ``max(1, int(count * density))`` points moving at `speed`
+    virtual pixels per second. Points leaving the bottom edge re-enter at
+    ``respawn_y`` with a fresh random column.
+    """
+
+    def __init__(self, w, h, layers, count=60, respawn_y=-1, wrap_inclusive=True):
+        self.w, self.h = w, h
+        self.respawn_y = respawn_y
+        # title stars wrap at y >= h, class-select dots only once past it
+        self.wrap_inclusive = wrap_inclusive
+        self.colors = [tuple(c) for _, _, c in layers]
+        sizes = [max(1, int(count * density)) for _, density, _ in layers]
+        self.count = sum(sizes)
+
+        xs, ys, spd, col = [], [], [], []
+        for li, ((speed, _, _), n) in enumerate(zip(layers, sizes)):
+            for _ in range(n):
+                xs.append(random.randrange(0, w))
+                ys.append(random.randrange(0, h))
+                spd.append(speed)
+                col.append(li)
+
+        if np is not None:
+            # seeded from `random` so seeding the game RNG fixes the field too
+            self._rng = np.random.default_rng(random.getrandbits(32))
+            self.x = np.array(xs, dtype=np.float32)
+            self.y = np.array(ys, dtype=np.float32)
+            self.spd = np.array(spd, dtype=np.float32)
+            self.col = np.array(col, dtype=np.intp)
+        else:
+            self._rng = None
+            self.x = array("f", xs)
+            self.y = array("f", ys)
+            self.spd = array("f", spd)
+            self.col = array("B", col)
+
+    def update(self, dt):
+        if np is not None:
+            self.y += self.spd * np.float32(dt)
+            wrap = self.y >= self.h if self.wrap_inclusive else self.y > self.h
+            n = int(np.count_nonzero(wrap))
+            if n:
+                self.y[wrap] = self.respawn_y
+                self.x[wrap] = self._rng.integers(0, self.w, n)
+            return
+        x, y, spd, h = self.x, self.y, self.spd, self.h
+        for i in range(self.count):
+            yi = y[i] + spd[i] * dt
+            if yi >= h if self.wrap_inclusive else yi > h:
+                yi = self.respawn_y
+                x[i] = random.randrange(0, self.w)
+            y[i] = yi
+
+    def draw(self, surf):
+        mapped = [surf.map_rgb(c) for c in self.colors]
+        if np is not None and surf.get_bytesize() in (1, 2, 4):
+            # int() truncation toward zero, like the old set_at((int(x), int(y)))
+            ix = self.x.astype(np.intp)
+            iy = self.y.astype(np.intp)
+            w, h = surf.get_size()
+            vis = (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+            pixels = pygame.surfarray.pixels2d(surf)
+            pixels[ix[vis], iy[vis]] = np.asarray(mapped, dtype=pixels.dtype)[self.col[vis]]
+            del pixels  # release the surface lock
+            return
+        w, h = surf.get_size()
+        pa = pygame.PixelArray(surf)
+        try:
+            for xi, yi, ci in zip(self.x, self.y, self.col):
+                xi, yi = int(xi), int(yi)
+                if 0 <= xi < w and 0 <= yi < h:
+                    pa[xi, yi] = mapped[ci]
+        finally:
+            pa.close()
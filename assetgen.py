@@ -0,0 +1,171 @@
+# assetgen.py
+# Pixel Adventures — Procedural asset generation, optionally on a process pool.
+#
+# Rasterizing functions (building art, class icons, NPC sprites, interiors)
+# are wrapped with @cached: results are memoized by their bound arguments.
+# prewarm() fans the whole catalogue out to a ProcessPoolExecutor; workers
+# return raw pixel bytes and the main process rebuilds the surfaces with
+# image.frombuffer and drops them into the same memo table, so the scene code
+# simply finds everything already built.
+#
+# PIXEL_ASSET_WORKERS sets the pool size (0 or 1 rasterizes serially).
+# Catalogues smaller than MIN_POOL_JOBS are cheaper to rasterize in-process
+# than to ship to freshly started workers, so they stay serial by default.
+
+import functools
+import importlib
+import inspect
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+import memstats
+
+MIN_POOL_JOBS = 64
+
+_surfaces = {}   # (module, qualname, bound args) -> Surface
+
+
+def _key(fn, sig, args, kwargs):
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return (fn.__module__, fn.__qualname__, tuple(bound.arguments.values()))
+
+
+def cached(fn):
+    """Memoize a surface-producing function by its (hashable) arguments.
+
+    The returned surfaces are shared, so callers must treat them as
+    read-only. The undecorated function stays available as ``.raw``.
+    """
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = _key(fn, sig, args, kwargs)
+        try:
+            return _surfaces[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable arguments: nothing to share
+            return fn(*args, **kwargs)
+        surf = _surfaces[key] = fn(*args, **kwargs)
+        return surf
+
+    wrapper.raw = fn
+    wrapper.signature = sig
+    return wrapper
+
+
+def job(fn, *args, **kwargs):
+    """Describe one catalogue entry as a picklable job."""
+    return (fn.__module__, fn.__qualname__, args, kwargs)
+
+
+def catalogue():
+    """Every procedurally generated surface the game needs at startup."""
+    import buildings
+    import class_select
+    import npcs
+    import odelia
+
+    jobs = [job(buildings.art, kind) for kind in buildings.KINDS]
+    for c in class_select.CLASSES:
+        jobs.append(job(class_select._class_layout, c["id"]))
+        for frame in (0, 1):
+            jobs.append(job(class_select._class_layout, c["id"], with_panel=False, frame=frame))
+        jobs.append(job(class_select._class_icon, c["id"], c["color"]))
+        for frame in (0, 1):
+            jobs.append(job(class_select._class_icon, c["id"], c["color"], with_panel=False, frame=frame))
+    for frame in (0, 1):
+        jobs.append(job(npcs._layout, frame))
+        for kind, (skin, hair, outfit) in npcs.KINDS.items():
+            jobs.append(job(npcs._simple_sprite, skin, hair, outfit, frame))
+    for color in odelia.FLOOR_COLORS:
+        jobs.append(job(odelia._interior_surface, odelia.INTERIOR_SIZE, color))
+    for terrain in odelia.TERRAIN_COLORS:
+        jobs.append(job(odelia._tile_surface, terrain))
+    jobs.append(job(odelia._tree_surface))
+    jobs.append(job(odelia._bush_surface))
+    return jobs
+
+
+def _resolve(module, qualname):
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _render(j):
+    """Worker side: rasterize one job and return its raw pixels."""
+    module, qualname, args, kwargs = j
+    surf = _resolve(module, qualname).raw(*args, **kwargs)
+    if surf.get_bitsize() == 8:
+        # palettized sprites travel as indices plus their palette and key index
+        key = surf.get_colorkey()
+        palette = ([tuple(c) for c in surf.get_palette()], None if key is None else surf.map_rgb(key))
+        return surf.get_size(), "P", pygame.image.tobytes(surf, "P"), palette
+    alpha = bool(surf.get_flags() & pygame.SRCALPHA)
+    fmt = "RGBA" if alpha else "RGB"
+    return surf.get_size(), fmt, pygame.image.tobytes(surf, fmt), None
+
+
+def _adopt(j, result):
+    """Main side: turn worker bytes back into a surface in the memo table."""
+    module, qualname, args, kwargs = j
+    fn = _resolve(module, qualname)
+    size, fmt, data, palette = result
+    if palette is not None:
+        # stays 8-bit: converting to the display format would undo the saving
+        surf = pygame.image.frombytes(data, size, fmt)
+        colors, key = palette
+        surf.set_palette(colors)
+        if key is not None:
+            surf.set_colorkey(key)
+    else:
+        surf = pygame.image.frombuffer(data, size, fmt)
+        if pygame.display.get_surface() is not None:
+            # match the display format so later blits are plain copies
+            surf = surf.convert_alpha() if fmt == "RGBA" else surf.convert()
+    memstats.track(surf, owner=module, tag=qualname)
+    _surfaces[_key(fn, fn.signature, args, kwargs)] = surf
+
+
+def _worker_init():
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+def prewarm(jobs=None, workers=None):
+    """Generate `jobs` (default: the full catalogue) and return their count."""
+    if jobs is None:
+        jobs = catalogue()
+    jobs = [j for j in jobs if not _is_cached(j)]
+    if workers is None:
+        if "PIXEL_ASSET_WORKERS" in os.environ:
+            workers = int(os.environ["PIXEL_ASSET_WORKERS"])
+        else:
+            workers = (os.cpu_count() or 1) if len(jobs) >= MIN_POOL_JOBS else 1
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        for j in jobs:
+            module, qualname, args, kwargs = j
+            _resolve(module, qualname)(*args, **kwargs)
+        return len(jobs)
+    chunk = max(1, math.ceil(len(jobs) / (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_worker_init) as pool:
+        for j, result in zip(jobs, pool.map(_render, jobs, chunksize=chunk)):
+            _adopt(j, result)
+    return len(jobs)
+
+
+def _is_cached(j):
+    module, qualname, args, kwargs = j
+    fn = _resolve(module, qualname)
+    return _key(fn, fn.signature, args, kwargs) in _surfaces
+
+
+def clear():
+    _surfaces.clear()
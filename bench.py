@@ -0,0 +1,315 @@
+# bench.py
+# Pixel Adventures — Microbenchmarks for the hot drawing and simulation code.
+#
+# Every benchmark runs over a range of input sizes. Each (benchmark, size)
+# pair is timed in several repeats of an auto-calibrated loop; the fastest
+# and median per-call times and their median absolute deviation (MAD) go to
+# a JSON file. Comparisons use the fastest time, which is the least
+# disturbed by other load on the machine; a change only counts when it
+# clears both a fixed floor and the measured noise of the two runs.
+#
+#   python bench.py                        run all, compare with the baseline
+#   python bench.py -k npc -k particle     only names containing these
+#   python bench.py --out run.json         also write this run's results
+#   python bench.py --save-baseline        replace the committed baseline
+#
+# Baselines are only comparable on the machine that recorded them; re-save
+# it after moving to a different box.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+MIN_TIME = 0.02      # seconds per timed repeat, loops are scaled to reach it
+REPEATS = 7
+MIN_CHANGE = 0.10    # never flag changes smaller than 10 %
+NOISE_K = 3.0        # ... or smaller than this many relative MADs
+
+_benchmarks = []     # (name, sizes, setup)
+
+
+def bench(name, sizes):
+    """Register `setup(n) -> callable` as benchmark `name` over `sizes`."""
+    def register(setup):
+        _benchmarks.append((name, tuple(sizes), setup))
+        return setup
+    return register
+
+
+# ─────────────────────────────── benchmarks ──────────────────────────────────
+
+@bench("class_select._class_icon", sizes=(1, 4, 16))
+def _bench_class_icon(n):
+    import class_select
+    classes = class_select.CLASSES
+    jobs = [(classes[i % len(classes)], i % 2) for i in range(n)]
+    raw = class_select._class_icon.raw   # bypass the memo, time the raster
+    return lambda: [raw(c["id"], c["color"], with_panel=not f, frame=f) for c, f in jobs]
+
+
+@bench("class_select._dither_rect", sizes=(8, 32, 128))
+def _bench_dither_rect(n):
+    import class_select
+    surf = pygame.Surface((n, n), pygame.SRCALPHA)
+    rect = (0, 0, n, n)
+    return lambda: class_select._dither_rect(surf, rect, (200, 40, 40), (120, 20, 20))
+
+
+def _bench_building(cls):
+    def setup(n):
+        return lambda: [cls() for _ in range(n)]
+    return setup
+
+
+def _bench_building_art(kind):
+    def setup(n):
+        import buildings
+        raw = buildings.art.raw
+        return lambda: [raw(kind) for _ in range(n)]
+    return setup
+
+
+def _register_buildings():
+    import buildings
+    for kind, cls in buildings.KINDS.items():
+        bench("buildings.%s()" % kind, sizes=(1, 10, 100))(_bench_building(cls))
+        bench("buildings.art(%s)" % kind, sizes=(1, 10))(_bench_building_art(kind))
+
+
+def _random_tiles(rng, n, size):
+    """A town-sized tilemap with `n` solid blocks of `size` at random spots."""
+    import tilemap
+    tiles = tilemap.Tilemap((1200, 960))
+    for _ in range(n):
+        tiles.paint(pygame.Rect(rng.randrange(0, 1200), rng.randrange(0, 960), *size), flags=tilemap.SOLID)
+    return tiles
+
+
+@bench("npcs.NPC.update.tiles", sizes=(0, 10, 100, 1000))
+def _bench_npc_update(n):
+    import npcs
+    rng = random.Random(n)
+    tiles = _random_tiles(rng, n, (40, 40))
+    bounds = pygame.Rect(0, 0, 1200, 960)
+    npc = npcs.NPC((600, 480), rng=rng)
+    heading = pygame.Vector2(1, 1).normalize()
+    def run():
+        # same start state every call: fixed spot, fixed heading, no re-roll
+        npc.rect.topleft = (600, 480)
+        npc.pos.update(600, 480)
+        npc.dir = heading
+        npc.change = 1e9
+        npc.update(1 / 60, tiles, bounds)
+    return run
+
+
+def _particles(n):
+    import opening_sequence as o
+    rng = random.Random(n)
+    return [o.Particle(rng.uniform(0, 1000), rng.uniform(0, 500), rng.uniform(-50, 50),
+                       rng.uniform(-50, 50), life=1e9, col=o.DUST_COL, grav=120.0)
+            for _ in range(n)]
+
+
+@bench("opening_sequence.Particle.update", sizes=(100, 1000, 5000))
+def _bench_particle_update(n):
+    ps = _particles(n)
+    def run():
+        for p in ps:
+            p.update(1 / 60)
+    return run
+
+
+@bench("opening_sequence.Particle.draw", sizes=(100, 1000, 5000))
+def _bench_particle_draw(n):
+    ps = _particles(n)
+    for p in ps:
+        p.life = 0.5
+    world = pygame.Surface((1024, 576), pygame.SRCALPHA)
+    def run():
+        for p in ps:
+            p.draw(world)
+    return run
+
+
+@bench("opening_sequence.draw_vgradient", sizes=(144, 576, 1152))
+def _bench_vgradient(n):
+    import opening_sequence as o
+    surf = pygame.Surface((n * 16 // 9, n), pygame.SRCALPHA)
+    return lambda: o.draw_vgradient(surf, o.SKY_MORN_TOP, o.SKY_MORN_BOT)
+
+
+@bench("opening_sequence.Camera.present", sizes=(288, 432, 576))
+def _bench_camera_present(n):
+    import opening_sequence as o
+    vw, vh = n * 16 // 9, n
+    world = pygame.Surface((vw * o.WORLD_W_MULT, vh * o.WORLD_H_MULT), pygame.SRCALPHA)
+    dest = pygame.Surface((vw, vh))
+    cam = o.Camera(vw, vh, world.get_width(), world.get_height())
+    cam.set(zoom=1.15)
+    rng = random.Random(0)
+    return lambda: cam.present(world, dest, rng)
+
+
+@bench("odelia.collision.tiles", sizes=(10, 100, 1000))
+def _bench_odelia_collision(n):
+    import odelia_world
+    w = odelia_world.World(seed=0)
+    rng = random.Random(n)
+    w.tiles = _random_tiles(rng, n, (60, 52))
+    w.npcs = []   # just the player against the solid tiles
+    vel = pygame.Vector2(1, 1)
+    def run():
+        w.player.center = (600, 480)
+        w._step_town(1 / 60, vel)
+    return run
+
+
+_register_buildings()
+
+
+# ──────────────────────────────── running ────────────────────────────────────
+
+def calibrate(fn, min_time=MIN_TIME):
+    """Loop count that makes one timed repeat of `fn` last `min_time`."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return loops
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+
+
+def sample(fn, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) / loops
+
+
+def summarize(samples, loops):
+    """Per-call seconds: ``{"median", "mad", "min", "loops"}``."""
+    med = statistics.median(samples)
+    return {
+        "median": med,
+        "mad": statistics.median(abs(s - med) for s in samples),
+        "min": min(samples),
+        "loops": loops,
+    }
+
+
+def run(patterns=(), min_time=MIN_TIME, repeats=REPEATS, out=sys.stdout):
+    entries = []   # (name, size, fn, loops)
+    for name, sizes, setup in _benchmarks:
+        if patterns and not any(p.lower() in name.lower() for p in patterns):
+            continue
+        for n in sizes:
+            fn = setup(n)
+            fn()  # warm up caches and lazy imports outside the timing
+            entries.append((name, n, fn, calibrate(fn, min_time)))
+
+    # round-robin the repeats over all entries, so a slow patch on the
+    # machine spreads over every entry's samples (and shows up in its MAD)
+    # instead of landing on a few entries
+    samples = [[] for _ in entries]
+    for _ in range(repeats):
+        for i, (name, n, fn, loops) in enumerate(entries):
+            samples[i].append(sample(fn, loops))
+
+    results = {}
+    for (name, n, fn, loops), s in zip(entries, samples):
+        r = results.setdefault(name, {})[str(n)] = summarize(s, loops)
+        print("%-36s %6s %12.2f us  ±%.1f%%" % (
+            name, n, r["median"] * 1e6, 100 * r["mad"] / r["median"] if r["median"] else 0),
+            file=out)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "machine": "%s %s" % (platform.system(), platform.machine()),
+            "processor": platform.processor(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, out=sys.stdout):
+    """Print a verdict per shared entry; return the list of regressions."""
+    regressions = []
+    base = baseline.get("results", {})
+    for name, sizes in current["results"].items():
+        for n, cur in sizes.items():
+            ref = base.get(name, {}).get(n)
+            if ref is None:
+                continue
+            noise = NOISE_K * (cur["mad"] / cur["median"] + ref["mad"] / ref["median"])
+            limit = max(MIN_CHANGE, noise)
+            ratio = cur["min"] / ref["min"]
+            if ratio > 1 + limit:
+                verdict = "SLOWER"
+                regressions.append((name, n, ratio))
+            elif ratio < 1 - limit:
+                verdict = "faster"
+            else:
+                verdict = ""
+            print("%-36s %6s %10.2f -> %10.2f us  x%.2f (±%.0f%%) %s" % (
+                name, n, ref["min"] * 1e6, cur["min"] * 1e6, ratio, limit * 100, verdict),
+                file=out)
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pixel Adventures microbenchmarks")
+    ap.add_argument("-k", dest="patterns", action="append", default=[],
+                    help="only run benchmarks whose name contains this (repeatable)")
+    ap.add_argument("--out", help="write this run's results to a JSON file")
+    ap.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare with")
+    ap.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    ap.add_argument("--quick", action="store_true", help="shorter, noisier timings")
+    args = ap.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    min_time, repeats = (MIN_TIME / 4, 3) if args.quick else (MIN_TIME, REPEATS)
+    current = run(args.patterns, min_time, repeats)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+        print("baseline saved to %s" % args.baseline)
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except OSError:
+        print("no baseline at %s (run with --save-baseline)" % args.baseline)
+        return 0
+    print()
+    regressions = compare(current, baseline)
+    if regressions:
+        print("\n%d regression(s)" % len(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,32 @@
 import pygame
+import assetgen
+import memstats
 
 class Building:
-    """Base building with common geometry and door/solid rectangles."""
+    """Base building with common geometry and door/solid rectangles.
+
+    The art is shared between all buildings of one kind (see `art`), so
+    treat `surface` as read-only.
+    """
     size = (60, 60)
 
     def __init__(self):
-        self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
-        w, h = self.size
+        self.door, self.solid = self.geometry()
+        self.surface = art(type(self).__name__)
+
+    @classmethod
+    def geometry(cls):
+        """Return ``(door, solid)`` rects relative to the building's top-left.
+
+        Needs no display or art, so simulation code can lay out a town
+        without rasterizing anything.
+        """
+        w, h = cls.size
         # Door area for interaction (lower 8 pixels of actual door)
-        self.door = pygame.Rect(w // 2 - 8, h - 8, 16, 8)
+        door = pygame.Rect(w // 2 - 8, h - 8, 16, 8)
         # Solid portion (exclude bottom 8 pixels to allow standing in doorway)
-        self.solid = pygame.Rect(0, 0, w, h - 8)
-        self._draw()
+        solid = pygame.Rect(0, 0, w, h - 8)
+        return door, solid
 
     def _draw(self):
         raise NotImplementedError
@@ -104,3 +119,16 @@ class ItemShop(Building):
         pygame.draw.line(s, (255, 255, 255), (base_x + 20, 30), (base_x + 24, 30))
         pygame.draw.line(s, (255, 255, 255), (base_x + 24, 26), (base_x + 24, 30))
         pygame.draw.line(s, (255, 255, 255), (base_x + 20, 30), (base_x + 20, 34))
+
+
+KINDS = {cls.__name__: cls for cls in (House, Inn, ItemShop)}
+
+
+@assetgen.cached
+def art(kind):
+    """Rasterize the art for the building class named `kind`."""
+    cls = KINDS[kind]
+    b = cls.__new__(cls)
+    b.surface = memstats.track(pygame.Surface(cls.size, pygame.SRCALPHA), tag=kind)
+    b._draw()
+    return b.surface
@@ -0,0 +1,173 @@
+# capture.py
+# Pixel Adventures — Non-blocking gameplay frame capture for QA and support.
+#
+# The main loop only blits the virtual canvas into one of a ring of
+# preallocated surfaces; a background thread encodes filled slots to a PNG
+# sequence or a raw frame stream. If every slot is still waiting on the
+# encoder the frame is dropped and counted, the game loop never waits.
+#
+# Start from the environment with PIXEL_CAPTURE=<dir> (PIXEL_CAPTURE_FORMAT
+# "png" or "raw"), or toggle in-game with F10 (see presenter.py).
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+
+import pygame
+
+SLOTS = 8
+FORMATS = ("png", "raw")
+DEFAULT_DIR = "captures"
+
+
+class FrameCapture:
+    """Ring-buffered capture of one canvas size into `out_dir`.
+
+    `fmt` is "png" (one numbered PNG per frame) or "raw" (all frames
+    appended to ``frames.raw`` in the canvas' native pixel layout, described
+    by ``frames.txt``). `every` keeps only every n-th offered frame.
+    """
+
+    def __init__(self, out_dir, canvas, fmt="png", slots=SLOTS, every=1):
+        if fmt not in FORMATS:
+            raise ValueError("unknown capture format %r" % (fmt,))
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.size = canvas.get_size()
+        self.every = max(1, every)
+        self.offered = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.error = None   # first encoding failure; nothing is written after it
+        self._slots = [pygame.Surface(self.size, 0, canvas) for _ in range(slots)]
+        self._free = queue.SimpleQueue()
+        for i in range(slots):
+            self._free.put(i)
+        self._full = queue.SimpleQueue()
+        self._raw = None
+        if fmt == "raw":
+            s = self._slots[0]
+            with open(os.path.join(out_dir, "frames.txt"), "w") as f:
+                f.write("size %d %d\npitch %d\nbytesize %d\nmasks %s\n" % (
+                    self.size[0], self.size[1], s.get_pitch(), s.get_bytesize(),
+                    " ".join("%08x" % m for m in s.get_masks())))
+            self._raw = open(os.path.join(out_dir, "frames.raw"), "wb")
+        self._thread = threading.Thread(target=self._work, name="frame-capture", daemon=True)
+        self._thread.start()
+
+    def grab(self, canvas):
+        """Copy `canvas` into a free slot, or count a dropped frame."""
+        self.offered += 1
+        if (self.offered - 1) % self.every:
+            return
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        if canvas.get_size() == self.size:
+            self._slots[slot].blit(canvas, (0, 0))
+        else:
+            # dynamic resolution: keep the recording at the size it started at
+            pygame.transform.scale(canvas, self.size, self._slots[slot])
+        self._full.put((slot, self.captured))
+        self.captured += 1
+
+    def _work(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                return
+            slot, n = item
+            surf = self._slots[slot]
+            try:
+                if self.error is not None:
+                    continue
+                if self._raw is not None:
+                    # whole rows including pitch padding, as frames.txt says;
+                    # a 2D view would need the pixels C-contiguous
+                    self._raw.write(surf.get_buffer().raw)
+                else:
+                    pygame.image.save(surf, os.path.join(self.out_dir, "frame_%06d.png" % n))
+                self.written += 1
+            except Exception as exc:
+                self.error = exc
+                print("capture: %s: %s, stopping" % (type(exc).__name__, exc), file=sys.stderr)
+            finally:
+                self._free.put(slot)
+
+    def close(self):
+        """Finish encoding the queued frames and stop the worker."""
+        self._full.put(None)
+        self._thread.join()
+        if self._raw is not None:
+            self._raw.close()
+
+    def summary(self):
+        text = "capture %s: %d captured, %d written, %d dropped" % (
+            self.out_dir, self.captured, self.written, self.dropped)
+        if self.error is not None:
+            text += ", failed: %s" % (self.error,)
+        return text
+
+
+# ─────────────────────────── process-wide capture ───────────────────────────
+
+_active = None
+_pending = None   # (out_dir, fmt) waiting for the first canvas to size the ring
+
+
+def active():
+    return _active is not None or _pending is not None
+
+
+def start(out_dir=None, fmt=None):
+    """Begin capturing from the next presented frame."""
+    global _pending
+    if active():
+        return
+    if out_dir is None:
+        out_dir = os.path.join(DEFAULT_DIR, time.strftime("%Y%m%d-%H%M%S"))
+    _pending = (out_dir, fmt or os.environ.get("PIXEL_CAPTURE_FORMAT", "png"))
+
+
+def stop():
+    global _active, _pending
+    _pending = None
+    if _active is None:
+        return
+    cap, _active = _active, None
+    cap.close()
+    print(cap.summary(), file=sys.stderr)
+
+
+def toggle():
+    if active():
+        stop()
+    else:
+        start()
+
+
+def grab(canvas):
+    """Offer a finished virtual canvas; a no-op unless capture is running."""
+    global _active, _pending
+    if _pending is not None:
+        out_dir, fmt = _pending
+        _pending = None
+        _active = FrameCapture(out_dir, canvas, fmt)
+    if _active is not None:
+        if _active.error is not None:
+            stop()
+        else:
+            _active.grab(canvas)
+
+
+atexit.register(stop)
+
+if os.environ.get("PIXEL_CAPTURE"):
+    start(os.environ["PIXEL_CAPTURE"])
@@ -0,0 +1,294 @@
+# cinematic_cache.py
+# Pixel Adventures — Baked cinematic frame cache.
+#
+# A cinematic is baked once into a compressed stream of virtual-resolution
+# RGB frames and then streamed back through a small read-ahead decoder, so
+# playback costs one inflate and one scale per frame instead of a full
+# simulation and rasterization.
+#
+# File layout (little endian):
+#   header  magic "PXCN", version, width, height, fps, source tag,
+#           frame count, index of the first end-card frame
+#   frames  kind (u8), payload length (u32), zlib payload
+# A payload is one flag byte per row followed by the bytes of every flagged
+# row. Key frames flag every row; delta frames flag only rows that differ
+# from the previous frame, unflagged rows are carried over.
+#
+# Run this module directly to bake the opening sequence ahead of time;
+# bake_in_background() does that in a low-priority child process when a
+# bake during playback had to be given up.
+#
+# The cache lives in the user's cache directory (userdirs.py);
+# PIXEL_CACHE_DIR overrides it.
+
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import zlib
+
+import pygame
+
+import userdirs
+
+MAGIC = b"PXCN"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHIII")
+FRAME = struct.Struct("<BI")
+KEY, DELTA = 0, 1
+KEY_INTERVAL = 120   # frames between full key frames
+LEVEL = 6            # zlib level used while baking
+READ_AHEAD = 8       # decoded frames buffered ahead of playback
+
+CACHE_DIR = os.environ.get("PIXEL_CACHE_DIR") or userdirs.cache_dir()
+
+
+def cache_path(name, size):
+    return os.path.join(CACHE_DIR, "%s_%dx%d.pxc" % (name, size[0], size[1]))
+
+
+def source_tag(filenames):
+    """CRC of the given source files (relative to this directory)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    crc = 0
+    for name in filenames:
+        with open(os.path.join(here, name), "rb") as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+# ────────────────────────────── Writing ──────────────────────────────────────
+
+class FrameCacheWriter:
+    """Compress frames on a background thread into `path`.
+
+    The file is written under a temporary name and renamed into place by
+    `finish()`, so an aborted or interrupted bake never leaves a partial cache.
+    Recording never holds up playback: if the encoder falls READ_AHEAD frames
+    behind, add() aborts the bake instead of waiting.
+    """
+
+    def __init__(self, path, size, fps, tag):
+        self.path = path
+        self.size = size
+        self.fps = fps
+        self.tag = tag
+        self.pitch = size[0] * 3
+        self.frame_count = 0
+        self.end_start = 0xFFFFFFFF
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._tmp = path + ".tmp"
+        self._file = open(self._tmp, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], fps, tag, 0, self.end_start))
+        self._queue = queue.Queue(maxsize=READ_AHEAD)
+        self._error = None
+        self._stop = threading.Event()
+        self.aborted = False
+        self._thread = threading.Thread(target=self._work, name="cinematic-bake", daemon=True)
+        self._thread.start()
+
+    def add(self, surf, in_end_card=False, wait=False):
+        """Queue a copy of `surf`'s pixels; False once the bake is aborted.
+
+        A full queue aborts the bake rather than stall the caller's frame,
+        unless `wait` (an offline bake, where nobody is watching).
+        """
+        if self.aborted:
+            return False
+        try:
+            self._queue.put(pygame.image.tobytes(surf, "RGB"), block=wait)
+        except queue.Full:
+            self.abort()
+            return False
+        if in_end_card and self.end_start == 0xFFFFFFFF:
+            self.end_start = self.frame_count
+        self.frame_count += 1
+        return True
+
+    def _work(self):
+        prev = None
+        index = 0
+        h, pitch = self.size[1], self.pitch
+        try:
+            while True:
+                raw = self._queue.get()
+                if raw is None or self._stop.is_set():
+                    return
+                if prev is None or index % KEY_INTERVAL == 0:
+                    kind, body = KEY, b"\x01" * h + raw
+                else:
+                    flags = bytearray(h)
+                    rows = []
+                    for y in range(h):
+                        o = y * pitch
+                        row = raw[o:o + pitch]
+                        if row != prev[o:o + pitch]:
+                            flags[y] = 1
+                            rows.append(row)
+                    kind, body = DELTA, bytes(flags) + b"".join(rows)
+                payload = zlib.compress(body, LEVEL)
+                self._file.write(FRAME.pack(kind, len(payload)))
+                self._file.write(payload)
+                prev = raw
+                index += 1
+        except BaseException as exc:  # surfaced by finish()
+            self._error = exc
+            while self._queue.get() is not None:
+                pass
+
+    def finish(self):
+        if self.aborted:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            self.abort()
+            raise self._error
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.size[0], self.size[1], self.fps,
+                                     self.tag, self.frame_count, self.end_start))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Drop the bake; waits for at most the frame being encoded."""
+        if self.aborted:
+            return
+        self.aborted = True
+        self._stop.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._queue.put(None)   # wakes an idle encoder
+        self._thread.join()
+        self._file.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+
+_baker = None   # the background bake process, see bake_in_background()
+
+
+def bake_in_background(size, quality_tier):
+    """Bake the opening sequence for `size` in a low-priority child process.
+
+    Does nothing while an earlier background bake is still running. The
+    child renders with `quality_tier` so its frames match this process's
+    cache tag.
+    """
+    global _baker
+    if _baker is not None and _baker.poll() is None:
+        return
+    env = dict(os.environ, PIXEL_QUALITY=quality_tier, PIXEL_CACHE_DIR=CACHE_DIR,
+               SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    nice = (lambda: os.nice(10)) if hasattr(os, "nice") else None
+    try:
+        _baker = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(size[0]), str(size[1])], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, preexec_fn=nice)
+    except OSError as exc:
+        print("cinematic cache: background bake failed to start: %s" % exc, file=sys.stderr)
+
+
+# ────────────────────────────── Playback ─────────────────────────────────────
+
+class FramePlayer:
+    """Stream decoded frames from a cache file with a read-ahead thread."""
+
+    def __init__(self, f, size, frame_count, end_start):
+        self.size = size
+        self.frame_count = frame_count
+        self.end_start = end_start
+        self.index = 0
+        self._file = f
+        self._queue = queue.Queue(maxsize=READ_AHEAD)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, name="cinematic-decode", daemon=True)
+        self._thread.start()
+
+    def _work(self):
+        w, h = self.size
+        pitch = w * 3
+        buf = bytearray(pitch * h)
+        try:
+            for _ in range(self.frame_count):
+                kind, length = FRAME.unpack(self._file.read(FRAME.size))
+                body = zlib.decompress(self._file.read(length))
+                if kind == KEY:
+                    buf[:] = memoryview(body)[h:]
+                else:
+                    p = h
+                    for y, changed in enumerate(body[:h]):
+                        if changed:
+                            o = y * pitch
+                            buf[o:o + pitch] = body[p:p + pitch]
+                            p += pitch
+                frame = bytes(buf)
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(frame, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if self._stop.is_set():
+                    return
+        except (OSError, zlib.error, struct.error):
+            pass  # a damaged cache just ends playback early
+        finally:
+            if not self._stop.is_set():
+                self._queue.put(None)
+
+    def next_frame(self):
+        """Return ``(surface, in_end_card)`` or None when the stream ends."""
+        raw = self._queue.get()
+        if raw is None:
+            return None
+        surf = pygame.image.frombuffer(raw, self.size, "RGB")
+        in_end_card = self.index >= self.end_start
+        self.index += 1
+        return surf, in_end_card
+
+    def close(self):
+        self._stop.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join()
+        self._file.close()
+
+
+def open_player(path, size, fps, tag):
+    """Return a FramePlayer for `path`, or None if it is missing or stale."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    head = f.read(HEADER.size)
+    if len(head) == HEADER.size:
+        magic, version, w, h, f_fps, f_tag, count, end_start = HEADER.unpack(head)
+        if (magic, version, (w, h), f_fps, f_tag) == (MAGIC, VERSION, tuple(size), fps, tag) and count:
+            return FramePlayer(f, (w, h), count, end_start)
+    f.close()
+    return None
+
+
+if __name__ == "__main__":
+    import quality
+    import title_screen
+    import opening_sequence
+
+    pygame.init()
+    if os.environ.get("PIXEL_QUALITY", "").strip().lower() in quality.TIERS:
+        quality.set_tier(os.environ["PIXEL_QUALITY"].strip().lower(), "env")
+    size = tuple(int(v) for v in sys.argv[1:3]) if len(sys.argv) >= 3 else title_screen.VIRTUAL_SIZE
+    print(opening_sequence.bake(size))
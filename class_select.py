@@ -4,11 +4,19 @@
 
 import pygame
 import math
-import random
+import ambient
+import assetgen
+import memstats
+import palette
+import presenter
+import quality
 
 TITLE = "Choose Your Class"
 ICON_W, ICON_H = 24, 36  # wider/taller canvas for more detail
 
+# Background dots: two thirds drift at 20 px/s, the rest twice as fast
+DOT_LAYERS = [(20, 2 / 3, (60, 60, 90)), (40, 1 / 3, (60, 60, 90))]
+
 # 3 FF-inspired classes with visible gameplay effects in the demo
 CLASSES = [
     {
@@ -73,13 +81,21 @@ def _make_text(text, size, color, shadow=True):
     font = pygame.font.Font(None, size)
     surf = font.render(text, False, color)
     if not shadow:
-        return surf
+        return memstats.track(surf, tag="text")
     sh = font.render(text, False, (0, 0, 0))
     out = pygame.Surface((surf.get_width()+1, surf.get_height()+1), pygame.SRCALPHA)
     out.blit(sh, (1, 1))
     out.blit(surf, (0, 0))
-    return out
-
+    return memstats.track(out, tag="text")
+
+def _cached_text(cache, text, size, color, shadow=True):
+    """_make_text memoized in `cache` (text surfaces survive between visits)."""
+    key = (text, size, color, shadow)
+    surf = cache.get(key)
+    if surf is None:
+        surf = cache[key] = _make_text(text, size, color, shadow)
+    return surf
+
 def _darker(c, amt=30):
     return (max(0, c[0]-amt), max(0, c[1]-amt), max(0, c[2]-amt))
 
@@ -93,7 +109,7 @@ def _dither_rect(surf, rect, c1, c2):
         for x in range(x0, x0+w):
             surf.set_at((x, y), c1 if ((x + y) & 1) == 0 else c2)
 
-def _class_icon(cid, accent, with_panel=True, frame=0):
+def _draw_class_icon(cid, accent, with_panel=True, frame=0):
     """Return a detailed class sprite surface (24x36).
     If `with_panel` is True a dark backdrop and border are drawn (for selection cards).
     If False, a transparent sprite is returned (for in-world use). `frame` selects
@@ -102,14 +118,14 @@ def _class_icon(cid, accent, with_panel=True, frame=0):
     border_col = (20, 20, 34)
     panel_col  = (14, 14, 24)
 
-    s = pygame.Surface((ICON_W, ICON_H), pygame.SRCALPHA)
+    s = memstats.track(pygame.Surface((ICON_W, ICON_H), pygame.SRCALPHA), tag="icon")
     if with_panel:
         pygame.draw.rect(s, border_col, (0, 0, ICON_W, ICON_H))
-        inner = pygame.Surface((ICON_W - 2, ICON_H - 2), pygame.SRCALPHA)
+        inner = memstats.track(pygame.Surface((ICON_W - 2, ICON_H - 2), pygame.SRCALPHA), tag="icon")
         inner.fill(panel_col)
         blit_target, blit_pos = s, (1, 1)
     else:
-        inner = pygame.Surface((ICON_W - 2, ICON_H - 2), pygame.SRCALPHA)
+        inner = memstats.track(pygame.Surface((ICON_W - 2, ICON_H - 2), pygame.SRCALPHA), tag="icon")
         blit_target, blit_pos = None, (0, 0)
 
     iw, ih = inner.get_width(), inner.get_height()
@@ -295,19 +311,56 @@ def _class_icon(cid, accent, with_panel=True, frame=0):
         return s
     return inner
 
+# Icons are stored palettized: each (class, panel, frame) is drawn once with
+# ACCENT_KEY as its accent, and every accent colour is a palette swap of the
+# shades below. ACCENT_KEY is chosen so that none of its shades collide with
+# the fixed colours of the drawings.
+ACCENT_KEY = (101, 131, 161)
+ACCENT_SHADES = (0, -40, 30, -35, 20)   # every shade the drawings derive from the accent
+
+def _accent_shades(accent):
+    return [_lighter(accent, amt) if amt > 0 else _darker(accent, -amt) for amt in ACCENT_SHADES]
+
+@assetgen.cached
+def _class_layout(cid, with_panel=True, frame=0):
+    """8-bit pixels of a class icon; the accent shades sit at palette indices 1.."""
+    return memstats.track(
+        palette.indexed(_draw_class_icon(cid, ACCENT_KEY, with_panel, frame),
+                        slots=_accent_shades(ACCENT_KEY)),
+        tag="icon")
+
+@assetgen.cached
+def _class_icon(cid, accent, with_panel=True, frame=0):
+    """Class sprite in `accent` (see _draw_class_icon), as a palette swap."""
+    shades = dict(enumerate(_accent_shades(accent), 1))
+    return memstats.track(palette.variant(_class_layout(cid, with_panel, frame), shades), tag="icon")
+
 # ───────────────────────── screen ─────────────────────────
 
-def run(screen, clock, virtual_size):
+def load(virtual_size):
+    """Build the selection screen's reusable resources."""
     vw, vh = virtual_size
-    surf = pygame.Surface(virtual_size)
-
-    # Prebuild icons/text
-    base_icons = [_class_icon(c["id"], c["color"]) for c in CLASSES]
-    title = _make_text(TITLE, 20, (255, 230, 140))
-    prompt = _make_text("← →  Select   Z/ENTER  Confirm   ESC  Back", 12, (230, 230, 230), shadow=False)
-
-    # Animated background dots
-    dots = [{"x": random.randrange(0, vw), "y": random.randrange(0, vh), "s": random.choice([1, 1, 2])} for _ in range(60)]
+    return {
+        "canvas": memstats.track(pygame.Surface(virtual_size), tag="canvas"),
+        # Prebuild icons/text
+        "icons": [_class_icon(c["id"], c["color"]) for c in CLASSES],
+        "title": _make_text(TITLE, 20, (255, 230, 140)),
+        "prompt": _make_text("← →  Select   Z/ENTER  Confirm   ESC  Back", 12, (230, 230, 230), shadow=False),
+        # Animated background dots
+        "dots": ambient.AmbientField(vw, vh, DOT_LAYERS, count=quality.get("dots"), respawn_y=-2, wrap_inclusive=False),
+        "texts": {},
+    }
+
+def run(screen, clock, virtual_size, assets=None):
+    vw, vh = virtual_size
+    if assets is None:
+        assets = load(virtual_size)
+    surf = assets["canvas"]
+    base_icons = assets["icons"]
+    title = assets["title"]
+    prompt = assets["prompt"]
+    dots = assets["dots"]
+    texts = assets["texts"]
     t = 0.0
     idx = 0
 
@@ -325,6 +378,8 @@ def run(screen, clock, virtual_size):
         t += dt
 
         for e in pygame.event.get():
+            if presenter.handle_event(e):
+                continue
             if e.type == pygame.QUIT: return "quit"
             if e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_ESCAPE: return "back"
@@ -338,16 +393,11 @@ def run(screen, clock, virtual_size):
                     return chosen
 
         # update dots
-        for d in dots:
-            d["y"] += d["s"] * dt * 20
-            if d["y"] > vh:
-                d["y"] = -2
-                d["x"] = random.randrange(0, vw)
+        dots.update(dt)
 
         # draw bg
         surf.fill((12, 12, 20))
-        for d in dots:
-            surf.set_at((int(d["x"]), int(d["y"])), (60, 60, 90))
+        dots.draw(surf)
 
         # header
         ty = 8 + int(math.sin(t * 2.0) * 1)
@@ -368,7 +418,7 @@ def run(screen, clock, virtual_size):
             oy = card_top + icon_top_margin + bob + (int(math.sin(t * 3.0)) if i == idx else 0)
             surf.blit(ic, (cx + (col_w - ic.get_width()) // 2, oy))
 
-            nm = _make_text(c["name"], 16, c["color"])
+            nm = _cached_text(texts, c["name"], 16, c["color"])
             name_y = oy + ICON_H + name_gap
             surf.blit(nm, (cx + (col_w - nm.get_width()) // 2, name_y))
 
@@ -380,7 +430,7 @@ def run(screen, clock, virtual_size):
             y = sep_y + bonuses_gap
             bonus_color = (230, 230, 230) if i != idx else (255, 255, 180)
             for b in c["bonuses"]:
-                line = _make_text(b, 12, bonus_color, shadow=False)
+                line = _cached_text(texts, b, 12, bonus_color, shadow=False)
                 if line.get_width() <= col_w - 16:
                     if y + 12 <= card_top + card_h - 4:
                         surf.blit(line, (cx + 8, y))
@@ -389,8 +439,8 @@ def run(screen, clock, virtual_size):
                     # crude wrap
                     mid = len(b) // 2
                     cut = b[:mid].rstrip() + "-"
-                    line1 = _make_text(cut, 12, bonus_color, shadow=False)
-                    line2 = _make_text(b[mid:].lstrip(), 12, bonus_color, shadow=False)
+                    line1 = _cached_text(texts, cut, 12, bonus_color, shadow=False)
+                    line2 = _cached_text(texts, b[mid:].lstrip(), 12, bonus_color, shadow=False)
                     if y + 12 <= card_top + card_h - 4:
                         surf.blit(line1, (cx + 8, y))
                     y += 12
@@ -407,5 +457,4 @@ def run(screen, clock, virtual_size):
             surf.blit(prompt, ((vw - prompt.get_width()) // 2, vh - 16))
 
         # scale to window (nearest-neighbor)
-        pygame.transform.scale(surf, screen.get_size(), screen)
-        pygame.display.flip()
+        presenter.present(screen, surf)
@@ -0,0 +1,208 @@
+# drawstats.py
+# Pixel Adventures — Per-frame counts of draw calls and the pixels they touch.
+#
+# When enabled, every pygame.draw and pygame.transform function and the
+# blit, blits, fill and set_at methods of surfaces are counted per call
+# type, per presented frame and per scene. A row holds:
+#   calls   calls per frame
+#   px      pixels per frame, taken from the rect each call reports as
+#           changed (the bounding box for draw.*, the result for transform.*)
+#   ms      time inside those calls per frame
+# A call type under CALL_BOUND_PX pixels per call is call-bound: its time
+# is mostly per-call overhead, which fewer, bigger calls remove. Above that
+# it is fill-bound and only touching fewer pixels helps. A scene is labelled
+# by whichever kind takes most of its drawing time.
+#
+# Surface methods can't be patched on pygame's type, so enabling replaces
+# pygame.Surface with a counting subclass. Surfaces made by pygame.Surface()
+# after that, and their copies and conversions, count their blits. Surfaces
+# from image loading, fonts, subsurfaces or transform results do not, so
+# blits onto those are missed. Scenes mostly draw onto canvases they made
+# with pygame.Surface(), so those blits are counted.
+#
+# Off by default. PIXEL_DRAWSTATS=1 enables it at import (before any scene
+# builds its surfaces) and prints the report at exit.
+
+import atexit
+import contextlib
+import os
+import sys
+import time
+
+import pygame
+
+DRAW_FUNCS = ("rect", "polygon", "circle", "ellipse", "arc", "line", "lines", "aaline", "aalines")
+TRANSFORM_FUNCS = ("scale", "smoothscale", "scale_by", "smoothscale_by", "rotate", "rotozoom",
+                   "flip", "scale2x")
+CALL_BOUND_PX = 2048   # fewer pixels per call than this and the row is call-bound
+
+_enabled = False
+_scene = None
+_frame = {}     # call type -> [calls, pixels, seconds] since the last frame()
+_scenes = {}    # scene -> {"frames": n, "max_calls": n, "max_px": n, "rows": {type: [calls, px, s]}}
+_perf = time.perf_counter
+_Surface = pygame.Surface
+
+
+def enabled():
+    return _enabled
+
+
+def _count(kind, px, start):
+    row = _frame.get(kind)
+    if row is None:
+        row = _frame[kind] = [0, 0, 0.0]
+    row[0] += 1
+    row[1] += px
+    row[2] += _perf() - start
+
+
+class _SurfaceType(type):
+    # plain surfaces (fonts, image.load ...) still pass isinstance checks
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, _Surface)
+
+    def __subclasscheck__(cls, sub):
+        return issubclass(sub, _Surface)
+
+
+class CountingSurface(_Surface, metaclass=_SurfaceType):
+    """pygame.Surface that counts blit, blits, fill and set_at."""
+
+    def blit(self, *args, **kw):
+        start = _perf()
+        r = _Surface.blit(self, *args, **kw)
+        _count("blit", r.w * r.h, start)
+        return r
+
+    def blits(self, blit_sequence, doreturn=1):
+        start = _perf()
+        rects = _Surface.blits(self, blit_sequence, 1)
+        _count("blits", sum(r.w * r.h for r in rects), start)
+        return rects if doreturn else None
+
+    def fill(self, *args, **kw):
+        start = _perf()
+        r = _Surface.fill(self, *args, **kw)
+        _count("fill", r.w * r.h, start)
+        return r
+
+    def set_at(self, *args):
+        start = _perf()
+        _Surface.set_at(self, *args)
+        _count("set_at", 1, start)
+
+
+def _draw(name, fn):
+    kind = "draw." + name
+
+    def counted(*args, **kw):
+        start = _perf()
+        r = fn(*args, **kw)
+        _count(kind, r.w * r.h, start)
+        return r
+    return counted
+
+
+def _transform(name, fn):
+    kind = "transform." + name
+
+    def counted(*args, **kw):
+        start = _perf()
+        s = fn(*args, **kw)
+        w, h = s.get_size()
+        _count(kind, w * h, start)
+        return s
+    return counted
+
+
+def enable():
+    """Start counting; surfaces must be created afterwards to count blits."""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    for name in DRAW_FUNCS:
+        if hasattr(pygame.draw, name):
+            setattr(pygame.draw, name, _draw(name, getattr(pygame.draw, name)))
+    for name in TRANSFORM_FUNCS:
+        if hasattr(pygame.transform, name):
+            setattr(pygame.transform, name, _transform(name, getattr(pygame.transform, name)))
+    pygame.Surface = CountingSurface
+
+
+def frame():
+    """A frame was presented: file its counts under the current scene."""
+    if not _enabled or not _frame:
+        return
+    s = _scenes.get(_scene or "unknown")
+    if s is None:
+        s = _scenes[_scene or "unknown"] = {"frames": 0, "max_calls": 0, "max_px": 0, "rows": {}}
+    s["frames"] += 1
+    calls = px = 0
+    rows = s["rows"]
+    for kind, (n, p, sec) in _frame.items():
+        row = rows.get(kind)
+        if row is None:
+            row = rows[kind] = [0, 0, 0.0]
+        row[0] += n
+        row[1] += p
+        row[2] += sec
+        calls += n
+        px += p
+    s["max_calls"] = max(s["max_calls"], calls)
+    s["max_px"] = max(s["max_px"], px)
+    _frame.clear()
+
+
+@contextlib.contextmanager
+def scene(name):
+    """File frames presented inside the block under `name`."""
+    global _scene
+    _scene = name
+    _frame.clear()   # whatever loading drew is not a frame
+    try:
+        yield
+    finally:
+        _scene = None
+
+
+def stats(name):
+    return _scenes.get(name)
+
+
+def reset():
+    _scenes.clear()
+    _frame.clear()
+
+
+def report():
+    lines = []
+    for name, s in _scenes.items():
+        n = s["frames"]
+        rows = s["rows"]
+        calls = sum(r[0] for r in rows.values())
+        px = sum(r[1] for r in rows.values())
+        sec = sum(r[2] for r in rows.values())
+        call_bound = sum(r[2] for r in rows.values() if r[1] < r[0] * CALL_BOUND_PX)
+        bound = "call-bound" if call_bound * 2 > sec else "fill-bound"
+        lines.append("%s: %d frames, %.0f calls / %.0f kpx / %.2f ms per frame "
+                     "(max %d calls, %.0f kpx), %.0f px per call, %s" % (
+                         name, n, calls / n, px / n / 1000, sec / n * 1000, s["max_calls"],
+                         s["max_px"] / 1000, px / (calls or 1), bound))
+        lines.append("  call                  calls/frame   kpx/frame   ms/frame   px/call")
+        for kind, (c, p, t) in sorted(rows.items(), key=lambda kv: -kv[1][2]):
+            lines.append("  %-20s %12.1f %11.1f %10.3f %9.0f  %s" % (
+                kind, c / n, p / n / 1000, t / n * 1000, p / c,
+                "calls" if p < c * CALL_BOUND_PX else "fill"))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _scenes:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_DRAWSTATS"):
+    enable()
+    atexit.register(_report_at_exit)
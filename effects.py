@@ -0,0 +1,139 @@
+# effects.py
+# Pixel Adventures — Cached effect variants of surfaces.
+#
+# variant(src, effect, *params) returns `src` with an effect applied:
+#   "charred"     darkened and muted (burnt-out buildings)
+#   "tinted"      multiplied by an RGB colour
+#   "flashed"     brightened toward white by an amount (hit flashes)
+#   "silhouette"  every visible pixel in one colour, alpha kept
+#   "damaged"     chunks knocked out and cracks drawn, repeatable per seed
+# Variants are built once and kept in an LRU keyed by the source surface's
+# identity plus the effect and its parameters, so drawing a damaged town is
+# a dictionary lookup and a blit per building. Sources are treated as
+# read-only (like assetgen's shared art); call invalidate() after changing
+# one in place.
+
+import random
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+import memstats
+
+MAX_ENTRIES = 256
+
+
+def _rgba(src):
+    """Per-pixel-alpha copy of `src` (colour-keyed and 8-bit sources too)."""
+    if src.get_flags() & pygame.SRCALPHA:
+        return src.copy()
+    s = pygame.Surface(src.get_size(), pygame.SRCALPHA)
+    s.blit(src, (0, 0))
+    return s
+
+
+def _charred(src, darken=(35, 35, 35, 220)):
+    s = _rgba(src)
+    overlay = pygame.Surface(s.get_size(), pygame.SRCALPHA)
+    overlay.fill(darken)
+    s.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
+    return s
+
+
+def _tinted(src, color):
+    s = _rgba(src)
+    s.fill(color[:3], special_flags=pygame.BLEND_RGB_MULT)
+    return s
+
+
+def _flashed(src, amount=255):
+    s = _rgba(src)
+    s.fill((amount, amount, amount), special_flags=pygame.BLEND_RGB_ADD)
+    return s
+
+
+def _silhouette(src, color=(0, 0, 0)):
+    s = _rgba(src)
+    s.fill((0, 0, 0), special_flags=pygame.BLEND_RGB_MULT)
+    s.fill(color[:3], special_flags=pygame.BLEND_RGB_ADD)
+    return s
+
+
+def _damaged(src, seed=0, amount=0.25):
+    """Holes along the top edge and dark cracks; `amount` is 0..1."""
+    s = _rgba(src)
+    w, h = s.get_size()
+    rng = random.Random(seed)
+    for _ in range(int(amount * w / 4)):
+        cw, ch = rng.randint(2, 6), rng.randint(2, max(2, int(h * amount)))
+        s.fill((0, 0, 0, 0), (rng.randrange(w), 0, cw, ch))
+    for _ in range(int(amount * 12)):
+        x, y = rng.randrange(w), rng.randrange(h)
+        if s.get_at((x, y)).a == 0:
+            continue   # cracks start on the sprite, not in thin air
+        pygame.draw.line(s, (25, 20, 20), (x, y), (x + rng.randint(-6, 6), y + rng.randint(3, 10)))
+    return s
+
+
+EFFECTS = {
+    "charred": _charred,
+    "tinted": _tinted,
+    "flashed": _flashed,
+    "silhouette": _silhouette,
+    "damaged": _damaged,
+}
+
+
+class EffectCache:
+    """LRU of effect variants, keyed by (source identity, effect, params)."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (weakref to source, variant)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, src, effect, *params):
+        key = (id(src), effect, params)
+        entry = self._entries.get(key)
+        # a dead reference means the id now belongs to a different surface
+        if entry is not None and entry[0]() is src:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        surf = memstats.track(EFFECTS[effect](src, *params), tag=effect)
+        self._entries[key] = (weakref.ref(src), surf)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def invalidate(self, src):
+        """Forget every variant of `src`."""
+        sid = id(src)
+        for key in [k for k in self._entries if k[0] == sid]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+_cache = EffectCache()
+
+
+def variant(src, effect, *params):
+    """`src` with `effect` applied (cached; treat the result as read-only)."""
+    return _cache.get(src, effect, *params)
+
+
+def invalidate(src):
+    _cache.invalidate(src)
+
+
+def cache():
+    return _cache
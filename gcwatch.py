@@ -0,0 +1,172 @@
+# gcwatch.py
+# Pixel Adventures — Garbage collector pause monitor and scene-aware GC policy.
+#
+# Monitor: a gc.callbacks hook times every collection and files the pause
+# under the scene it happened in and its generation, noting pauses longer
+# than a whole frame budget. The pacer reports each frame's work time
+# through frame(), so a frame that missed the budget only because of the
+# collections inside it counts as a GC miss. Pauses taken on
+# purpose at scene transitions are filed under "<scene>*" and kept apart
+# from pauses during play.
+#
+# Policy (main installs it; PIXEL_GC_POLICY=0 leaves the collector alone):
+#   - at each scene transition, unfreeze and run one full collection, while
+#     the screen is changing anyway
+#   - once the scene's assets are built, gc.freeze() them, so later
+#     collections never traverse those long-lived objects again
+#   - during play, a full (gen-2) collection only runs after GEN2_POSTPONE
+#     gen-1 passes instead of CPython's 10, which moves gen-2 work to the
+#     transitions
+#
+# The monitor is off by default. PIXEL_GC=1 prints the pause table at exit.
+
+import atexit
+import contextlib
+import gc
+import os
+import sys
+import time
+
+import resolution
+
+GEN2_POSTPONE = 1000   # gen-1 collections before a gen-2 one during play
+BUDGET_MS = float(os.environ.get("PIXEL_FRAME_BUDGET_MS", resolution.BUDGET_MS))
+
+_enabled = False
+_policy = False
+_saved_threshold = None
+_scene = None
+_transition = False
+_start = 0.0
+_frame_ms = 0.0   # collection time inside the current frame
+_pauses = {}      # (scene, generation) -> [count, total ms, max ms, collected, over budget]
+_frames = {}      # scene -> [frames, frames with a pause, GC misses]
+
+
+def enabled():
+    return _enabled
+
+
+def _callback(phase, info):
+    global _start, _frame_ms
+    if phase == "start":
+        _start = time.perf_counter()
+        return
+    ms = (time.perf_counter() - _start) * 1000
+    _frame_ms += ms
+    name = _scene or "unknown"
+    if _transition:
+        name += "*"
+    row = _pauses.get((name, info["generation"]))
+    if row is None:
+        row = _pauses[(name, info["generation"])] = [0, 0.0, 0.0, 0, 0]
+    row[0] += 1
+    row[1] += ms
+    if ms > row[2]:
+        row[2] = ms
+    row[3] += info["collected"]
+    if ms > BUDGET_MS:
+        row[4] += 1
+
+
+def enable():
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        gc.callbacks.append(_callback)
+
+
+def disable():
+    global _enabled
+    if _enabled:
+        _enabled = False
+        gc.callbacks.remove(_callback)
+
+
+def frame(work_ms):
+    """A frame's work took `work_ms` (called by the pacer)."""
+    global _frame_ms
+    if not _enabled:
+        return
+    row = _frames.get(_scene)
+    if row is None:
+        row = _frames[_scene] = [0, 0, 0]
+    row[0] += 1
+    if _frame_ms:
+        row[1] += 1
+        if work_ms > BUDGET_MS >= work_ms - _frame_ms:
+            row[2] += 1
+        _frame_ms = 0.0
+
+
+# ──────────────────────────────── policy ─────────────────────────────────────
+
+def install():
+    """Turn the scene-aware policy on, unless PIXEL_GC_POLICY=0."""
+    global _policy, _saved_threshold
+    if os.environ.get("PIXEL_GC_POLICY", "1") == "0" or _policy:
+        return
+    _policy = True
+    _saved_threshold = gc.get_threshold()
+    gc.set_threshold(_saved_threshold[0], _saved_threshold[1], GEN2_POSTPONE)
+
+
+def uninstall():
+    global _policy
+    if _policy:
+        _policy = False
+        gc.set_threshold(*_saved_threshold)
+        gc.unfreeze()
+
+
+def policy_active():
+    return _policy
+
+
+@contextlib.contextmanager
+def scene(name):
+    """File pauses under `name`; with the policy, collect on the way in."""
+    global _scene, _transition, _frame_ms
+    _scene = name
+    if _policy:
+        _transition = True
+        try:
+            gc.unfreeze()
+            gc.collect()
+        finally:
+            _transition = False
+            _frame_ms = 0.0
+    try:
+        yield
+    finally:
+        _scene = None
+
+
+def assets_ready():
+    """The scene's assets are built; keep them out of later collections."""
+    if _policy:
+        gc.freeze()
+
+
+# ──────────────────────────────── report ─────────────────────────────────────
+
+def report():
+    lines = ["scene           gen  pauses  total ms   mean ms    max ms  collected  > budget"]
+    for (name, gen), (n, total, worst, collected, over) in sorted(_pauses.items()):
+        lines.append("%-15s %3d %7d %9.2f %9.3f %9.2f %10d %9d" % (
+            name, gen, n, total, total / n, worst, collected, over))
+    lines.append("")
+    lines.append("scene              frames  with GC  GC misses (budget %.1f ms)" % BUDGET_MS)
+    for name, (frames, with_gc, misses) in _frames.items():
+        lines.append("%-15s %9d %8d %10d" % (name or "unknown", frames, with_gc, misses))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _pauses:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_GC"):
+    enable()
+    atexit.register(_report_at_exit)
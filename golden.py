@@ -0,0 +1,299 @@
+# golden.py
+# Pixel Adventures — Golden-image checks of fixed frames of every scene.
+#
+# Each script drives a scene under a seeded RNG and a fake clock that
+# advances exactly FRAME_MS per frame, and collects named virtual canvases:
+# title frames, every class-select state, key cinematic timestamps, town
+# positions, the door fade and interiors. A frame's SHA-1 over its RGB bytes
+# is compared with golden/hashes.json; a mismatching frame is written to
+# golden_diffs/<name>.png as expected | actual | changed pixels in red.
+#
+#   python golden.py               check every frame
+#   python golden.py -k town       only frames whose name contains "town"
+#   python golden.py --update      re-record hashes and reference images
+#
+# Font rasterization differs between pygame/SDL builds, so the hashes are
+# tied to the versions recorded next to them; test_golden.py skips
+# when they don't match this environment.
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, "golden")
+HASHES = os.path.join(GOLDEN_DIR, "hashes.json")
+DIFF_DIR = os.path.join(HERE, "golden_diffs")
+
+VIRTUAL_SIZE = (1024, 576)
+FRAME_MS = 16
+SEED = 1234
+
+_scripts = []   # (name, fn) ; fn(screen) -> {frame name: surface}
+
+
+def script(name):
+    def register(fn):
+        _scripts.append((name, fn))
+        return fn
+    return register
+
+
+class FakeClock:
+    """Clock whose every tick() takes FRAME_MS and may post scripted events.
+
+    `events` maps a frame number (1 = first tick) to key codes posted as
+    KEYDOWN events during that tick, so the scene handles them that frame.
+    """
+
+    def __init__(self, events=None, ms=FRAME_MS):
+        self.ms = ms
+        self.frame = 0
+        self.events = events or {}
+
+    def tick(self, framerate=0):
+        self.frame += 1
+        for key in self.events.get(self.frame, ()):
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+        return self.ms
+
+    tick_busy_loop = tick
+
+    def get_time(self):
+        return self.ms
+
+    def get_rawtime(self):
+        return self.ms
+
+    def get_fps(self):
+        return 1000.0 / self.ms
+
+
+def _run_scene(screen, run, wanted, events, *args):
+    """Run a scene loop, copying the canvas presented on each `wanted` frame."""
+    import presenter
+    shots, count = {}, [0]
+
+    def keep(canvas):
+        count[0] += 1
+        name = wanted.get(count[0])
+        if name:
+            shots[name] = canvas.copy()
+
+    pygame.event.clear()
+    with presenter.tap(keep):
+        run(screen, FakeClock(events), *args)
+    return shots
+
+
+# ─────────────────────────────── scripts ─────────────────────────────────────
+
+@script("title")
+def _title(screen):
+    import title_screen
+    random.seed(SEED)
+    assets = title_screen.load(VIRTUAL_SIZE)
+    wanted = {1: "title/start", 20: "title/bob", 45: "title/prompt_off"}
+    return _run_scene(screen, title_screen.run, wanted, {46: [pygame.K_ESCAPE]}, VIRTUAL_SIZE, assets)
+
+
+@script("class_select")
+def _class_select(screen):
+    import class_select
+    random.seed(SEED)
+    assets = class_select.load(VIRTUAL_SIZE)
+    names = [c["id"] for c in class_select.CLASSES]
+    wanted = {5: "class_select/" + names[0], 12: "class_select/" + names[1],
+              22: "class_select/" + names[2], 35: "class_select/prompt_off"}
+    events = {10: [pygame.K_RIGHT], 20: [pygame.K_RIGHT], 36: [pygame.K_ESCAPE]}
+    return _run_scene(screen, class_select.run, wanted, events, VIRTUAL_SIZE, assets)
+
+
+CINEMATIC_TIMES = (
+    ("establishing", 1.0), ("follow", 5.0), ("meteor", 9.5), ("impact", 11.3),
+    ("destruction", 13.0), ("bedroom", 15.5), ("outside", 19.0), ("end", None),
+)
+
+
+@script("cinematic")
+def _cinematic(screen):
+    import opening_sequence
+    cin = opening_sequence.Cinematic(VIRTUAL_SIZE)
+    shots = {}
+    for name, t in CINEMATIC_TIMES:
+        cin.seek(cin.duration - 0.1 if t is None else t)
+        shots["cinematic/" + name] = cin.render().copy()
+    return shots
+
+
+@script("town")
+def _town(screen):
+    import class_select
+    import odelia
+    import odelia_world as world
+    renderer = odelia.TownRenderer()
+    canvas = pygame.Surface(VIRTUAL_SIZE)
+    w = world.World(class_select.CLASSES[0], seed=SEED)
+    shots = {}
+
+    def shot(name, steps=0, inp=world.Input()):
+        for _ in range(steps):
+            w.step(FRAME_MS / 1000.0, inp)
+        renderer.draw(w.snapshot(), canvas)
+        shots["town/" + name] = canvas.copy()
+
+    shot("start")
+    shot("walk_east", 90, world.Input(1, 0))
+    w.player.topleft = (16, 16)
+    shot("corner", 1)
+    w.player.midtop = (w.buildings[0].door.centerx, w.buildings[0].door.bottom + 30)
+    shot("inn_front", 1)
+    w.transition = world.Transition("to_interior", w.buildings[0])
+    w.fade = 128.0
+    shot("door_fade")
+    w.transition, w.fade = None, 0.0
+    for i, b in enumerate(w.buildings[:3]):
+        w.mode, w.current = "interior", b
+        d = b.interior.door
+        w.player.midbottom = (d.centerx, d.top)
+        shot("interior_%d_%s" % (i, b.kind.lower()), 30, world.Input(0, -1))
+    return shots
+
+
+# ──────────────────────────────── checking ───────────────────────────────────
+
+def environment():
+    try:
+        import numpy
+        np_ver = numpy.__version__
+    except ImportError:
+        np_ver = None
+    return {"pygame": pygame.version.ver, "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "numpy": np_ver}
+
+
+def frame_hash(surf):
+    return hashlib.sha1(pygame.image.tobytes(surf, "RGB")).hexdigest()
+
+
+def _file(name):
+    return name.replace("/", "__") + ".png"
+
+
+def setup():
+    """Initialise pygame for rendering, pinned to the recorded quality."""
+    import quality
+    pygame.init()
+    quality.set_tier("high", "golden")
+    return pygame.display.set_mode((VIRTUAL_SIZE[0] // 4, VIRTUAL_SIZE[1] // 4))
+
+
+def render(patterns=()):
+    """{frame name: surface} for every script matching `patterns`."""
+    screen = setup()
+    frames = {}
+    for name, fn in _scripts:
+        if patterns and not any(p in name or name in p for p in patterns):
+            continue
+        frames.update(fn(screen))
+    if patterns:
+        frames = {k: v for k, v in frames.items() if any(p in k for p in patterns)}
+    return frames
+
+
+def load():
+    try:
+        with open(HASHES) as f:
+            return json.load(f)
+    except OSError:
+        return {"env": None, "frames": {}}
+
+
+def save(frames):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    golden = load()
+    golden["env"] = environment()
+    for name, surf in frames.items():
+        golden["frames"][name] = frame_hash(surf)
+        pygame.image.save(surf, os.path.join(GOLDEN_DIR, _file(name)))
+    golden["frames"] = dict(sorted(golden["frames"].items()))
+    with open(HASHES, "w") as f:
+        json.dump(golden, f, indent=1)
+        f.write("\n")
+
+
+def write_diff(name, actual):
+    """Write expected | actual | changed pixels; return the changed count."""
+    path = os.path.join(GOLDEN_DIR, _file(name))
+    expected = pygame.image.load(path) if os.path.exists(path) else pygame.Surface(actual.get_size())
+    expected = expected.convert(actual)
+    w, h = actual.get_size()
+    delta = expected.copy()
+    delta.blit(actual, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+    other = actual.copy()
+    other.blit(expected, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+    delta.blit(other, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+    same = pygame.mask.from_threshold(delta, (0, 0, 0), (1, 1, 1, 255))
+    same.invert()
+    changed = same.count()
+
+    out = pygame.Surface((w * 3, h))
+    out.blit(expected, (0, 0))
+    out.blit(actual, (w, 0))
+    dim = actual.copy()
+    dim.fill((80, 80, 80), special_flags=pygame.BLEND_RGB_MULT)
+    out.blit(dim, (w * 2, 0))
+    out.blit(same.to_surface(setcolor=(255, 0, 0), unsetcolor=None), (w * 2, 0))
+    os.makedirs(DIFF_DIR, exist_ok=True)
+    pygame.image.save(out, os.path.join(DIFF_DIR, _file(name)))
+    return changed
+
+
+def check(frames, golden=None, out=sys.stdout):
+    """Compare `frames` with the golden hashes; return the failing names."""
+    golden = golden or load()
+    failed = []
+    for name, surf in sorted(frames.items()):
+        want = golden["frames"].get(name)
+        if want is None:
+            print("%-34s no golden hash (run --update)" % name, file=out)
+            failed.append(name)
+        elif frame_hash(surf) != want:
+            changed = write_diff(name, surf)
+            print("%-34s DIFFERS in %d pixels -> %s" % (name, changed, os.path.join(DIFF_DIR, _file(name))),
+                  file=out)
+            failed.append(name)
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pixel Adventures golden-image frames")
+    ap.add_argument("-k", dest="patterns", action="append", default=[],
+                    help="only frames whose name contains this (repeatable)")
+    ap.add_argument("--update", action="store_true", help="re-record the golden hashes and images")
+    args = ap.parse_args(argv)
+
+    frames = render(args.patterns)
+    if args.update:
+        save(frames)
+        print("recorded %d frames in %s" % (len(frames), GOLDEN_DIR))
+        return 0
+    golden = load()
+    if golden["env"] != environment():
+        print("warning: golden frames were recorded with %s, this is %s" % (golden["env"], environment()))
+    failed = check(frames, golden)
+    print("%d frames, %d differ" % (len(frames), len(failed)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# latency.py
+# Pixel Adventures — Input-to-display latency per scene and pacing mode.
+#
+# For every press-like input event (key, button, touch, hat) this records
+# how long it took until the first frame presented after the scene handled
+# it had been flipped. SDL does not tell pygame when an event arrived, only
+# that it arrived between two event polls, so each event is dated to the
+# middle of that window ("latency") and to its start ("worst"). Every
+# sample also splits its frame into the stages the lag can come from:
+#   queue  waiting for the next poll, mostly the clock.tick sleep
+#   work   poll to present(): event handling, key.get_pressed, update, draw
+#   scale  scaling the virtual canvas to the window
+#   flip   display.flip, including any vsync wait
+# Samples are grouped by scene and pacing mode (sleep/busy/vsync, or idle
+# when the frame was throttled).
+#
+# Off by default. PIXEL_LATENCY=1 enables it and prints the report at exit;
+# PIXEL_LATENCY_REPORT=<path> writes the report there instead.
+
+import atexit
+import contextlib
+import os
+import statistics
+import sys
+import time
+
+import pygame
+
+PRESS_EVENTS = frozenset((
+    pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.JOYBUTTONDOWN,
+    pygame.JOYHATMOTION, pygame.FINGERDOWN,
+))
+
+_enabled = False
+_scene = None
+_mode = None
+_polls = (None, None)   # (previous, latest) event poll times
+_pending = []           # (window start, window end) of handled inputs
+_samples = {}           # (scene, mode) -> [(latency, worst, queue, work, scale, flip)] ms
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def polled(mode, now=None):
+    """The scene loop is about to read its events (called by the pacer)."""
+    global _polls, _mode
+    if _enabled:
+        _polls = (_polls[1], now or time.perf_counter())
+        _mode = mode
+
+
+def event(e):
+    """An input event was handed to the scene (called by presenter)."""
+    if not _enabled or e.type not in PRESS_EVENTS:
+        return
+    start, end = _polls
+    if end is None:   # no pacer: date it to now
+        start = end = time.perf_counter()
+    _pending.append((start if start is not None else end, end))
+
+
+def presented(start, scaled, flipped):
+    """A frame went out: present() began at `start`, scaled, then flipped."""
+    global _pending
+    if not _pending:
+        return
+    poll = _polls[1] if _polls[1] is not None else start
+    rows = _samples.setdefault((_scene or "unknown", _mode or "unpaced"), [])
+    work, scale, flip = (start - poll) * 1e3, (scaled - start) * 1e3, (flipped - scaled) * 1e3
+    for lo, hi in _pending:
+        arrived = (lo + hi) / 2
+        rows.append(((flipped - arrived) * 1e3, (flipped - lo) * 1e3,
+                     (poll - arrived) * 1e3, work, scale, flip))
+    _pending = []
+
+
+@contextlib.contextmanager
+def scene(name):
+    """Group samples under `name`; inputs still pending are dropped with it."""
+    global _scene, _pending
+    _scene = name
+    try:
+        yield
+    finally:
+        _scene = None
+        _pending = []
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def report():
+    lines = ["scene           mode      inputs    p50    p90    p99  worst |"
+             "  queue   work  scale   flip   (ms, stage means)"]
+    for (name, mode), rows in sorted(_samples.items()):
+        lat = [r[0] for r in rows]
+        means = [statistics.fmean(r[i] for r in rows) for i in range(2, 6)]
+        lines.append("%-15s %-8s %7d %6.1f %6.1f %6.1f %6.1f | %6.1f %6.1f %6.1f %6.1f" % (
+            name, mode, len(rows), _percentile(lat, 0.5), _percentile(lat, 0.9),
+            _percentile(lat, 0.99), max(r[1] for r in rows), *means))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if not _samples:
+        return
+    path = os.environ.get("PIXEL_LATENCY_REPORT")
+    if path:
+        with open(path, "w") as f:
+            f.write(report() + "\n")
+    else:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_LATENCY") or os.environ.get("PIXEL_LATENCY_REPORT"):
+    enable()
+    atexit.register(_report_at_exit)
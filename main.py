@@ -1,30 +1,57 @@
 # main.py
 # Pixel Adventures — Flow: Title -> Class Select -> Odelia -> Title
 
+import logging
+import os
 import sys
 import pygame
+import assetgen
 import title_screen
 import class_select
 import opening_sequence
 import odelia
+import gcwatch
+import pacing
+import quality
+import resolution
+import scenes
 
 VIRTUAL_SIZE = title_screen.VIRTUAL_SIZE
 CAPTION = "Pixel Adventures"
 
 def main():
+    logging.basicConfig(level=os.environ.get("PIXEL_LOG", "WARNING").upper())
     pygame.init()
     pygame.display.set_caption(CAPTION)
-    screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-    clock = pygame.time.Clock()
+    screen = pacing.set_mode((0, 0), pygame.FULLSCREEN)
+    # the pacer decides how frames wait and reports their work times to the
+    # dynamic resolution controller
+    resolution.install()
+    clock = pacing.install(pygame.time.Clock())
+    # particle counts, NPCs etc. follow a quality tier; the first launch on a
+    # machine benchmarks it and remembers the result
+    quality.install()
+    # full collections wait for scene transitions; scene assets get frozen
+    gcwatch.install()
+
+    # Rasterize the procedural art up front, spread across worker processes
+    assetgen.prewarm()
+
+    manager = scenes.SceneManager(VIRTUAL_SIZE)
+    # menus and the town may throttle while nobody plays; the cinematic never does
+    manager.register("title", title_screen.load, title_screen.run, idle_fps=pacing.IDLE_FPS)
+    manager.register("class_select", class_select.load, class_select.run, idle_fps=pacing.IDLE_FPS)
+    manager.register("opening", opening_sequence.load, opening_sequence.run)
+    manager.register("odelia", odelia.load, odelia.run, idle_fps=pacing.IDLE_FPS)
 
     while True:
         # Title
-        r = title_screen.run(screen, clock, VIRTUAL_SIZE)
+        r = manager.run("title", screen, clock)
         if r == "quit":
             break
 
         # Class Select
-        choice = class_select.run(screen, clock, VIRTUAL_SIZE)
+        choice = manager.run("class_select", screen, clock)
         if choice in ("quit", "back"):
             if choice == "quit":
                 break
@@ -32,10 +59,10 @@ def main():
                 continue
 
         # Opening sequence (battle/introduction)
-        opening_sequence.run(screen, clock, VIRTUAL_SIZE)
+        manager.run("opening", screen, clock)
 
         # Odelia town
-        r = odelia.run(screen, clock, choice, VIRTUAL_SIZE)
+        r = manager.run("odelia", screen, clock, choice)
         if r == "quit":
             break
         # if "title", loop restarts at title
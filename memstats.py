@@ -0,0 +1,216 @@
+# memstats.py
+# Pixel Adventures — Surface memory accounting and per-scene memory report.
+#
+# Off by default. Enable with PIXEL_MEMSTATS=1 (report printed at exit, or
+# written to the path given in PIXEL_MEMSTATS_REPORT) or by calling enable().
+# While disabled, track() hands the surface straight back and scene() is a
+# no-op context, so instrumented call sites cost nothing.
+
+import atexit
+import contextlib
+import os
+import sys
+import time
+import tracemalloc
+import weakref
+
+import pygame
+
+_enabled = False
+_next_id = 0
+_live = {}        # record id -> record dict, surfaces still alive
+_scenes = []      # finished scene summaries, in order
+_current = None   # open scene summary
+_surface_bytes = 0
+_lifetimes = {}   # owner key -> [freed, total s, shortest s, longest s]
+
+
+def enabled():
+    return _enabled
+
+
+def enable(frames=1):
+    """Start recording surfaces and sampling tracemalloc/RSS."""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def rss_bytes():
+    """Current resident set size, or None if the platform won't say."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def surface_bytes(surf):
+    return surf.get_pitch() * surf.get_height()
+
+
+def _describe(surf):
+    w, h = surf.get_size()
+    fmt = "%dbpp" % surf.get_bitsize()
+    if surf.get_flags() & pygame.SRCALPHA:
+        fmt += " SRCALPHA"
+    return (w, h), fmt
+
+
+def _released(rid):
+    global _surface_bytes
+    rec = _live.pop(rid, None)
+    if rec is None:
+        return
+    _surface_bytes -= rec["bytes"]
+    life = time.perf_counter() - rec["created"]
+    key = _owner_key(rec)
+    row = _lifetimes.get(key)
+    if row is None:
+        _lifetimes[key] = [1, life, life, life]
+    else:
+        row[0] += 1
+        row[1] += life
+        row[2] = min(row[2], life)
+        row[3] = max(row[3], life)
+    if _current is not None:
+        _current["freed"] += 1
+
+
+def track(surf, owner=None, tag=""):
+    """Register `surf` with the registry and return it unchanged.
+
+    `owner` defaults to the calling module's name. The record lives until the
+    surface is garbage collected.
+    """
+    if not _enabled:
+        return surf
+    global _next_id, _surface_bytes
+    if owner is None:
+        owner = sys._getframe(1).f_globals.get("__name__", "?")
+    size, fmt = _describe(surf)
+    rid = _next_id
+    _next_id += 1
+    rec = {
+        "owner": owner,
+        "tag": tag,
+        "size": size,
+        "format": fmt,
+        "bytes": surface_bytes(surf),
+        "created": time.perf_counter(),
+        "scene": _current["name"] if _current else None,
+    }
+    _live[rid] = rec
+    _surface_bytes += rec["bytes"]
+    # keep records of surfaces still alive at exit for the final report
+    weakref.finalize(surf, _released, rid).atexit = False
+    if _current is not None:
+        _current["created"] += 1
+        _current["surface_peak"] = max(_current["surface_peak"], _surface_bytes)
+    return surf
+
+
+def live_surfaces():
+    """Snapshot of records for surfaces that are still alive."""
+    return list(_live.values())
+
+
+def _owner_key(rec):
+    return rec["owner"] + (":" + rec["tag"] if rec["tag"] else "")
+
+
+def _by_owner(records):
+    out = {}
+    for rec in records:
+        key = _owner_key(rec)
+        n, b = out.get(key, (0, 0))
+        out[key] = (n + 1, b + rec["bytes"])
+    return sorted(out.items(), key=lambda kv: -kv[1][1])
+
+
+@contextlib.contextmanager
+def scene(name):
+    """Bracket one scene visit; samples memory at entry and exit."""
+    if not _enabled:
+        yield
+        return
+    global _current
+    tracemalloc.reset_peak()
+    heap, _ = tracemalloc.get_traced_memory()
+    prev = _current
+    _current = {
+        "name": name,
+        "start": time.perf_counter(),
+        "heap_start": heap,
+        "rss_start": rss_bytes(),
+        "surface_start": _surface_bytes,
+        "surface_peak": _surface_bytes,
+        "created": 0,
+        "freed": 0,
+    }
+    try:
+        yield
+    finally:
+        summary = _current
+        _current = prev
+        heap, heap_peak = tracemalloc.get_traced_memory()
+        summary.update({
+            "seconds": time.perf_counter() - summary["start"],
+            "heap_end": heap,
+            "heap_peak": heap_peak,
+            "rss_end": rss_bytes(),
+            "surface_end": _surface_bytes,
+            "retained_owners": _by_owner(r for r in _live.values() if r["scene"] == name),
+        })
+        _scenes.append(summary)
+
+
+def _mb(n):
+    return "   n/a" if n is None else "%6.1f" % (n / (1024 * 1024))
+
+
+def report():
+    """Human-readable per-scene report of peak and retained memory (MB)."""
+    lines = ["scene            secs   heap-peak  heap-retained  surf-peak  surf-retained    rss-end  +surf  -surf"]
+    for s in _scenes:
+        lines.append("%-14s %6.1f    %s         %s     %s         %s     %s  %5d  %5d" % (
+            s["name"], s["seconds"],
+            _mb(s["heap_peak"]), _mb(s["heap_end"] - s["heap_start"]),
+            _mb(s["surface_peak"]), _mb(s["surface_end"] - s["surface_start"]),
+            _mb(s["rss_end"]), s["created"], s["freed"],
+        ))
+        for owner, (n, b) in s["retained_owners"][:5]:
+            lines.append("    retained %-34s %4d surf %s MB" % (owner, n, _mb(b)))
+    lines.append("live surfaces: %d, %s MB" % (len(_live), _mb(_surface_bytes).strip()))
+    for owner, (n, b) in _by_owner(_live.values())[:10]:
+        lines.append("    %-43s %4d surf %s MB" % (owner, n, _mb(b)))
+    if _lifetimes:
+        # many short-lived surfaces from one owner is per-frame churn
+        lines.append("freed surfaces              freed   mean life s   shortest s   longest s")
+        for owner, (n, total, lo, hi) in sorted(_lifetimes.items(), key=lambda kv: -kv[1][0])[:10]:
+            lines.append("    %-22s %7d %13.3f %12.4f %11.2f" % (owner, n, total / n, lo, hi))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if not _scenes:
+        return
+    path = os.environ.get("PIXEL_MEMSTATS_REPORT")
+    if path:
+        with open(path, "w") as f:
+            f.write(report() + "\n")
+    else:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_MEMSTATS"):
+    enable()
+    atexit.register(_report_at_exit)
@@ -0,0 +1,114 @@
+# navgrid.py
+# Pixel Adventures — Grid navigation with shared flow fields.
+#
+# A NavGrid rasterizes solid rects into walkable cells once. field(point)
+# runs a single breadth-first search outward from the target and stores, for
+# every reachable cell, which neighbour is one step closer. Fields are cached
+# per target cell, so any number of walkers heading to the same place share
+# one field, and each walker's step is a single table lookup.
+
+from collections import deque
+
+CELL = 8
+STAY = 8          # direction code of the target cell itself
+UNREACHABLE = 255
+
+# neighbour offsets; index is the direction code stored in a field
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    """Per-cell next step toward one target cell of a NavGrid."""
+    __slots__ = ("grid", "target", "point", "dirs")
+
+    def __init__(self, grid, target, point, dirs):
+        self.grid = grid
+        self.target = target    # (cx, cy)
+        self.point = point      # the world point the field was asked for
+        self.dirs = dirs
+
+    def direction(self, x, y):
+        """Direction code at world point (x, y)."""
+        grid = self.grid
+        cx, cy = int(x) // grid.cell, int(y) // grid.cell
+        if 0 <= cx < grid.cols and 0 <= cy < grid.rows:
+            return self.dirs[cy * grid.cols + cx]
+        return UNREACHABLE
+
+    def waypoint(self, x, y):
+        """Centre of the next cell toward the target, None once there.
+
+        Returns False where the target cannot be reached from (x, y).
+        """
+        d = self.direction(x, y)
+        if d == STAY:
+            return None
+        if d == UNREACHABLE:
+            return False
+        grid = self.grid
+        dx, dy = DIRS[d]
+        half = grid.cell // 2
+        return ((int(x) // grid.cell + dx) * grid.cell + half,
+                (int(y) // grid.cell + dy) * grid.cell + half)
+
+
+class NavGrid:
+    """Walkable cells of a `size` world with `solids` blocked.
+
+    `clearance` grows every solid so a walker's centre following the cells
+    keeps its body out of walls.
+    """
+
+    def __init__(self, size, solids, cell=CELL, clearance=4):
+        self.cell = cell
+        self.cols = -(-size[0] // cell)
+        self.rows = -(-size[1] // cell)
+        self.walkable = bytearray(b"\x01") * (self.cols * self.rows)
+        for solid in solids:
+            r = solid.inflate(clearance * 2, clearance * 2)
+            for cy in range(max(0, r.top // cell), min(self.rows, -(-r.bottom // cell))):
+                row = cy * self.cols
+                for cx in range(max(0, r.left // cell), min(self.cols, -(-r.right // cell))):
+                    self.walkable[row + cx] = 0
+        self._fields = {}
+
+    def cell_of(self, point):
+        return (min(self.cols - 1, max(0, int(point[0]) // self.cell)),
+                min(self.rows - 1, max(0, int(point[1]) // self.cell)))
+
+    def field(self, point):
+        """The (cached) flow field toward world `point`."""
+        target = self.cell_of(point)
+        f = self._fields.get(target)
+        if f is None:
+            f = self._fields[target] = FlowField(self, target, point, self._search(target))
+        return f
+
+    def _search(self, target):
+        cols, rows, walkable = self.cols, self.rows, self.walkable
+        dirs = bytearray([UNREACHABLE]) * (cols * rows)
+        start = target[1] * cols + target[0]
+        dirs[start] = STAY
+        frontier = deque([target])
+        # walk outward; a newly reached cell points back at the cell it was
+        # reached from, which is one step closer to the target
+        back = [DIRS.index((-dx, -dy)) for dx, dy in DIRS]
+        while frontier:
+            cx, cy = frontier.popleft()
+            for code, (dx, dy) in enumerate(DIRS):
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < cols and 0 <= ny < rows):
+                    continue
+                i = ny * cols + nx
+                if dirs[i] != UNREACHABLE or not walkable[i]:
+                    continue
+                # no cutting corners past a blocked cell
+                if dx and dy and not (walkable[cy * cols + nx] and walkable[ny * cols + cx]):
+                    continue
+                dirs[i] = back[code]
+                frontier.append((nx, ny))
+        return dirs
+
+    def clear(self):
+        self._fields.clear()
+
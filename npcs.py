@@ -1,75 +1,155 @@
+import math
 import pygame
 import random
+import assetgen
+import memstats
+import palette
 
 ICON_W, ICON_H = 16, 24
 
+# palette slots of the shared townsfolk layout; kinds only differ in these
+SKIN_SLOT, HAIR_SLOT, OUTFIT_SLOT, OUTLINE_SLOT = 1, 2, 3, 4
 
-def _simple_sprite(skin, hair, outfit, frame):
-    s = pygame.Surface((ICON_W, ICON_H), pygame.SRCALPHA)
-    pygame.draw.rect(s, hair, (4, 0, 8, 4))
-    pygame.draw.rect(s, skin, (4, 4, 8, 4))
-    pygame.draw.rect(s, outfit, (3, 8, 10, 8))
-    pygame.draw.rect(s, (0, 0, 0), (3, 8, 10, 8), 1)
+
+@assetgen.cached
+def _layout(frame):
+    """8-bit townsperson pixels for walk `frame`, colours left to the palette."""
+    s = memstats.track(palette.layout((ICON_W, ICON_H)), tag="sprite")   # every slot black
+    pygame.draw.rect(s, HAIR_SLOT, (4, 0, 8, 4))
+    pygame.draw.rect(s, SKIN_SLOT, (4, 4, 8, 4))
+    pygame.draw.rect(s, OUTFIT_SLOT, (3, 8, 10, 8))
+    pygame.draw.rect(s, OUTLINE_SLOT, (3, 8, 10, 8), 1)
     ly, ry = (16, 18) if frame % 2 else (18, 16)
-    pygame.draw.rect(s, outfit, (4, ly, 4, 6))
-    pygame.draw.rect(s, outfit, (8, ry, 4, 6))
+    pygame.draw.rect(s, OUTFIT_SLOT, (4, ly, 4, 6))
+    pygame.draw.rect(s, OUTFIT_SLOT, (8, ry, 4, 6))
     return s
 
+
+@assetgen.cached
+def _simple_sprite(skin, hair, outfit, frame):
+    """Walk `frame` in these colours: a palette swap of the shared layout."""
+    return memstats.track(
+        palette.variant(_layout(frame), {SKIN_SLOT: skin, HAIR_SLOT: hair, OUTFIT_SLOT: outfit}),
+        tag="sprite")
+
 SKIN = (255, 224, 189)
 
-SPRITES = {
-    "male": [_simple_sprite(SKIN, (80, 50, 20), (60, 80, 180), f) for f in (0, 1)],
-    "female": [_simple_sprite(SKIN, (240, 200, 80), (200, 80, 120), f) for f in (0, 1)],
-    "innkeeper": [_simple_sprite(SKIN, (90, 50, 20), (40, 160, 40), f) for f in (0, 1)],
-    "shopkeeper": [_simple_sprite(SKIN, (30, 30, 30), (160, 140, 60), f) for f in (0, 1)],
+# kind -> (skin, hair, outfit); adding a kind only costs a palette swap
+KINDS = {
+    "male": (SKIN, (80, 50, 20), (60, 80, 180)),
+    "female": (SKIN, (240, 200, 80), (200, 80, 120)),
+    "innkeeper": (SKIN, (90, 50, 20), (40, 160, 40)),
+    "shopkeeper": (SKIN, (30, 30, 30), (160, 140, 60)),
 }
 
 
+class _SpriteTable(dict):
+    """kind -> walk frames, rasterized on first use (or by assetgen.prewarm)."""
+
+    def __missing__(self, kind):
+        frames = self[kind] = [_simple_sprite(*KINDS[kind], f) for f in (0, 1)]
+        return frames
+
+
+SPRITES = _SpriteTable()
+
+LINGER = (4.0, 10.0)   # seconds an errand-running NPC stays before moving on
+HEADINGS = (-1, 0, 1)  # per-axis choices for a wandering step
+
+
 def sprite(kind, frame=0):
     return SPRITES[kind][frame % 2]
 
 
 class NPC:
-    def __init__(self, pos, kind="male", radius=40, speed=20):
+    """A townsperson. Pure state: drawing looks up the sprite.
+
+    Without a destination the NPC wanders around `anchor`. go_to(field)
+    sends it along a navgrid.FlowField; on arrival the target becomes its
+    new anchor. With `errands` (a list of flow fields) it lingers a while,
+    then sets off to a random one of them.
+    """
+
+    def __init__(self, pos, kind="male", radius=40, speed=20, rng=random, errands=()):
         self.rect = pygame.Rect(pos[0], pos[1], 8, 8)
+        self.pos = pygame.Vector2(pos)   # sub-pixel top-left
         self.kind = kind
-        self.frames = SPRITES[kind]
-        self.anchor = pygame.Vector2(pos)
+        self.rng = rng
+        self.anchor = pygame.Vector2(self.rect.center)
         self.radius = radius
         self.speed = speed
         self.dir = pygame.Vector2(0, 0)
         self.change = 0.0
         self.anim_t = 0.0
         self.frame = 0
+        self.field = None
+        self.errands = list(errands)
+        self.linger = rng.uniform(*LINGER) if errands else 0.0
+
+    def go_to(self, field):
+        self.field = field
 
-    def update(self, dt, obstacles, bounds):
+    def _steer(self, dt):
+        """Pick this step's direction; from the flow field or at random."""
+        if self.field is None and self.errands:
+            self.linger -= dt
+            if self.linger <= 0:
+                self.field = self.rng.choice(self.errands)
+        if self.field is not None:
+            cx, cy = self.rect.center
+            wp = self.field.waypoint(cx, cy)
+            if wp:
+                self.dir.update(wp[0] - cx, wp[1] - cy)
+                if self.dir.length_squared() > 0:
+                    self.dir.normalize_ip()
+                return
+            # arrived (None) or cut off from the target (False)
+            self.anchor.update(self.rect.center)
+            self.field = None
+            self.linger = self.rng.uniform(*LINGER)
+            self.change = 0.0
         self.change -= dt
         if self.change <= 0:
-            self.change = random.uniform(1.0, 3.0)
-            self.dir = pygame.Vector2(random.choice([-1, 0, 1]), random.choice([-1, 0, 1]))
+            rng = self.rng
+            self.change = rng.uniform(1.0, 3.0)
+            self.dir.update(rng.choice(HEADINGS), rng.choice(HEADINGS))
             if self.dir.length_squared() > 0:
-                self.dir = self.dir.normalize()
-        move = self.dir * self.speed * dt
-        self.rect.x += int(round(move.x))
-        for o in obstacles:
-            if self.rect.colliderect(o):
-                if move.x > 0:
-                    self.rect.right = o.left
-                elif move.x < 0:
-                    self.rect.left = o.right
-        self.rect.y += int(round(move.y))
-        for o in obstacles:
-            if self.rect.colliderect(o):
-                if move.y > 0:
-                    self.rect.bottom = o.top
-                elif move.y < 0:
-                    self.rect.top = o.bottom
-        self.rect.clamp_ip(bounds)
-        offset = pygame.Vector2(self.rect.center) - self.anchor
-        if offset.length() > self.radius:
-            offset.scale_to_length(self.radius)
-            self.rect.center = (int(self.anchor.x + offset.x), int(self.anchor.y + offset.y))
-        if self.dir.length_squared() > 0:
+                self.dir.normalize_ip()
+
+    def update(self, dt, tiles, bounds):
+        """Walk one step; `tiles` is the tilemap.Tilemap to collide with, or None."""
+        # scalars and in-place updates only: this runs for every NPC, every
+        # frame, and should not create objects (see allocs.py)
+        self._steer(dt)
+        d = self.dir
+        step = self.speed * dt
+        mx, my = d.x * step, d.y * step
+        rect, pos = self.rect, self.pos
+        # the rect only runs into a new tile when its pixel position changes
+        pos.x += mx
+        x = int(pos.x)
+        if x != rect.x:
+            rect.x = x
+            if tiles is not None and tiles.push_x(rect, mx):
+                pos.x = rect.x
+        pos.y += my
+        y = int(pos.y)
+        if y != rect.y:
+            rect.y = y
+            if tiles is not None and tiles.push_y(rect, my):
+                pos.y = rect.y
+        rect.clamp_ip(bounds)
+        if self.field is None:
+            anchor, radius = self.anchor, self.radius
+            ox, oy = rect.centerx - anchor.x, rect.centery - anchor.y
+            dist2 = ox * ox + oy * oy
+            if dist2 > radius * radius:
+                k = radius / math.sqrt(dist2)
+                rect.centerx = int(anchor.x + ox * k)
+                rect.centery = int(anchor.y + oy * k)
+        if rect.x != int(pos.x) or rect.y != int(pos.y):
+            pos.update(rect.x, rect.y)
+        if d.x or d.y:
             self.anim_t += dt * 4
             self.frame = int(self.anim_t) % 2
         else:
@@ -77,6 +157,6 @@ class NPC:
             self.frame = 0
 
     def draw(self, surf, offset):
-        sp = self.frames[self.frame]
-        rect = sp.get_rect(midbottom=(self.rect.centerx - offset[0], self.rect.bottom - offset[1]))
-        surf.blit(sp, rect)
+        sp = SPRITES[self.kind][self.frame]
+        rect = self.rect
+        surf.blit(sp, (rect.centerx - offset[0] - sp.get_width() // 2, rect.bottom - offset[1] - sp.get_height()))
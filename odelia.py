@@ -6,16 +6,36 @@ building has a door that lets the player enter an interior room. The camera
 follows the player around the town, scrolling the view when the player moves
 close to the edges of the screen.  The town layout includes roads, trees and
 other small details for a more lively appearance.
+
+The simulation lives in odelia_world.World; this module only draws it and
+feeds it keyboard input. The town is saved (savegame.py) when the scene
+is left and resumed on the next visit with the same class during this
+session; a save from an earlier run is only resumed with PIXEL_RESUME=1.
+F5 saves and F8 loads in place.
 """
 
+import contextlib
+import os
+
 import pygame
-from typing import List
-import random
+import allocs
+import assetgen
 import buildings as bld
 import class_select
+import memstats
 import npcs
+import odelia_world as world
+import overlays
+import pacing
+import presenter
+import resolution
+import savegame
+import tilemap
+from odelia_world import WORLD_W, WORLD_H, INTERIOR_SIZE, INTERIOR_WALL
 
 VIRTUAL_SIZE = (1024, 576)
+SIM_THREAD = os.environ.get("PIXEL_SIM_THREAD") == "1"
+RESUME = os.environ.get("PIXEL_RESUME") == "1"   # also resume saves from earlier runs
 
 # --- player sprite helper ---------------------------------------------------
 
@@ -23,23 +43,24 @@ def _player_sprite_for(cid, color):
     """Return walk animation frames for the chosen class."""
     return [class_select._class_icon(cid, color, with_panel=False, frame=f) for f in (0, 1)]
 
-# --- Town data --------------------------------------------------------------
+# --- Town art ---------------------------------------------------------------
 
-WORLD_W, WORLD_H = 1200, 960
+FLOOR_COLORS = [
+    (190, 170, 120),
+    (170, 170, 190),
+    (150, 180, 150),
+    (190, 170, 170),
+]
 
 
-def _make_interior(size, floor_color):
-    """Return interior data for a building.
-
-    The interior consists of a pre-rendered surface with simple walls and a
-    doorway, as well as the rectangle representing that doorway for
-    interaction logic.
-    """
-    surf = pygame.Surface(size)
+@assetgen.cached
+def _interior_surface(size, floor_color):
+    """Pre-rendered interior room with simple walls and a doorway."""
+    surf = memstats.track(pygame.Surface(size), tag="interior")
     surf.fill(floor_color)
 
     wall_color = (120, 80, 40)
-    t = 8  # wall thickness
+    t = INTERIOR_WALL
     # Walls
     pygame.draw.rect(surf, wall_color, (0, 0, size[0], t))  # top
     pygame.draw.rect(surf, wall_color, (0, 0, t, size[1]))  # left
@@ -47,269 +68,308 @@ def _make_interior(size, floor_color):
     pygame.draw.rect(surf, wall_color, (0, size[1] - t, size[0], t))  # bottom
 
     # Doorway centered along the bottom wall
-    door = pygame.Rect(size[0] // 2 - 8, size[1] - t, 16, t)
-    pygame.draw.rect(surf, (100, 70, 40), door)
-
-    return {"size": size, "door": door, "surface": surf}
-
-
-def _make_buildings() -> List[dict]:
-    """Create all town buildings with an asymmetrical layout.
-
-    There is a single inn and item shop; the rest are homes.  Building
-    positions are hand-tuned for the larger world size.
-    """
-
-    layout = [
-        (bld.Inn, (500, 420)),
-        (bld.ItemShop, (660, 420)),
-        (bld.House, (360, 360)),
-        (bld.House, (760, 360)),
-        (bld.House, (420, 620)),
-        (bld.House, (720, 620)),
-        (bld.House, (240, 420)),
-        (bld.House, (900, 420)),
-        (bld.House, (520, 260)),
-        (bld.House, (640, 700)),
-    ]
-
-    floor_colors = [
-        (190, 170, 120),
-        (170, 170, 190),
-        (150, 180, 150),
-        (190, 170, 170),
-    ]
-
-    result: List[dict] = []
-    for idx, (cls, (bx, by)) in enumerate(layout):
-        bobj = cls()
-        w, h = bobj.size
-        rect = pygame.Rect(bx, by, w, h)
-        solid = bobj.solid.move(bx, by)
-        door = bobj.door.move(bx, by)
-        interior = _make_interior((160, 120), floor_colors[idx % len(floor_colors)])
-        occupants = []
-        if isinstance(bobj, bld.Inn):
-            occupants = [npcs.NPC((80, 60), "innkeeper", radius=20)]
-        elif isinstance(bobj, bld.ItemShop):
-            occupants = [npcs.NPC((80, 60), "shopkeeper", radius=20)]
-        else:
-            occupants = [npcs.NPC((80, 60), random.choice(["male", "female"]))]
-        interior["npcs"] = occupants
-        result.append({
-            "rect": rect,
-            "solid": solid,
-            "door": door,
-            "interior": interior,
-            "surface": bobj.surface,
-        })
-    return result
+    pygame.draw.rect(surf, (100, 70, 40), world.interior_door(size))
+    return surf
+
+
+TERRAIN_COLORS = {
+    tilemap.GRASS: (80, 170, 80),
+    tilemap.ROAD: (150, 140, 120),
+    tilemap.PATH: (170, 145, 100),
+    tilemap.WATER: (60, 110, 190),
+    tilemap.FENCE: (80, 170, 80),   # posts and rails on grass
+}
+CHUNK_TILES = 16   # ground is cached in square chunks of this many tiles
+
+
+@assetgen.cached
+def _tile_surface(terrain):
+    """One tilemap.TILE square of `terrain`."""
+    t = tilemap.TILE
+    s = memstats.track(pygame.Surface((t, t)), tag="tile")
+    s.fill(TERRAIN_COLORS[terrain])
+    if terrain == tilemap.PATH:
+        for x, y in ((3, 4), (13, 2), (8, 11), (16, 15), (4, 17)):
+            pygame.draw.rect(s, (145, 120, 80), (x, y, 2, 2))
+    elif terrain == tilemap.WATER:
+        for x, y in ((2, 5), (11, 13)):
+            pygame.draw.line(s, (110, 160, 230), (x, y), (x + 6, y))
+    elif terrain == tilemap.FENCE:
+        pygame.draw.rect(s, (120, 85, 50), (0, 6, t, 3))
+        pygame.draw.rect(s, (120, 85, 50), (0, 13, t, 3))
+        for x in (2, 12):
+            pygame.draw.rect(s, (100, 70, 40), (x, 3, 4, 16))
+    return s
 
 
+@assetgen.cached
 def _tree_surface():
-    s = pygame.Surface((32, 32), pygame.SRCALPHA)
+    s = memstats.track(pygame.Surface((32, 32), pygame.SRCALPHA), tag="tree")
     pygame.draw.rect(s, (110, 70, 40), (14, 20, 4, 12))
     pygame.draw.circle(s, (40, 120, 40), (16, 16), 12)
     return s
 
 
+@assetgen.cached
 def _bush_surface():
-    s = pygame.Surface((24, 16), pygame.SRCALPHA)
+    s = memstats.track(pygame.Surface((24, 16), pygame.SRCALPHA), tag="bush")
     pygame.draw.ellipse(s, (40, 160, 40), (0, 0, 24, 16))
     pygame.draw.ellipse(s, (30, 120, 30), (0, 0, 24, 16), 2)
     return s
 
 
-def _make_environment():
-    tree = _tree_surface()
-    bush = _bush_surface()
-    trees = [
-        (tree, tree.get_rect(topleft=pos))
-        for pos in [(150, 150), (1000, 180), (300, 780), (950, 760), (1100, 600), (180, 500)]
-    ]
-    bushes = [
-        (bush, bush.get_rect(topleft=pos))
-        for pos in [(400, 540), (650, 540), (500, 300), (700, 300), (500, 800), (650, 820)]
-    ]
-    roads = [
-        pygame.Rect(0, 480, WORLD_W, 40),
-        pygame.Rect(580, 200, 40, WORLD_H - 200),
-    ]
-    return {"trees": trees, "bushes": bushes, "roads": roads}
+# --- Rendering --------------------------------------------------------------
+
+class ScaledArt:
+    """Copies of art surfaces scaled by one factor, made on first use.
+
+    Dynamic resolution draws the same view into a smaller canvas; the
+    copies for the current tier's scale are kept, and a new scale drops
+    them.
+    """
+
+    def __init__(self):
+        self.scale = 1.0
+        self.copies = {}   # original surface -> scaled copy
+
+    def get(self, surf, scale):
+        if scale == 1.0:
+            return surf
+        if scale != self.scale:
+            self.copies.clear()
+            self.scale = scale
+        copy = self.copies.get(surf)
+        if copy is None:
+            w, h = surf.get_size()
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            copy = self.copies[surf] = memstats.track(pygame.transform.scale(surf, size), tag="scaled")
+        return copy
+
+    def clear(self):
+        self.copies.clear()
+
+
+class GroundLayer:
+    """A Tilemap's terrain, drawn from cached chunks of tile art.
+
+    Each CHUNK_TILES square chunk is composed from the tile surfaces the
+    first time it comes into view, so a frame costs one blit per visible
+    chunk. Painting the tilemap drops the chunks.
+    """
+
+    def __init__(self, tiles):
+        self.tiles = tiles
+        self.tile_art = [_tile_surface(i) for i in range(len(tilemap.TERRAINS))]
+        self.chunks = {}
+        self.scaled = ScaledArt()
+        self.revision = tiles.revision
+        self.span = CHUNK_TILES * tiles.tile
+
+    def chunk(self, cx, cy):
+        surf = self.chunks.get((cx, cy))
+        if surf is not None:
+            return surf
+        tiles, t = self.tiles, self.tiles.tile
+        c0, r0 = cx * CHUNK_TILES, cy * CHUNK_TILES
+        c1, r1 = min(tiles.cols, c0 + CHUNK_TILES), min(tiles.rows, r0 + CHUNK_TILES)
+        surf = memstats.track(pygame.Surface(((c1 - c0) * t, (r1 - r0) * t)), tag="ground")
+        art, terrain = self.tile_art, tiles.terrain
+        for ty in range(r0, r1):
+            row = ty * tiles.cols
+            for tx in range(c0, c1):
+                surf.blit(art[terrain[row + tx]], ((tx - c0) * t, (ty - r0) * t))
+        self.chunks[(cx, cy)] = surf
+        return surf
+
+    def prime(self):
+        """Compose every chunk now rather than when it first comes into view."""
+        for cy in range(-(-self.tiles.rows // CHUNK_TILES)):
+            for cx in range(-(-self.tiles.cols // CHUNK_TILES)):
+                self.chunk(cx, cy)
+
+    def draw(self, canvas, cam_x, cam_y, scale=1.0):
+        """Blit the chunks overlapping the view whose top-left is (cam_x, cam_y).
+
+        The view is the canvas size divided by `scale`.
+        """
+        if self.revision != self.tiles.revision:
+            self.chunks.clear()
+            self.scaled.clear()
+            self.revision = self.tiles.revision
+        cw, ch = canvas.get_size()
+        vw, vh = int(cw / scale), int(ch / scale)
+        span = self.span
+        last_x = min(cam_x + vw - 1, self.tiles.size[0] - 1) // span
+        last_y = min(cam_y + vh - 1, self.tiles.size[1] - 1) // span
+        for cy in range(max(0, cam_y // span), last_y + 1):
+            for cx in range(max(0, cam_x // span), last_x + 1):
+                canvas.blit(self.scaled.get(self.chunk(cx, cy), scale),
+                            (int((cx * span - cam_x) * scale), int((cy * span - cam_y) * scale)))
+
+
+class TownRenderer:
+    """Draws a World into a canvas. Reads the world, never changes it."""
+
+    def __init__(self):
+        self.buildings = {kind: bld.art(kind) for kind in bld.KINDS}
+        self.ground = GroundLayer(world.town_tiles())
+        self.interiors = [_interior_surface(INTERIOR_SIZE, c) for c in FLOOR_COLORS]
+        self.tree = _tree_surface()
+        self.bush = _bush_surface()
+        self.overlay = overlays.OverlayCompositor()
+        self.player_sprites = {}   # (class id, colour) -> walk frames
+        self.scaled = ScaledArt()
+
+    def player_frames(self, hero):
+        frames = self.player_sprites.get(hero)
+        if frames is None:
+            frames = self.player_sprites[hero] = _player_sprite_for(*hero)
+        return frames
+
+    def draw(self, snap, canvas, view=None):
+        """Draw a world.Snapshot.
+
+        `view` is the size of the area shown, the canvas size by default; a
+        smaller canvas shows the same area with every piece of art scaled
+        down to fit (the dynamic resolution tiers).
+        """
+        cw, ch = canvas.get_size()
+        vw, vh = view or (cw, ch)
+        scale = cw / vw
+        art = self.scaled.get
+        sprite = art(self.player_frames(snap.hero)[snap.frame], scale)
+        px, py, pw, ph = snap.player
+        if snap.mode == "town":
+            # camera follows the player, clamped to the world
+            cam_x = max(0, min(px + pw // 2 - vw // 2, WORLD_W - vw))
+            cam_y = max(0, min(py + ph // 2 - vh // 2, WORLD_H - vh))
+            self.ground.draw(canvas, cam_x, cam_y, scale)
+            for kind, x, y in snap.facades:
+                canvas.blit(art(self.buildings[kind], scale),
+                            (int((x - cam_x) * scale), int((y - cam_y) * scale)))
+            tree, bush = art(self.tree, scale), art(self.bush, scale)
+            for x, y in world.TREES:
+                canvas.blit(tree, (int((x - cam_x) * scale), int((y - cam_y) * scale)))
+            for x, y in world.BUSHES:
+                canvas.blit(bush, (int((x - cam_x) * scale), int((y - cam_y) * scale)))
+            # world point (x, y) lands on canvas (ox + (x + bx) * scale, ...)
+            ox, oy, bx, by = 0, 0, -cam_x, -cam_y
+        else:
+            surf = art(self.interiors[snap.style % len(self.interiors)], scale)
+            ox, oy = cw // 2 - surf.get_width() // 2, ch // 2 - surf.get_height() // 2
+            bx = by = 0
+            canvas.fill((0, 0, 0))
+            canvas.blit(surf, (ox, oy))
+        # sprites stand on their midbottom point
+        for kind, frame, cx, bottom in snap.npcs:
+            sp = art(npcs.sprite(kind, frame), scale)
+            canvas.blit(sp, (ox + int((cx + bx) * scale) - sp.get_width() // 2,
+                             oy + int((bottom + by) * scale) - sp.get_height()))
+        canvas.blit(sprite, (ox + int((px + pw // 2 + bx) * scale) - sprite.get_width() // 2,
+                             oy + int((py + ph + by) * scale) - sprite.get_height()))
+
+        self.overlay.fade = snap.fade
+        self.overlay.apply(canvas)
+
+
+def read_input(keys, inp=None):
+    """Map the keyboard state to a world Input, filling `inp` if given."""
+    if inp is None:
+        inp = world.Input()
+    inp.x = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
+    inp.y = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+    return inp
 
 # --- Main loop --------------------------------------------------------------
 
-def run(screen, clock, chosen_class, virtual_size=VIRTUAL_SIZE):
-    """Run the Odelia town scene."""
-    vw, vh = virtual_size
-    game_surf = pygame.Surface(virtual_size)
-
-    # Player setup
-    sprite_frames = _player_sprite_for(chosen_class["id"], chosen_class["color"])
-    anim_t = 0.0
-    sprite_frame = 0
-    stats = chosen_class["stats"]
-    speed = 60 * stats.get("spd_mult", 1.0)
-    player = pygame.Rect(WORLD_W // 2 - 4, WORLD_H // 2 - 4, 8, 8)
-
-    buildings = _make_buildings()
-    env = _make_environment()
-
-    town_npcs = [
-        npcs.NPC((400, 500), "male"),
-        npcs.NPC((700, 500), "female"),
-        npcs.NPC((500, 700), "male"),
-        npcs.NPC((800, 400), "female"),
-    ]
-
-    mode = "town"  # or "interior"
-    current_building = None
-    door_cooldown = 0.0
-
-    # Transition/fade state
-    transition = None  # {"type": str, "building": dict, "dir": int}
-    transition_alpha = 0.0
-    fade_surface = pygame.Surface(virtual_size)
-    fade_surface.fill((0, 0, 0))
-    TRANSITION_SPEED = 255 / 0.25  # 0.25 second fade
-
-    while True:
-        dt = clock.tick(60) / 1000.0
-        for e in pygame.event.get():
-            if e.type == pygame.QUIT:
-                return "quit"
-            if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
-                return "title"
-
-        door_cooldown = max(0.0, door_cooldown - dt)
-
-        keys = pygame.key.get_pressed()
-        move = pygame.Vector2(
-            (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a]),
-            (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
-        )
-        if move.length_squared() > 0:
-            move = move.normalize()
-        if transition:
-            move.xy = (0, 0)
-        vel = move * speed * dt
-
-        if mode == "town":
-            # movement and collision
-            player.x += int(round(vel.x))
-            for b in buildings:
-                if player.colliderect(b["solid"]):
-                    if vel.x > 0: player.right = b["solid"].left
-                    elif vel.x < 0: player.left = b["solid"].right
-            player.y += int(round(vel.y))
-            for b in buildings:
-                if player.colliderect(b["solid"]):
-                    if vel.y > 0: player.bottom = b["solid"].top
-                    elif vel.y < 0: player.top = b["solid"].bottom
-            player.clamp_ip(pygame.Rect(0, 0, WORLD_W, WORLD_H))
-
-            # door entry
-            if door_cooldown <= 0 and not transition:
-                for b in buildings:
-                    if player.colliderect(b["door"]):
-                        transition = {"type": "to_interior", "building": b, "dir": 1}
-                        door_cooldown = 0.5
-                        break
-
-            for npc in town_npcs:
-                npc.update(dt, [b["solid"] for b in buildings], pygame.Rect(0, 0, WORLD_W, WORLD_H))
-
-            # camera
-            cam_x = player.centerx - vw // 2
-            cam_y = player.centery - vh // 2
-            cam_x = max(0, min(cam_x, WORLD_W - vw))
-            cam_y = max(0, min(cam_y, WORLD_H - vh))
-
-            # draw town
-            game_surf.fill((80, 170, 80))
-            for r in env["roads"]:
-                pygame.draw.rect(game_surf, (150, 140, 120), (r.x - cam_x, r.y - cam_y, r.w, r.h))
-            for b in buildings:
-                r = b["rect"]
-                game_surf.blit(b["surface"], (r.x - cam_x, r.y - cam_y))
-            for surf, rect in env["trees"]:
-                game_surf.blit(surf, (rect.x - cam_x, rect.y - cam_y))
-            for surf, rect in env["bushes"]:
-                game_surf.blit(surf, (rect.x - cam_x, rect.y - cam_y))
-            for npc in town_npcs:
-                npc.draw(game_surf, (cam_x, cam_y))
-            if move.length_squared() > 0:
-                anim_t += dt * 8
-                sprite_frame = int(anim_t) % len(sprite_frames)
-            else:
-                anim_t = 0.0
-                sprite_frame = 0
-            sprite = sprite_frames[sprite_frame]
-            sprite_rect = sprite.get_rect(midbottom=(player.centerx - cam_x, player.bottom - cam_y))
-            game_surf.blit(sprite, sprite_rect)
-
-        else:  # interior
-            size = current_building["interior"]["size"]
-            interior_rect = pygame.Rect(0, 0, *size)
-
-            player.x += int(round(vel.x))
-            player.y += int(round(vel.y))
-            player.clamp_ip(interior_rect)
-
-            for npc in current_building["interior"]["npcs"]:
-                npc.update(dt, [], interior_rect)
-
-            d = current_building["interior"]["door"]
-            if door_cooldown <= 0 and not transition and player.colliderect(d):
-                # exit to town
-                transition = {"type": "to_town", "building": current_building, "dir": 1}
-                door_cooldown = 0.5
-
-            surf = current_building["interior"]["surface"]
-            surf_rect = surf.get_rect(center=(vw // 2, vh // 2))
-            game_surf.fill((0, 0, 0))
-            game_surf.blit(surf, surf_rect.topleft)
-            for npc in current_building["interior"]["npcs"]:
-                npc.draw(game_surf, (-surf_rect.left, -surf_rect.top))
-            if move.length_squared() > 0:
-                anim_t += dt * 8
-                sprite_frame = int(anim_t) % len(sprite_frames)
+def load(virtual_size=VIRTUAL_SIZE):
+    """Build the town's reusable resources (canvas and the renderer's art)."""
+    world.errand_fields()  # NPC navigation is searched here, not on entry
+    renderer = TownRenderer()
+    renderer.ground.prime()
+    return {
+        "canvas": memstats.track(pygame.Surface(virtual_size), tag="canvas"),
+        "renderer": renderer,
+    }
+
+
+def _resume(chosen_class):
+    """The saved town if it was saved with the same class, else None.
+
+    Only this session's saves count unless PIXEL_RESUME=1: whoever plays
+    next on a shared machine starts a fresh town.
+    """
+    saved = savegame.load(session=not RESUME)
+    if saved is None or saved.chosen_class.get("id") != (chosen_class or {}).get("id"):
+        return None
+    return saved
+
+
+def run(screen, clock, chosen_class, virtual_size=VIRTUAL_SIZE, assets=None):
+    """Run the Odelia town scene.
+
+    With PIXEL_SIM_THREAD=1 the world steps on its own thread (see
+    world.Simulation) and this loop only draws its snapshots.
+    """
+    if assets is None:
+        assets = load(virtual_size)
+    renderer = assets["renderer"]
+    renderer.overlay.clear()
+    town = _resume(chosen_class) or world.World(chosen_class)
+    inp = world.Input()
+    sim = world.Simulation(town).start() if SIM_THREAD else None
+    if sim:
+        sim.input = inp   # filled in place below
+    guard = sim.lock if sim else contextlib.nullcontext()
+    live = None if sim else world.LiveSnapshot()   # refilled every frame
+
+    try:
+        while True:
+            dt = clock.tick(60) / 1000.0
+            for e in pygame.event.get():
+                if presenter.handle_event(e):
+                    continue
+                if e.type == pygame.QUIT:
+                    with guard:
+                        savegame.save(town)
+                    return "quit"
+                if e.type == pygame.KEYDOWN:
+                    if e.key == pygame.K_ESCAPE:
+                        with guard:
+                            savegame.save(town)
+                        return "title"
+                    if e.key == pygame.K_F5:
+                        with guard:
+                            savegame.save(town)
+                    elif e.key == pygame.K_F8:
+                        savegame.flush()
+                        town = _resume(chosen_class) or town
+                        if sim:
+                            sim.replace(town)
+
+            keys = pygame.key.get_pressed()
+            if sim:
+                read_input(keys, inp)
+                snap = sim.snapshot
             else:
-                anim_t = 0.0
-                sprite_frame = 0
-            sprite = sprite_frames[sprite_frame]
-            sprite_rect = sprite.get_rect(midbottom=(player.centerx + surf_rect.left, player.bottom + surf_rect.top))
-            game_surf.blit(sprite, sprite_rect)
-
-        # handle transition fade
-        if transition:
-            transition_alpha += TRANSITION_SPEED * dt * transition["dir"]
-            if transition["dir"] == 1 and transition_alpha >= 255:
-                transition_alpha = 255
-                if transition["type"] == "to_interior":
-                    current_building = transition["building"]
-                    d = current_building["interior"]["door"]
-                    player = pygame.Rect(0, 0, 8, 8)
-                    player.midbottom = (d.centerx, d.top)
-                    mode = "interior"
-                    door_cooldown = 0.5
-                else:
-                    bldg = transition["building"]
-                    player = pygame.Rect(0, 0, 8, 8)
-                    player.midtop = (bldg["door"].centerx, bldg["door"].bottom)
-                    current_building = None
-                    mode = "town"
-                    door_cooldown = 0.5
-                transition["dir"] = -1
-            elif transition["dir"] == -1 and transition_alpha <= 0:
-                transition_alpha = 0
-                transition = None
-
-        if transition:
-            fade_surface.set_alpha(int(transition_alpha))
-            game_surf.blit(fade_surface, (0, 0))
-
-        pygame.transform.scale(game_surf, screen.get_size(), screen)
-        pygame.display.flip()
+                with allocs.region("odelia.update"):
+                    read_input(keys, inp)
+                    town.step(dt, inp)
+                    snap = town.snapshot_into(live)
+            if inp.x or inp.y:
+                # held keys send no events; walking is still playing
+                pacing.activity()
+
+            # the canvas follows the dynamic resolution tier; the view of the
+            # town stays virtual_size and is drawn scaled down into it
+            size = resolution.size(virtual_size)
+            game_surf = assets["canvas"]
+            if game_surf.get_size() != size:
+                game_surf = assets["canvas"] = memstats.track(pygame.Surface(size), tag="canvas")
+            renderer.draw(snap, game_surf, virtual_size)
+            presenter.present(screen, game_surf)
+    finally:
+        if sim:
+            sim.stop()
 
 # End of odelia.py
@@ -0,0 +1,460 @@
+# odelia_world.py
+"""Headless simulation of the Odelia town.
+
+`World` holds everything that changes while the player walks around:
+player position and animation frame, the wandering NPCs, which building the
+player is in, and the door fade. `World.step(dt, inp)` advances it by one
+frame from an `Input`. Nothing here creates surfaces or needs a display;
+odelia.py draws a World, and other front ends (tests, load generators,
+replays) can drive it directly.
+
+Renderers read a `Snapshot` of the world rather than the World itself.
+`Simulation` steps a World at a fixed rate on its own thread and publishes
+a fresh Snapshot after every step; snapshots are immutable, so the thread
+can build the next one while the renderer is still drawing the last. A
+renderer that steps the World itself refills one `LiveSnapshot` with
+`World.snapshot_into()` instead, reusing its storage every frame.
+
+Run this module to measure how many ticks per second the simulation takes.
+"""
+
+import collections
+import functools
+import random
+import threading
+import time
+
+import pygame
+
+import buildings as bld
+import navgrid
+import npcs
+import quality
+import tilemap
+
+WORLD_W, WORLD_H = 1200, 960
+
+INTERIOR_SIZE = (160, 120)
+INTERIOR_WALL = 8  # wall thickness
+
+# (building class, top-left) -- hand-tuned for the world size; a single inn
+# and item shop, the rest are homes
+LAYOUT = [
+    (bld.Inn, (500, 420)),
+    (bld.ItemShop, (660, 420)),
+    (bld.House, (360, 360)),
+    (bld.House, (760, 360)),
+    (bld.House, (420, 620)),
+    (bld.House, (720, 620)),
+    (bld.House, (240, 420)),
+    (bld.House, (900, 420)),
+    (bld.House, (520, 260)),
+    (bld.House, (640, 700)),
+]
+TREES = [(150, 150), (1000, 180), (300, 780), (950, 760), (1100, 600), (180, 500)]
+BUSHES = [(400, 540), (650, 540), (500, 300), (700, 300), (500, 800), (650, 820)]
+ROADS = [
+    pygame.Rect(0, 480, WORLD_W, 40),
+    pygame.Rect(580, 200, 40, WORLD_H - 200),
+]
+# dirt paths from the doors that don't open onto a road
+PATHS = [
+    pygame.Rect(380, 420, 20, 60), pygame.Rect(780, 420, 20, 60),
+    pygame.Rect(440, 680, 140, 20), pygame.Rect(620, 680, 140, 20),
+    pygame.Rect(540, 320, 40, 20), pygame.Rect(620, 760, 60, 20),
+]
+PONDS = [pygame.Rect(100, 640, 140, 80)]
+FENCES = [pygame.Rect(840, 260, 160, 20), pygame.Rect(840, 280, 20, 60)]
+TOWN_NPCS = [((400, 500), "male"), ((700, 500), "female"), ((500, 700), "male"), ((800, 400), "female")]
+PLAZA = (600, 500)   # where the two roads cross
+
+PLAYER_FRAMES = 2
+BASE_SPEED = 60                  # px/s before the class speed multiplier
+TRANSITION_SPEED = 255 / 0.25    # 0.25 second fade
+DOOR_COOLDOWN = 0.5
+
+SIM_RATE = 60       # Simulation steps per second
+# longest step World.step takes; a slower frame (a hitch, an idle-throttled
+# frame) is split into steps this long. Collision against the tilemap only
+# looks one tile ahead, so no walker may move a whole tilemap.TILE per step.
+MAX_DT = 0.1
+MAX_FRAME = 5.0     # longer gaps (a suspended process) are cut to this much
+MAX_LAG = 0.25      # seconds behind schedule before Simulation drops the backlog
+
+
+def interior_door(size):
+    t = INTERIOR_WALL
+    return pygame.Rect(size[0] // 2 - 8, size[1] - t, 16, t)
+
+
+@functools.lru_cache(maxsize=1)
+def town_tiles():
+    """Terrain and collision tiles of the town layout, shared by every World.
+
+    Building walls are exact solids (tilemap.Tilemap.add_solid) and the
+    tiles under each door are DOOR tiles owned by its building (the index
+    into LAYOUT); World checks the exact door rect once in such a tile.
+    """
+    tiles = tilemap.Tilemap((WORLD_W, WORLD_H))
+    for r in ROADS:
+        tiles.paint(r, tilemap.ROAD)
+    for r in PATHS:
+        tiles.paint(r, tilemap.PATH)
+    for r in PONDS:
+        tiles.paint(r, tilemap.WATER)
+    for r in FENCES:
+        tiles.paint(r, tilemap.FENCE)
+    for idx, (cls, pos) in enumerate(LAYOUT):
+        door, solid = cls.geometry()
+        tiles.paint(door.move(pos), flags=tilemap.DOOR, owner=idx)
+        tiles.add_solid(solid.move(pos))
+    return tiles
+
+
+@functools.lru_cache(maxsize=1)
+def town_nav():
+    """Navigation grid of the town layout, shared by every World."""
+    solids = [pygame.Rect(r) for r in town_tiles().solid_rects()]
+    return navgrid.NavGrid((WORLD_W, WORLD_H), solids)
+
+
+@functools.lru_cache(maxsize=1)
+def points_of_interest():
+    """name -> world point NPCs walk to: the first inn and shop doors, the plaza."""
+    pois = {"plaza": PLAZA}
+    for cls, pos in LAYOUT:
+        name = cls.__name__
+        if name in ("Inn", "ItemShop") and name not in pois:
+            door = cls.geometry()[0].move(pos)
+            # stand just in front of the door, not in it
+            pois[name] = (door.centerx, door.bottom + 4)
+    return pois
+
+
+def errand_fields():
+    """Flow fields toward every point of interest (searched once, then cached)."""
+    nav = town_nav()
+    return [nav.field(p) for p in points_of_interest().values()]
+
+
+class Input:
+    """One frame of player intent: a direction with components in -1..1."""
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+
+
+class Interior:
+    __slots__ = ("size", "rect", "door", "style", "npcs")
+
+    def __init__(self, size, style):
+        self.size = size
+        self.rect = pygame.Rect(0, 0, *size)
+        self.door = interior_door(size)
+        self.style = style   # index into the renderer's floor colours
+        self.npcs = []
+
+
+class Building:
+    __slots__ = ("kind", "rect", "solid", "door", "interior")
+
+    def __init__(self, cls, pos, style):
+        door, solid = cls.geometry()
+        self.kind = cls.__name__
+        self.rect = pygame.Rect(pos, cls.size)
+        self.solid = solid.move(pos)
+        self.door = door.move(pos)
+        self.interior = Interior(INTERIOR_SIZE, style)
+
+
+class Transition:
+    """A door fade: `dir` 1 fades out, -1 fades back in after the move."""
+    __slots__ = ("kind", "building", "dir")
+
+    def __init__(self, kind, building):
+        self.kind = kind   # "to_interior" or "to_town"
+        self.building = building
+        self.dir = 1
+
+
+Snapshot = collections.namedtuple("Snapshot", (
+    "ticks", "time", "hero", "mode",
+    "style",      # floor style of the interior the player is in, -1 in town
+    "frame",      # player walk frame
+    "player",     # (x, y, w, h)
+    "fade",       # door fade alpha, 0 when no transition runs
+    "facades",    # ((building kind, x, y), ...)
+    "npcs",       # ((kind, frame, centerx, bottom), ...) in the player's space
+))
+Snapshot.__doc__ = "What a renderer needs from one World step, frozen."
+
+
+class LiveSnapshot:
+    """A Snapshot's fields, refilled in place by World.snapshot_into().
+
+    `player` is a list and `npcs` a list of [kind, frame, centerx, bottom]
+    rows, both reused from frame to frame; only draw it on the thread that
+    steps the World.
+    """
+
+    __slots__ = Snapshot._fields
+
+    def __init__(self):
+        self.ticks = 0
+        self.time = 0.0
+        self.hero = None
+        self.mode = "town"
+        self.style = -1
+        self.frame = 0
+        self.player = [0, 0, 0, 0]
+        self.fade = 0
+        self.facades = ()
+        self.npcs = []
+
+
+class World:
+    """The Odelia town simulation.
+
+    `chosen_class` is the class dict from class selection (saved with the
+    town); `hero` is its ``(id, colour)``, kept for front ends that draw the
+    player. `seed` makes NPC wandering reproducible. With `populate` false
+    the town and the interiors start without NPCs, for a caller that puts
+    its own in (savegame.restore()).
+    """
+
+    def __init__(self, chosen_class=None, seed=None, populate=True):
+        self.chosen_class = chosen_class = chosen_class or {}
+        stats = chosen_class.get("stats", {})
+        self.hero = (chosen_class.get("id"), tuple(chosen_class.get("color", (255, 255, 255))))
+        self.speed = BASE_SPEED * stats.get("spd_mult", 1.0)
+        self.rng = random.Random(seed)
+        self.bounds = pygame.Rect(0, 0, WORLD_W, WORLD_H)
+
+        self.buildings = [Building(cls, pos, idx) for idx, (cls, pos) in enumerate(LAYOUT)]
+        self.tiles = town_tiles()
+        self.facades = tuple((b.kind, b.rect.x, b.rect.y) for b in self.buildings)
+        for b in self.buildings:
+            b.interior.npcs = self._occupants(b) if populate else []
+        # townsfolk run errands between the points of interest; they all
+        # share the grid's cached flow field for each destination
+        self.npcs = []
+        if populate:
+            errands = errand_fields()
+            self.npcs = [npcs.NPC(pos, kind, rng=self.rng, errands=errands)
+                         for pos, kind in TOWN_NPCS[:quality.get("town_npcs")]]
+
+        self.player = pygame.Rect(WORLD_W // 2 - 4, WORLD_H // 2 - 4, 8, 8)
+        self._move = pygame.Vector2()
+        self._vel = pygame.Vector2()
+        self.moving = False
+        self.anim_t = 0.0
+        self.frame = 0
+        self.mode = "town"   # or "interior"
+        self.current = None  # Building the player is inside
+        self.door_cooldown = 0.0
+        self.transition = None
+        self.fade = 0.0
+        self.time = 0.0
+        self.ticks = 0
+
+    def _occupants(self, b):
+        if b.kind == "Inn":
+            return [npcs.NPC((80, 60), "innkeeper", radius=20, rng=self.rng)]
+        if b.kind == "ItemShop":
+            return [npcs.NPC((80, 60), "shopkeeper", radius=20, rng=self.rng)]
+        return [npcs.NPC((80, 60), self.rng.choice(["male", "female"]), rng=self.rng)]
+
+    # ── simulation ────────────────────────────────────────────────────────
+    def step(self, dt, inp):
+        self.ticks += 1
+        dt = min(dt, MAX_FRAME)
+        while dt > MAX_DT:
+            self._step(MAX_DT, inp)
+            dt -= MAX_DT
+        self._step(dt, inp)
+
+    def _step(self, dt, inp):
+        self.time += dt
+        self.door_cooldown = max(0.0, self.door_cooldown - dt)
+
+        move, vel = self._move, self._vel   # reused every step
+        move.update(inp.x, inp.y)
+        if self.transition:
+            move.update(0, 0)
+        elif move.x or move.y:
+            move.normalize_ip()
+        step = self.speed * dt
+        vel.update(move.x * step, move.y * step)
+        self.moving = bool(move.x or move.y)
+
+        if self.mode == "town":
+            self._step_town(dt, vel)
+        else:
+            self._step_interior(dt, vel)
+
+        if self.moving:
+            self.anim_t += dt * 8
+            self.frame = int(self.anim_t) % PLAYER_FRAMES
+        else:
+            self.anim_t = 0.0
+            self.frame = 0
+
+        if self.transition:
+            self._step_transition(dt)
+
+    def _step_town(self, dt, vel):
+        player, tiles = self.player, self.tiles
+        dx = int(round(vel.x))
+        player.x += dx
+        tiles.push_x(player, dx)
+        dy = int(round(vel.y))
+        player.y += dy
+        tiles.push_y(player, dy)
+        player.clamp_ip(self.bounds)
+
+        if self.door_cooldown <= 0 and not self.transition:
+            b = tiles.owner_flagged(player, tilemap.DOOR)
+            if b >= 0 and player.colliderect(self.buildings[b].door):
+                self.transition = Transition("to_interior", self.buildings[b])
+                self.door_cooldown = DOOR_COOLDOWN
+
+        for npc in self.npcs:
+            npc.update(dt, tiles, self.bounds)
+
+    def _step_interior(self, dt, vel):
+        interior = self.current.interior
+        player = self.player
+        player.x += int(round(vel.x))
+        player.y += int(round(vel.y))
+        player.clamp_ip(interior.rect)
+
+        for npc in interior.npcs:
+            npc.update(dt, None, interior.rect)
+
+        if self.door_cooldown <= 0 and not self.transition and player.colliderect(interior.door):
+            self.transition = Transition("to_town", self.current)
+            self.door_cooldown = DOOR_COOLDOWN
+
+    def _step_transition(self, dt):
+        tr = self.transition
+        self.fade += TRANSITION_SPEED * dt * tr.dir
+        if tr.dir == 1 and self.fade >= 255:
+            self.fade = 255
+            self.player.update(0, 0, 8, 8)
+            if tr.kind == "to_interior":
+                self.current = tr.building
+                d = self.current.interior.door
+                self.player.midbottom = (d.centerx, d.top)
+                self.mode = "interior"
+            else:
+                self.player.midtop = (tr.building.door.centerx, tr.building.door.bottom)
+                self.current = None
+                self.mode = "town"
+            self.door_cooldown = DOOR_COOLDOWN
+            tr.dir = -1
+        elif tr.dir == -1 and self.fade <= 0:
+            self.fade = 0.0
+            self.transition = None
+
+    # ── queries ───────────────────────────────────────────────────────────
+    @property
+    def active_npcs(self):
+        """NPCs in the same space as the player."""
+        return self.npcs if self.mode == "town" else self.current.interior.npcs
+
+    def snapshot(self):
+        p = self.player
+        return Snapshot(
+            self.ticks, self.time, self.hero, self.mode,
+            -1 if self.current is None else self.current.interior.style,
+            self.frame, (p.x, p.y, p.w, p.h),
+            self.fade if self.transition else 0,
+            self.facades,
+            tuple((n.kind, n.frame, n.rect.centerx, n.rect.bottom) for n in self.active_npcs))
+
+    def snapshot_into(self, snap):
+        """snapshot() written into the LiveSnapshot `snap`; returns `snap`."""
+        p = self.player
+        snap.ticks, snap.time, snap.hero, snap.mode = self.ticks, self.time, self.hero, self.mode
+        snap.style = -1 if self.current is None else self.current.interior.style
+        snap.frame = self.frame
+        player = snap.player
+        player[0], player[1], player[2], player[3] = p.x, p.y, p.w, p.h
+        snap.fade = self.fade if self.transition else 0
+        snap.facades = self.facades
+        active, rows = self.active_npcs, snap.npcs
+        if len(rows) > len(active):
+            del rows[len(active):]
+        while len(rows) < len(active):
+            rows.append([None, 0, 0, 0])
+        for n, row in zip(active, rows):
+            r = n.rect
+            row[0], row[1], row[2], row[3] = n.kind, n.frame, r.centerx, r.bottom
+        return snap
+
+
+class Simulation:
+    """Steps `world` every 1/`rate` seconds on a background thread.
+
+    The owner sets `input` and reads `snapshot` whenever it likes. `lock` is
+    held for each step; hold it to read the world from another thread, and
+    use replace() to swap in a different World.
+    """
+
+    def __init__(self, world, rate=SIM_RATE):
+        self.world = world
+        self.dt = 1.0 / rate
+        self.input = Input()
+        self.snapshot = world.snapshot()
+        self.lock = threading.Lock()
+        self.dropped = 0.0   # seconds of simulation skipped after falling behind
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def replace(self, world):
+        with self.lock:
+            self.world = world
+            self.snapshot = world.snapshot()
+
+    def _run(self):
+        dt = self.dt
+        due = time.perf_counter()
+        while not self._stop.is_set():
+            with self.lock:
+                self.world.step(dt, self.input)
+                snap = self.world.snapshot()
+            # publishing is one reference swap; a reader keeps whichever
+            # snapshot it already picked up
+            self.snapshot = snap
+            due += dt
+            delay = due - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            elif delay < -MAX_LAG:
+                self.dropped -= delay
+                due = time.perf_counter()
+
+
+if __name__ == "__main__":
+    import sys
+
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    world = World(seed=1)
+    rng = random.Random(2)
+    inputs = [Input(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1))) for _ in range(64)]
+    start = time.perf_counter()
+    for i in range(ticks):
+        world.step(1 / 60, inputs[(i // 30) % len(inputs)])
+    elapsed = time.perf_counter() - start
+    print("%d ticks in %.2f s: %.0f ticks/s" % (ticks, elapsed, ticks / elapsed))
@@ -1,7 +1,17 @@
 import math
+import os
 import random
+import zlib
 import pygame
 import buildings as bld
+import cinematic_cache
+import effects
+import memstats
+import overlays
+import presenter
+import quality
+import resolution
+import timeline
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Pixel Adventures — Opening Cinematic
@@ -13,6 +23,8 @@ import buildings as bld
 #   4) Hard flash → Bedroom: wake from dream
 #   5) Walk outside: the town is safe (relief wide)
 #   (Any key press skips to end)
+# The shots are declared as a timeline (see build_timeline); Cinematic can
+# seek to any moment, e.g. Cinematic(size).seek(11.3) for the impact.
 # ─────────────────────────────────────────────────────────────────────────────
 
 # Durations (seconds)
@@ -45,29 +57,18 @@ WORLD_H_MULT = 2
 
 # ────────────────────────────── Utilities ────────────────────────────────────
 
-def _charred_surface(src: pygame.Surface) -> pygame.Surface:
-    """Darken and mute a building surface."""
-    s = src.copy()
-    overlay = pygame.Surface(s.get_size(), pygame.SRCALPHA)
-    overlay.fill((35, 35, 35, 220))
-    s.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
-    return s
-
 def lerp(a, b, t):
     return a + (b - a) * max(0.0, min(1.0, t))
 
-def ease_in_out(t):
-    # smoothstep-ish easing for camera moves
-    return t * t * (3 - 2 * t)
-
-def draw_vgradient(surf, top_col, bot_col):
+def draw_vgradient(surf, top_col, bot_col, step=1):
+    """Vertical gradient in bands of `step` rows (1: every row)."""
     w, h = surf.get_size()
-    for y in range(h):
+    for y in range(0, h, step):
         t = y / max(1, h - 1)
         c = (int(lerp(top_col[0], bot_col[0], t)),
              int(lerp(top_col[1], bot_col[1], t)),
              int(lerp(top_col[2], bot_col[2], t)))
-        pygame.draw.line(surf, c, (0, y), (w, y))
+        surf.fill(c, (0, y, w, step))
 
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
@@ -92,11 +93,11 @@ class Camera:
     def add_shake(self, amount):
         self.shake_mag = max(self.shake_mag, amount)
 
-    def present(self, world_surface, dest_surface):
+    def present(self, world_surface, dest_surface, rng=random):
         """Crop & scale world to virtual size with integer-ish zoom and shake."""
         # Shake
-        ox = random.randint(-int(self.shake_mag), int(self.shake_mag)) if self.shake_mag > 0 else 0
-        oy = random.randint(-int(self.shake_mag), int(self.shake_mag)) if self.shake_mag > 0 else 0
+        ox = rng.randint(-int(self.shake_mag), int(self.shake_mag)) if self.shake_mag > 0 else 0
+        oy = rng.randint(-int(self.shake_mag), int(self.shake_mag)) if self.shake_mag > 0 else 0
         self.shake_mag *= self.shake_decay
 
         # Compute source rect based on zoom
@@ -110,7 +111,7 @@ class Camera:
 
         # Crop and scale to dest
         region = world_surface.subsurface(src_rect)
-        frame = pygame.transform.scale(region, (self.vw, self.vh))
+        frame = memstats.track(pygame.transform.scale(region, (self.vw, self.vh)), tag="camera")
         dest_surface.blit(frame, (0, 0))
 
 
@@ -140,7 +141,7 @@ class Particle:
         if self.fade:
             a = clamp(int(255 * (self.life)), 0, 255)
             c = (c[0], c[1], c[2], a)
-        s = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+        s = memstats.track(pygame.Surface((self.size, self.size), pygame.SRCALPHA), tag="particle")
         s.fill(c)
         surf.blit(s, (int(self.x), int(self.y)))
 
@@ -187,22 +188,20 @@ def draw_people(world, rects, t, lead_pos=None):
 
 def draw_buildings(world, b_surfs, b_rects, destroyed=False, flames=None):
     if destroyed:
-        charred = getattr(draw_buildings, "_charred", None)
-        if charred is None:
-            charred = [_charred_surface(s) for s in b_surfs]
-            draw_buildings._charred = charred
-        for s, r in zip(charred, b_rects):
-            world.blit(s, r)
+        for s, r in zip(b_surfs, b_rects):
+            world.blit(effects.variant(s, "charred"), r)
         # flames rendered separately
     else:
         for s, r in zip(b_surfs, b_rects):
             world.blit(s, r)
 
+def bedroom_rect(world_w, base_y):
+    return pygame.Rect(world_w//2 - 120, base_y - 100, 240, 95)
+
 def draw_bedroom(world, base_y):
     """Simple cozy room: bed, window, desk."""
-    w, h = world.get_size()
     # background walls
-    room = pygame.Rect(w//2 - 120, base_y - 100, 240, 95)
+    room = bedroom_rect(world.get_width(), base_y)
     pygame.draw.rect(world, (30, 30, 50), room)
     pygame.draw.rect(world, (50, 50, 90), room, 1)
     # window with morning gradient
@@ -229,22 +228,13 @@ def draw_bedroom(world, base_y):
     return room, bed, pillow
 
 def draw_letterbox(surf, h=LETTERBOX):
-    w, vh = surf.get_size()
-    if h > 0:
-        pygame.draw.rect(surf, (0, 0, 0), (0, 0, w, h))
-        pygame.draw.rect(surf, (0, 0, 0), (0, vh - h, w, h))
+    overlays.letterbox(surf, h)
 
 def draw_fade(surf, alpha):
-    if alpha <= 0: return
-    overlay = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, int(alpha)))
-    surf.blit(overlay, (0, 0))
+    overlays.blend(surf, overlays.BLACK, alpha)
 
 def draw_flash(surf, alpha):
-    if alpha <= 0: return
-    overlay = pygame.Surface(surf.get_size(), pygame.SRCALPHA)
-    overlay.fill((255, 255, 255, int(alpha)))
-    surf.blit(overlay, (0, 0))
+    overlays.blend(surf, overlays.WHITE, alpha)
 
 def title_card(surf, text, color=TITLE_COL):
     font = pygame.font.Font(None, 24)
@@ -254,342 +244,456 @@ def title_card(surf, text, color=TITLE_COL):
 
 # ────────────────────────────── Main Cinematic ───────────────────────────────
 
-def run(screen, clock, virtual_size):
-    vw, vh = virtual_size
-    surf = pygame.Surface(virtual_size)
-
-    # Build world canvas bigger than the virtual viewport
-    world_w = vw * WORLD_W_MULT
-    world_h = vh * WORLD_H_MULT
-    world = pygame.Surface((world_w, world_h), pygame.SRCALPHA)
-
-    base_y = world_h - 64  # ground line
-    b_surfs, b_rects = build_town(world, base_y)
-
-    # Hero starting position (world coords)
-    hero_x = b_rects[0].centerx
-    hero_y = base_y
-    hero_walk_dir = 1
-
-    # Meteor
-    meteor = pygame.Rect(world_w // 2 - 8, -40, 16, 16)
-    meteor_v = pygame.Vector2(0, 260)
-    meteor_active = False
-    impact_point = (b_rects[1].centerx, b_rects[1].top)
-
-    # Particles
-    particles = []  # Particle instances
-    flames = []     # flame rectangles with timers
-    explosions = 0
-
-    # Camera
-    cam = Camera(vw, vh, world_w, world_h)
-
-    # Timing
-    shot_idx = 0
-    shot_t = 0.0
-    total_frames = 0
-
-    # Fade & flash
-    fade_in = 255
-    fade_out = 0
-    flash = 0
-
-    # Dream flag
-    dream = True
-    destroyed = False
-
-    # Pre-compute cumulative durations to allow key-skip logic
-    total_dur = sum(SHOT_DUR)
-    max_frames = int(total_dur * FPS)
-
-    # Cinematic title (beginning only)
-    title_shown = True
-
-    while total_frames < max_frames:
-        dt = clock.tick(FPS) / 1000.0
-        shot_t += dt
-        total_frames += 1
-
-        # Input: skip cinematic
-        for e in pygame.event.get():
-            if e.type == pygame.QUIT:
-                return
-            if e.type == pygame.KEYDOWN and e.key in (
-                pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_SPACE, pygame.K_z
-            ):
-                return
+SKIP_KEYS = (pygame.K_ESCAPE, pygame.K_RETURN, pygame.K_SPACE, pygame.K_z)
+
+# Everything the rendered frames depend on; a change invalidates baked caches
+SOURCE_MODULES = ("opening_sequence.py", "timeline.py", "buildings.py", "overlays.py", "effects.py")
+
+SHOT_NAMES = ["establishing", "follow", "meteor", "impact", "bedroom", "outside"]
+END_CARD_DUR = 1.0
+SEED = 1
+
+
+def _bounce(x0, dist, lo, hi):
+    """Position after walking `dist` px from `x0` (heading right), turning at lo/hi."""
+    span = hi - lo
+    if span <= 0:
+        return x0
+    d = (x0 - lo + dist) % (2 * span)
+    return lo + (d if d <= span else 2 * span - d)
+
+
+def build_timeline(vw, vh, world_w, base_y, b_rects):
+    """Declarative description of every shot, track and emitter."""
+    tl = timeline.Timeline(FPS)
+    shots = [tl.shot(name, dur) for name, dur in zip(SHOT_NAMES, SHOT_DUR)]
+    end = tl.shot("end", END_CARD_DUR)
+    s0, s1, s2, s3, s4, s5 = shots
+    smooth, ramp, const = timeline.smooth, timeline.ramp, timeline.const
+    r0, r1, r2 = b_rects
+    impact = (r1.centerx, r1.top)
+
+    def seg(track, shot, f):
+        tl.track(track).add(shot.start, shot.end, f)
+
+    # (0) Establishing: slow pan from the left to the plaza, slight zoom in
+    seg("cam_x", s0, ramp(vw // 2, world_w // 2, smooth, as_int=True))
+    seg("cam_y", s0, const(int(base_y - vh // 3)))
+    seg("zoom", s0, ramp(0.9, 1.05, smooth))
+    seg("hero_x", s0, ramp(r0.centerx, r1.centerx - 40, smooth))
+
+    # (1) Medium follow: hero strolls between the shops at 24 px/s
+    seg("cam_x", s1, ramp(r0.centerx + 40, r2.centerx - 40, smooth, as_int=True))
+    seg("cam_y", s1, const(int(base_y - 40)))
+    seg("zoom", s1, ramp(1.05, 1.15, smooth))
+    seg("hero_x", s1, lambda u, dur: _bounce(r1.centerx - 40, 24 * u, r0.centerx + 10, r2.centerx - 10))
+
+    # (2) Sky tilt: camera slides up and zooms while the meteor falls
+    hero_parked = _bounce(r1.centerx - 40, 24 * s1.duration, r0.centerx + 10, r2.centerx - 10)
+    seg("cam_x", s2, const(r1.centerx))
+    seg("cam_y", s2, ramp(base_y - 40, base_y - 130, smooth, as_int=True))
+    seg("zoom", s2, ramp(1.0, 1.25, smooth))
+    seg("hero_x", s2, const(hero_parked))
+    seg("meteor_x", s2, ramp(world_w // 2 - 140, impact[0] - 8, smooth, as_int=True))
+    seg("meteor_y", s2, ramp(-60, impact[1] - 60, smooth, as_int=True))
+
+    # (3) Impact: per-frame jitter, shock ring and camera shake
+    def jitter(u, dur):
+        return r1.centerx + random.Random(SEED * 7919 + int(u * FPS)).randint(-4, 4)
+
+    def shake(u, dur):
+        # add_shake(4) on the cut, held at >= 2.5 for 0.6 s, then 0.9 decay per frame
+        k = int(u * FPS)
+        hold = int(0.6 * FPS)
+        if k < hold:
+            return max(4 * 0.9 ** k, 2.5)
+        return 2.5 * 0.9 ** (k - hold + 1)
+
+    seg("cam_x", s3, jitter)
+    seg("cam_y", s3, ramp(base_y - 110, base_y - 60, smooth, as_int=True))
+    seg("zoom", s3, ramp(1.25, 1.05))
+    seg("shake", s3, shake)
+    tl.track("ring_r").add(s3.start, s3.start + 0.6, ramp(6, 60, as_int=True))
+
+    # (4) Bedroom: static camera with a gentle zoom out, hero sits up
+    room = bedroom_rect(world_w, base_y)
+    seg("cam_x", s4, const(room.centerx))
+    seg("cam_y", s4, const(room.centery + 8))
+    seg("zoom", s4, ramp(1.15, 1.0, smooth))
+    seg("torso_h", s4, ramp(6, 10, smooth, as_int=True))
+    seg("flash", s4, lambda u, dur: max(0.0, 255 - 900 * u))
+
+    # (5) Outside: pull back to a reassuring wide, bars ease away
+    seg("cam_x", s5, ramp(r0.centerx, (r0.centerx + r2.centerx) // 2, smooth, as_int=True))
+    seg("cam_y", s5, ramp(base_y - 40, base_y - vh // 3, smooth, as_int=True))
+    seg("zoom", s5, ramp(1.0, 0.95, smooth))
+    seg("hero_x", s5, ramp(r0.centerx, r1.centerx - 30, smooth, as_int=True))
+
+    # End card: fixed wide with the title fading in
+    seg("cam_x", end, const((r0.centerx + r2.centerx) // 2))
+    seg("cam_y", end, const(base_y - vh // 3))
+    seg("zoom", end, const(0.95))
+    seg("fade", end, ramp(255, 0, as_int=True))
+
+    # Whole-film overlays
+    tl.track("letterbox").add(0.0, s5.start, const(LETTERBOX))
+    seg("letterbox", s5, ramp(LETTERBOX, 0, smooth, as_int=True))
+    tl.track("fade").add(0.0, 255 / 360, lambda u, dur: 255 - 360 * u)
+    return tl
+
+
+class Cinematic:
+    """The opening sequence as a seekable timeline.
+
+    `advance(dt)` plays forward, `seek(t)` jumps anywhere by replaying only the
+    emitter window that can still be visible, and `render()` draws the
+    current moment into `surf`.
+    """
+
+    def __init__(self, virtual_size):
+        vw, vh = virtual_size
+        self.vw, self.vh = vw, vh
+        self.surf = memstats.track(pygame.Surface(virtual_size), tag="canvas")
+        self.overlay = overlays.OverlayCompositor()
+
+        # World canvas bigger than the virtual viewport
+        self.world_w = vw * WORLD_W_MULT
+        self.world_h = vh * WORLD_H_MULT
+        self.world = memstats.track(pygame.Surface((self.world_w, self.world_h), pygame.SRCALPHA), tag="world")
+        self.base_y = self.world_h - 64  # ground line
+        self.b_surfs, self.b_rects = build_town(self.world, self.base_y)
+        self.impact_point = (self.b_rects[1].centerx, self.b_rects[1].top)
+        self.cam = Camera(vw, vh, self.world_w, self.world_h)
+
+        # Text is rendered once, not per frame
+        self.title_text = pygame.font.Font(None, 24).render("Odelia", False, TITLE_COL)
+        self.caption = pygame.font.Font(None, 16).render("…just a dream.", False, (220, 220, 230))
+        self.hint = pygame.font.Font(None, 12).render("Press any key to skip", False, (200, 200, 210))
+        self.end_title = pygame.font.Font(None, 28).render("PIXEL ADVENTURES", False, TITLE_COL)
+
+        self.gradient_step = quality.get("gradient_step")
+        self.particles = []
+        self.flames = []   # [rect, life, rng]
+        self.tl = build_timeline(vw, vh, self.world_w, self.base_y, self.b_rects)
+        self._add_emitters()
+        self.tl.bake()
+
+        self.t = 0.0
+        self.ticks = 0     # emitter ticks simulated so far
+
+    # ── emitters ──────────────────────────────────────────────────────────
+    def _add_emitters(self):
+        tl = self.tl
+        s2, s3 = tl.shot_named("meteor"), tl.shot_named("impact")
+        particles, flames = self.particles, self.flames
+        b_rects = self.b_rects
+        ix, iy = self.impact_point
+        mx, my = tl.track("meteor_x"), tl.track("meteor_y")
+        density = quality.get("particles")
+        trail_n, debris_n = max(1, round(2 * density)), max(1, round(50 * density))
+        flame_chance = quality.get("flame_chance")
+
+        def meteor_trail(rng, k, t):
+            cx, cy = int(mx(t)) + 8, int(my(t)) + 8
+            for _ in range(trail_n):
+                particles.append(Particle(
+                    cx + rng.randint(-2, 2), cy + rng.randint(-2, 2),
+                    -60 + rng.randint(-20, 0), -20 + rng.randint(-10, 10),
+                    life=0.6, col=EMBER_COL, size=2, grav=0.0, fade=True
+                ))
 
-        # Shot progression
-        if shot_t >= SHOT_DUR[shot_idx]:
-            shot_t = 0.0
-            shot_idx += 1
-            # transitions
-            if shot_idx == 2:
-                # prepare meteor sequence
-                meteor_active = True
-            if shot_idx == 3:
-                # harder letterbox & shake
-                cam.add_shake(4)
-            if shot_idx == 4:
-                # hard white flash into bedroom
-                flash = 255
-                destroyed = False
-                dream = False
-                meteor_active = False
-            if shot_idx >= len(SHOT_DUR):
-                break
-
-        # Draw world fresh each frame
-        world.fill((0, 0, 0, 0))
+        def debris(rng, k, t):
+            for _ in range(debris_n):
+                ang = rng.random() * math.tau
+                spd = rng.uniform(80, 220)
+                particles.append(Particle(
+                    ix, iy, math.cos(ang) * spd, math.sin(ang) * spd,
+                    life=rng.uniform(0.5, 1.2), col=DUST_COL, size=2, grav=120.0, fade=True
+                ))
 
-        # Sky
-        if dream:
-            draw_vgradient(world, SKY_MORN_TOP, SKY_MORN_BOT)
-        else:
-            draw_vgradient(world, SKY_MORN_TOP, SKY_MORN_BOT)
+        def flame_spawn(rng, k, t):
+            # each flame carries its own RNG so it evolves the same after a seek
+            if rng.random() < flame_chance:
+                b = rng.choice(b_rects)
+                r = pygame.Rect(rng.randint(b.left, b.right - 6), rng.randint(b.top + 4, b.bottom - 10), 6, 10)
+                flames.append([r, rng.uniform(0.8, 1.6), random.Random(rng.getrandbits(32))])
+            for fl in flames[:]:
+                rect, _, frng = fl
+                rect.y += frng.randint(-1, 1)  # flicker
+                if frng.random() < 0.3 * density:
+                    particles.append(Particle(
+                        rect.centerx, rect.top,
+                        frng.uniform(-10, 10), frng.uniform(-30, -10),
+                        life=frng.uniform(0.8, 1.5), col=SMOKE_COL, size=2, grav=-5.0, fade=True
+                    ))
+                fl[1] -= 1.0 / FPS
+                if fl[1] <= 0:
+                    flames.remove(fl)
 
-        # Ground line
-        draw_ground(world, base_y)
+        def plume(rng, k, t):
+            if rng.random() < 0.7 * density:
+                particles.append(Particle(
+                    ix + rng.randint(-12, 12), iy,
+                    rng.uniform(-10, 10), rng.uniform(-30, -5),
+                    life=rng.uniform(0.8, 1.2), col=(80, 80, 95), size=2, grav=-6.0, fade=True
+                ))
 
-        # ── Shot logic ────────────────────────────────────────────────────────
-        if shot_idx == 0:
-            # (0) Establishing wide pan across the plaza
-            # Camera slowly pans from left to center, slight zoom in.
-            p = ease_in_out(shot_t / SHOT_DUR[0])
-            cam.set(
-                cx=int(lerp(vw // 2, world_w // 2, p)),
-                cy=int(base_y - vh // 3),
-                zoom=lerp(0.9, 1.05, p),
-            )
+        tl.emitter("meteor_trail", s2.start, s2.end, SEED + 1, meteor_trail, horizon=0.6)
+        tl.emitter("debris", s3.start, s3.start + 1.0 / FPS, SEED + 2, debris, horizon=1.2)
+        tl.emitter("flames", s3.start, s3.end, SEED + 3, flame_spawn, horizon=1.6 + 1.5,
+                   reset=flames.clear)
+        tl.emitter("plume", s3.start, s3.end, SEED + 4, plume, horizon=1.2)
 
-            draw_buildings(world, b_surfs, b_rects, destroyed=False)
+    def _step_particles(self, k):
+        dt = 1.0 / FPS
+        ps = self.particles
+        for pr in ps:
+            pr.update(dt)
+        ps[:] = [pr for pr in ps if pr.life > 0]
+
+    # ── playback ──────────────────────────────────────────────────────────
+    @property
+    def duration(self):
+        return self.tl.duration
+
+    @property
+    def done(self):
+        return self.t >= self.tl.duration
+
+    @property
+    def shot(self):
+        return self.tl.shot_at(self.t)
+
+    def advance(self, dt):
+        self.t += dt
+        target = self.tl.tick_at(self.t)
+        if target > self.ticks:
+            self.tl.run_ticks(self.ticks, target, self._step_particles)
+            self.ticks = target
+
+    def seek(self, t):
+        """Jump to `t` seconds; emitter state is rebuilt deterministically."""
+        self.t = max(0.0, min(t, self.tl.duration))
+        self.particles.clear()
+        k = self.tl.tick_at(self.t)
+        self.tl.replay_to(k - 1, self._step_particles)  # ticks 0 .. k-1 are "done"
+        self.ticks = k
+
+    # ── drawing ───────────────────────────────────────────────────────────
+    def render(self):
+        tl, t = self.tl, self.t
+        shot = tl.shot_at(t)
+        u = t - shot.start
+        world, b_surfs, b_rects, base_y = self.world, self.b_surfs, self.b_rects, self.base_y
+        hero_y = base_y
 
-            # Hero exits house; walk a bit toward inn
-            hero_x = lerp(b_rects[0].centerx, b_rects[1].centerx - 40, p)
-            draw_people(world, b_rects, total_frames / FPS, lead_pos=(int(hero_x), int(hero_y)))
-            title_card(world, "Odelia")
-
-        elif shot_idx == 1:
-            # (1) Medium follow: hero strolls by shops, vendor & child visible
-            p = ease_in_out(shot_t / SHOT_DUR[1])
-            cam.set(
-                cx=int(lerp(b_rects[0].centerx + 40, b_rects[2].centerx - 40, p)),
-                cy=int(base_y - 40),
-                zoom=lerp(1.05, 1.15, p),
-            )
-            draw_buildings(world, b_surfs, b_rects, destroyed=False)
-            hero_x += 24 * dt * hero_walk_dir
-            if hero_x > b_rects[2].centerx - 10:
-                hero_walk_dir = -1
-            if hero_x < b_rects[0].centerx + 10:
-                hero_walk_dir = 1
-            draw_people(world, b_rects, total_frames / FPS, lead_pos=(int(hero_x), int(hero_y)))
-            title_shown = False
-
-        elif shot_idx == 2:
-            # (2) Sky tilt & meteor arrival: tilt up by sliding camera higher and zooming in
-            p = ease_in_out(shot_t / SHOT_DUR[2])
-            cam.set(
-                cx=int(lerp(b_rects[1].centerx, b_rects[1].centerx, 1)),
-                cy=int(lerp(base_y - 40, base_y - 130, p)),  # tilt up
-                zoom=lerp(1.0, 1.25, p),
-            )
-            draw_buildings(world, b_surfs, b_rects, destroyed=False)
-            draw_people(world, b_rects, total_frames / FPS, lead_pos=(int(hero_x), int(hero_y)))
+        world.fill((0, 0, 0, 0))
+        draw_vgradient(world, SKY_MORN_TOP, SKY_MORN_BOT, self.gradient_step)
+        draw_ground(world, base_y)
 
-            if meteor_active:
-                # meteor streak: add ember particles
-                meteor.x = int(lerp(world_w//2 - 140, impact_point[0] - 8, p))
-                meteor.y = int(lerp(-60, impact_point[1] - 60, p))
+        cam_x, cam_y, zoom = tl["cam_x"](t), tl["cam_y"](t), tl["zoom"](t)
+        name = shot.name
+        if name in ("establishing", "follow", "meteor"):
+            draw_buildings(world, b_surfs, b_rects, destroyed=False)
+            draw_people(world, b_rects, t, lead_pos=(int(tl["hero_x"](t)), int(hero_y)))
+            if name == "establishing":
+                world.blit(self.title_text, ((world.get_width() - self.title_text.get_width()) // 2, 12))
+            elif name == "meteor":
+                meteor = pygame.Rect(int(tl["meteor_x"](t)), int(tl["meteor_y"](t)), 16, 16)
                 pygame.draw.ellipse(world, (240, 240, 90), meteor)
-                # trail
-                for _ in range(2):
-                    particles.append(Particle(
-                        meteor.centerx + random.randint(-2, 2),
-                        meteor.centery + random.randint(-2, 2),
-                        -60 + random.randint(-20, 0),
-                        -20 + random.randint(-10, 10),
-                        life=0.6, col=EMBER_COL, size=2, grav=0.0, fade=True
-                    ))
 
-        elif shot_idx == 3:
-            # (3) Impact & destruction: shake, flames, debris, zoom punches
-            p = shot_t / SHOT_DUR[3]
-            cam.set(
-                cx=b_rects[1].centerx + random.randint(-4, 4),
-                cy=int(lerp(base_y - 110, base_y - 60, ease_in_out(p))),
-                zoom=lerp(1.25, 1.05, p),
-            )
-            # Buildings switch to charred after impact begins
+        elif name == "impact":
             draw_buildings(world, b_surfs, b_rects, destroyed=True)
-
-            # First frames: big shock flash & explosion ring
-            if shot_t < 0.6:
-                # impact point
-                cx, cy = impact_point
-                r = int(lerp(6, 60, shot_t / 0.6))
-                pygame.draw.circle(world, (255, 180, 90), (cx, cy), r, 2)
-                cam.add_shake(2.5)
-                if explosions == 0:
-                    explosions = 1
-                    # spawn debris burst
-                    for _ in range(50):
-                        ang = random.random() * math.tau
-                        spd = random.uniform(80, 220)
-                        particles.append(Particle(
-                            cx, cy,
-                            math.cos(ang)*spd, math.sin(ang)*spd,
-                            life=random.uniform(0.5, 1.2),
-                            col=DUST_COL, size=2, grav=120.0, fade=True
-                        ))
-
-            # Flames randomly over charred buildings
-            if random.random() < 0.25:
-                b = random.choice(b_rects)
-                r = pygame.Rect(
-                    random.randint(b.left, b.right - 6),
-                    random.randint(b.top + 4, b.bottom - 10),
-                    6, 10
-                )
-                flames.append([r, random.uniform(0.8, 1.6)])
-
-            # Render flames
-            for fl in flames[:]:
-                rect, life = fl
-                # flicker
-                rect.y += random.randint(-1, 1)
-                # draw
+            if u < 0.6:
+                pygame.draw.circle(world, (255, 180, 90), self.impact_point, int(tl["ring_r"](t)), 2)
+            for rect, _, _ in self.flames:
                 pygame.draw.rect(world, FIRE_OUTER, rect)
-                inner = rect.inflate(-2, -2)
-                pygame.draw.rect(world, FIRE_INNER, inner)
-                # smoke particles
-                if random.random() < 0.3:
-                    particles.append(Particle(
-                        rect.centerx, rect.top,
-                        random.uniform(-10, 10), random.uniform(-30, -10),
-                        life=random.uniform(0.8, 1.5),
-                        col=SMOKE_COL, size=2, grav=-5.0, fade=True
-                    ))
-                # decay
-                fl[1] -= dt
-                if fl[1] <= 0: flames.remove(fl)
+                pygame.draw.rect(world, FIRE_INNER, rect.inflate(-2, -2))
 
-            # Add persistent smoke plume
-            if random.random() < 0.7:
-                cx, cy = impact_point
-                particles.append(Particle(
-                    cx + random.randint(-12, 12), cy,
-                    random.uniform(-10, 10), random.uniform(-30, -5),
-                    life=random.uniform(0.8, 1.2),
-                    col=(80, 80, 95), size=2, grav=-6.0, fade=True
-                ))
-
-            destroyed = True
-
-        elif shot_idx == 4:
-            # (4) FLASH → Bedroom. Calm interior, hero sits up.
-            # Build the interior each frame
+        elif name == "bedroom":
             room, bed, pillow = draw_bedroom(world, base_y)
-            # Camera: static inside room with gentle zoom out
-            p = ease_in_out(shot_t / SHOT_DUR[4])
-            cam.set(
-                cx=room.centerx,
-                cy=room.centery + 8,
-                zoom=lerp(1.15, 1.0, p),
-            )
-            # Hero in bed → sit up animation
-            # Use a simple vertical tween for the torso rectangle
-            torso_h = int(lerp(6, 10, p))
+            torso_h = int(tl["torso_h"](t))
             hero_bed_x = bed.x + 28
             hero_bed_y = bed.y + 2
             pygame.draw.rect(world, (90, 200, 255), (hero_bed_x, hero_bed_y - torso_h, 8, torso_h))
             world.set_at((hero_bed_x + 4, hero_bed_y - torso_h + 2), WHITE)
 
-            # residual flash fades out quickly
-            if flash > 0:
-                flash = max(0, flash - 900 * dt)
+        elif name == "outside":
+            draw_buildings(world, b_surfs, b_rects, destroyed=False)
+            draw_people(world, b_rects, t, lead_pos=None)
+            out_x = int(tl["hero_x"](t))
+            pygame.draw.rect(world, (90, 200, 255), (out_x - 4, hero_y - 10, 8, 10))
+            world.set_at((out_x, hero_y - 8), WHITE)
+            world.blit(self.caption, (b_rects[1].centerx - self.caption.get_width() // 2, base_y - 22))
 
-        else:
-            # (5) Walk outside: the town is safe (relief)
-            p = ease_in_out(shot_t / SHOT_DUR[5])
+        else:  # end card
             draw_buildings(world, b_surfs, b_rects, destroyed=False)
-            draw_people(world, b_rects, total_frames / FPS, lead_pos=None)
-
-            # Hero steps out of house and looks around
-            out_x = int(lerp(b_rects[0].centerx, b_rects[1].centerx - 30, p))
-            out_y = hero_y
-            pygame.draw.rect(world, (90, 200, 255), (out_x - 4, out_y - 10, 8, 10))
-            world.set_at((out_x, out_y - 8), WHITE)
-
-            # Camera pulls back to a reassuring wide
-            cam.set(
-                cx=int(lerp(b_rects[0].centerx, (b_rects[0].centerx + b_rects[2].centerx)//2, p)),
-                cy=int(lerp(base_y - 40, base_y - vh//3, p)),
-                zoom=lerp(1.0, 0.95, p),
-            )
-
-            # Soft “It was only a dream…” caption near bottom
-            font = pygame.font.Font(None, 16)
-            cap = font.render("…just a dream.", False, (220, 220, 230))
-            world.blit(cap, (b_rects[1].centerx - cap.get_width()//2, base_y - 22))
-
-        # Update particles (shared across shots)
-        for pr in particles[:]:
-            pr.update(dt)
-            if pr.life <= 0:
-                particles.remove(pr)
-
-        # Draw particles ON TOP of world where appropriate
-        for pr in particles:
-            pr.draw(world)
-
-        # Present camera crop
-        cam.present(world, surf)
-
-        # Overlays
-        draw_letterbox(surf, LETTERBOX if shot_idx != 5 else int(lerp(LETTERBOX, 0, ease_in_out(shot_t / SHOT_DUR[5]))))
-        if fade_in > 0:
-            fade_in = max(0, fade_in - 360 * dt)
-            draw_fade(surf, fade_in)
-        if fade_out > 0:
-            fade_out = max(0, fade_out - 360 * dt)
-            draw_fade(surf, fade_out)
-        if flash > 0:
-            draw_flash(surf, flash)
-
-        # Tiny corner “Press a key to skip” for first few shots
-        if shot_idx <= 2:
-            font = pygame.font.Font(None, 12)
-            hint = font.render("Press any key to skip", False, (200, 200, 210))
-            surf.blit(hint, (vw - hint.get_width() - 4, vh - LETTERBOX - 12))
-
-        # Scale to window
-        pygame.transform.scale(surf, screen.get_size(), screen)
-        pygame.display.flip()
-
-    # End of cinematic.
-    # Optional final title card fade-in (briefly)
-    end_t = 0.0
-    while end_t < 1.0:
-        dt = clock.tick(FPS) / 1000.0
-        end_t += dt
-        # reuse last safe town frame as backdrop
-        world.fill((0,0,0,0))
-        draw_vgradient(world, SKY_MORN_TOP, SKY_MORN_BOT)
-        draw_ground(world, base_y)
-        draw_buildings(world, b_surfs, b_rects, destroyed=False)
-        cam.set(cx=(b_rects[0].centerx + b_rects[2].centerx)//2, cy=base_y - vh//3, zoom=0.95)
-        cam.present(world, surf)
-        draw_letterbox(surf, 0)
-        title = pygame.font.Font(None, 28).render("PIXEL ADVENTURES", False, TITLE_COL)
-        surf.blit(title, ((vw - title.get_width())//2, 10))
-        draw_fade(surf, int(lerp(255, 0, end_t)))
-        pygame.transform.scale(surf, screen.get_size(), screen)
-        pygame.display.flip()
-
-        for e in pygame.event.get():
-            if e.type == pygame.QUIT:
+
+        if name != "end":
+            for pr in self.particles:
+                pr.draw(world)
+
+        # Present camera crop; shake offsets come from a per-frame seeded RNG
+        cam = self.cam
+        cam.set(cx=cam_x, cy=cam_y, zoom=zoom)
+        cam.shake_mag = tl["shake"](t)
+        cam.present(world, self.surf, random.Random(SEED * 104729 + tl.tick_at(t)))
+
+        surf = self.surf
+        overlay = self.overlay
+        overlay.letterbox = int(tl["letterbox"](t))
+        overlay.fade = tl["fade"](t)
+        overlay.flash = tl["flash"](t)
+        if name == "end":
+            surf.blit(self.end_title, ((self.vw - self.end_title.get_width()) // 2, 10))
+        overlay.apply(surf)
+
+        # Tiny corner “Press a key to skip” for the first few shots
+        if shot.index <= 2:
+            surf.blit(self.hint, (self.vw - self.hint.get_width() - 4, self.vh - LETTERBOX - 12))
+        return surf
+
+
+def frames(virtual_size, cin=None):
+    """Render the cinematic one frame at a time.
+
+    Prime the generator with ``next()``, then ``send(dt)`` once per frame;
+    each send returns ``(surface, in_end_card)``. The same surface object is
+    reused for every frame. StopIteration marks the end of the cinematic.
+    An existing Cinematic `cin` is rewound and reused.
+    """
+    if cin is None:
+        cin = Cinematic(virtual_size)
+    else:
+        cin.seek(0.0)
+    dt = yield
+    while True:
+        cin.advance(dt)
+        if cin.done:
+            return
+        dt = yield cin.render(), cin.shot.name == "end"
+
+
+def _skipped(in_end_card):
+    """Drain events; True if the player quit or skipped."""
+    for e in pygame.event.get():
+        if presenter.handle_event(e):
+            continue
+        if e.type == pygame.QUIT:
+            return True
+        # the closing title card gives way to any key
+        if e.type == pygame.KEYDOWN and (in_end_card or e.key in SKIP_KEYS):
+            return True
+    return False
+
+
+def _run_live(screen, clock, virtual_size, assets, recorder=None):
+    # one Cinematic at the base size for the whole playback: rebuilding it
+    # for another resolution tier would hitch and reframe the shot, so the
+    # tier is held until the intro ends
+    if assets["cinematic"] is None:
+        assets["cinematic"] = Cinematic(virtual_size)
+    cin = assets["cinematic"]
+    cin.seek(0.0)
+    in_end_card = False
+    with resolution.held():
+        while True:
+            dt = clock.tick(FPS) / 1000.0
+            if _skipped(in_end_card):
+                if recorder:
+                    # the rest was never rendered; bake it off to the side
+                    # so the next launch can stream it
+                    recorder.abort()
+                    cinematic_cache.bake_in_background(virtual_size, quality.tier())
+                return
+            # a recording pass uses the exact frame step so the bake is
+            # independent of how fast this machine happened to render
+            cin.advance(1.0 / FPS if recorder else dt)
+            if cin.done:
+                if recorder:
+                    recorder.finish()
+                return
+            surf, in_end_card = cin.render(), cin.shot.name == "end"
+            if recorder and not recorder.add(surf, in_end_card):
+                # the encoder fell behind: play on without it, bake elsewhere
+                recorder = None
+                cinematic_cache.bake_in_background(virtual_size, quality.tier())
+            presenter.present(screen, surf)
+
+
+def _run_baked(screen, clock, player, assets):
+    # decoded frames are packed RGB; one blit converts them to display format
+    surf = assets["canvas"]
+    in_end_card = False
+    try:
+        while True:
+            clock.tick(FPS)
+            if _skipped(in_end_card):
                 return
-            if e.type == pygame.KEYDOWN:
+            frame = player.next_frame()
+            if frame is None:
                 return
+            frame_surf, in_end_card = frame
+            surf.blit(frame_surf, (0, 0))
+            presenter.present(screen, surf)
+    finally:
+        player.close()
+
+
+def _cache_tag():
+    """Source CRC, mixed with the quality knobs that change the frames."""
+    knobs = "%r %r %r" % (quality.get("particles"), quality.get("flame_chance"),
+                          quality.get("gradient_step"))
+    return zlib.crc32(knobs.encode(), cinematic_cache.source_tag(SOURCE_MODULES))
+
+
+def load(virtual_size):
+    """Reusable resources; the live Cinematic is only built when first needed."""
+    return {
+        "canvas": memstats.track(pygame.Surface(virtual_size), tag="canvas"),
+        "cinematic": None,
+        "tag": _cache_tag(),
+    }
+
+
+def run(screen, clock, virtual_size, mode=None, assets=None):
+    """Play the cinematic.
+
+    `mode` (default: the PIXEL_CINEMATIC environment variable, else "auto"):
+      "live"  simulate and rasterize every frame, never touch the cache
+      "auto"  stream the baked frame cache if it is current; otherwise play
+              live while baking the cache for next time. If the player
+              skips, or the encoder can't keep up, the bake is handed to
+              a background process (cinematic_cache.bake_in_background)
+    """
+    if assets is None:
+        assets = load(virtual_size)
+    mode = mode or os.environ.get("PIXEL_CINEMATIC", "auto")
+    if mode == "live":
+        return _run_live(screen, clock, virtual_size, assets)
+    tag = assets["tag"]
+    path = cinematic_cache.cache_path("opening", virtual_size)
+    player = cinematic_cache.open_player(path, virtual_size, FPS, tag)
+    if player is not None:
+        return _run_baked(screen, clock, player, assets)
+    recorder = cinematic_cache.FrameCacheWriter(path, virtual_size, FPS, tag)
+    return _run_live(screen, clock, virtual_size, assets, recorder)
+
+
+def bake(virtual_size):
+    """Render the whole cinematic offscreen into the frame cache."""
+    tag = _cache_tag()
+    path = cinematic_cache.cache_path("opening", virtual_size)
+    writer = cinematic_cache.FrameCacheWriter(path, virtual_size, FPS, tag)
+    gen = frames(virtual_size)
+    next(gen)
+    try:
+        while True:
+            surf, in_end_card = gen.send(1.0 / FPS)
+            writer.add(surf, in_end_card, wait=True)
+    except StopIteration:
+        writer.finish()
+    except BaseException:
+        writer.abort()
+        raise
+    return path
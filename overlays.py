@@ -0,0 +1,76 @@
+# overlays.py
+# Pixel Adventures — Full-screen overlay compositor (fade, flash, tint, letterbox).
+# Every effect is applied in place with blend-mode fills, so a transition costs
+# a couple of fills per frame and never allocates a screen-sized surface.
+
+import pygame
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def blend(surf, color, alpha):
+    """Alpha-blend `color` over the whole of `surf` in place.
+
+    ``dst * (255 - a) / 255 + color * a / 255`` is done as one multiply fill
+    and, for non-black colors, one additive fill.
+    """
+    a = int(alpha)
+    if a <= 0:
+        return
+    if a >= 255:
+        surf.fill(color)
+        return
+    k = 255 - a
+    surf.fill((k, k, k), special_flags=pygame.BLEND_RGB_MULT)
+    r, g, b = color[0] * a // 255, color[1] * a // 255, color[2] * a // 255
+    if r or g or b:
+        surf.fill((r, g, b), special_flags=pygame.BLEND_RGB_ADD)
+
+
+def letterbox(surf, h, color=BLACK):
+    """Cinematic bars of height `h` at the top and bottom of `surf`."""
+    if h <= 0:
+        return
+    w, vh = surf.get_size()
+    surf.fill(color, (0, 0, w, h))
+    surf.fill(color, (0, vh - h, w, h))
+
+
+class OverlayCompositor:
+    """Fixed stack of screen effects applied bottom to top.
+
+    Scenes set the effect strengths each frame (all default to off) and call
+    `apply` once on the finished virtual canvas:
+
+        letterbox -> tint -> fade -> flash
+
+    Effects whose alpha or height is zero are skipped entirely.
+    """
+
+    def __init__(self):
+        self.letterbox = 0          # bar height in virtual pixels
+        self.tint_color = BLACK
+        self.tint = 0.0             # 0..255
+        self.fade_color = BLACK
+        self.fade = 0.0             # 0..255
+        self.flash_color = WHITE
+        self.flash = 0.0            # 0..255
+
+    def clear(self):
+        self.letterbox = 0
+        self.tint = self.fade = self.flash = 0.0
+
+    @property
+    def active(self):
+        return self.letterbox > 0 or self.tint >= 1 or self.fade >= 1 or self.flash >= 1
+
+    def apply(self, surf):
+        if self.letterbox > 0:
+            letterbox(surf, int(self.letterbox))
+        if self.tint >= 1:
+            blend(surf, self.tint_color, self.tint)
+        if self.fade >= 1:
+            blend(surf, self.fade_color, self.fade)
+        if self.flash >= 1:
+            blend(surf, self.flash_color, self.flash)
@@ -0,0 +1,209 @@
+# pacing.py
+# Pixel Adventures — Frame pacing, idle throttling and per-scene CPU usage.
+#
+# main wraps the game clock in a Pacer, and every scene keeps calling
+# clock.tick(60) as before. The Pacer decides how that tick waits:
+#   "sleep"  pygame's Clock.tick (default, cheapest)
+#   "busy"   Clock.tick_busy_loop, for precise timing at the cost of a core
+#   "vsync"  the display was opened with vsync; when the target rate is the
+#            refresh rate, flip() already paces and the tick only measures
+# Scenes registered with an idle rate drop to it once nobody has touched the
+# input for IDLE_AFTER seconds, and to DEEP_IDLE_FPS after DEEP_IDLE_AFTER.
+# While idle the wait is an event wait, so the first key press wakes the loop
+# immediately instead of at the next idle frame.
+#
+# Environment: PIXEL_PACING (sleep/busy/vsync), PIXEL_REFRESH_HZ (display
+# refresh for vsync, default 60), PIXEL_IDLE=0 to never throttle, and
+# PIXEL_PACING_REPORT=1 to print per-scene CPU usage at exit.
+
+import atexit
+import contextlib
+import logging
+import os
+import sys
+import time
+
+import pygame
+
+import gcwatch
+import latency
+import resolution
+
+log = logging.getLogger("pacing")
+
+MODES = ("sleep", "busy", "vsync")
+IDLE_AFTER = 15.0        # seconds without input before throttling
+IDLE_FPS = 10
+DEEP_IDLE_AFTER = 120.0
+DEEP_IDLE_FPS = 2
+
+INPUT_EVENTS = frozenset((
+    pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.JOYBUTTONDOWN, pygame.JOYAXISMOTION,
+    pygame.JOYHATMOTION, pygame.FINGERDOWN, pygame.TEXTINPUT,
+))
+
+
+class Pacer:
+    """Clock wrapper that applies the pacing mode and idle policy.
+
+    Anything other than tick() is forwarded to the wrapped pygame Clock. Each
+    frame's work time (from the end of one tick to the start of the next) is
+    fed to the dynamic resolution controller, except while idle, where frames
+    are deliberately slow.
+    """
+
+    def __init__(self, clock=None, mode=None, refresh_hz=None):
+        self._clock = clock or pygame.time.Clock()
+        self.mode = mode or os.environ.get("PIXEL_PACING", "sleep")
+        if self.mode not in MODES:
+            raise ValueError("unknown pacing mode %r" % (self.mode,))
+        self.refresh_hz = refresh_hz or int(os.environ.get("PIXEL_REFRESH_HZ", 60))
+        self.idle_enabled = os.environ.get("PIXEL_IDLE", "1") != "0"
+        self.idle_fps = None    # the current scene's idle rate, None: never idle
+        self.last_input = time.perf_counter()
+        self.frames = 0
+        self.idle_frames = 0
+        self._frame_end = None
+
+    def activity(self):
+        self.last_input = time.perf_counter()
+
+    def idle_rate(self, now=None):
+        """The throttled frame rate right now, or None if not idle."""
+        if self.idle_fps is None or not self.idle_enabled:
+            return None
+        quiet = (now or time.perf_counter()) - self.last_input
+        if quiet >= DEEP_IDLE_AFTER:
+            return min(self.idle_fps, DEEP_IDLE_FPS)
+        if quiet >= IDLE_AFTER:
+            return self.idle_fps
+        return None
+
+    def _wait_for_input(self, seconds):
+        """Sleep up to `seconds`, returning early on the first input event."""
+        deadline = time.perf_counter() + seconds
+        held = []
+        try:
+            while True:
+                left = deadline - time.perf_counter()
+                if left <= 0:
+                    return
+                e = pygame.event.wait(max(1, int(left * 1000)))
+                if e.type == pygame.NOEVENT:
+                    continue
+                held.append(e)
+                if e.type in INPUT_EVENTS or e.type == pygame.QUIT:
+                    self.activity()
+                    return
+        finally:
+            # put the drained events back ahead of any that came in since,
+            # in their original order (a KEYDOWN must stay before its KEYUP)
+            if held:
+                for e in held + pygame.event.get():
+                    pygame.event.post(e)
+
+    def tick(self, framerate=0):
+        start = time.perf_counter()
+        idle = self.idle_rate(start)
+        if self._frame_end is not None:
+            work = start - self._frame_end
+            gcwatch.frame(work * 1000)
+            if idle is None:
+                resolution.observe(work * 1000)
+            else:
+                self._wait_for_input(1.0 / idle - work)
+                if self.idle_rate() is None:   # woken by input
+                    idle = None
+        fps = idle or framerate
+        if idle is not None:
+            ms = self._clock.tick(fps)
+            self.idle_frames += 1
+        elif self.mode == "busy":
+            ms = self._clock.tick_busy_loop(fps)
+        elif self.mode == "vsync" and fps >= self.refresh_hz:
+            ms = self._clock.tick()   # flip() waits for the vertical blank
+        else:
+            ms = self._clock.tick(fps)
+        self.frames += 1
+        self._frame_end = time.perf_counter()
+        latency.polled(self.mode if idle is None else "idle", self._frame_end)
+        return ms
+
+    def __getattr__(self, name):
+        return getattr(self._clock, name)
+
+
+def set_mode(size, flags=0):
+    """Open the display, asking for vsync when the pacing mode wants it."""
+    if os.environ.get("PIXEL_PACING") == "vsync":
+        if tuple(size) == (0, 0):
+            size = pygame.display.get_desktop_sizes()[0]  # SCALED needs a real size
+        try:
+            return pygame.display.set_mode(size, flags | pygame.SCALED, vsync=1)
+        except pygame.error as exc:
+            log.warning("vsync unavailable (%s), pacing with sleep", exc)
+            os.environ["PIXEL_PACING"] = "sleep"
+    return pygame.display.set_mode(size, flags)
+
+
+# ─────────────────────────── process-wide pacer ──────────────────────────────
+
+_pacer = None
+_scenes = {}   # scene name -> [visits, wall s, cpu s, frames, idle frames]
+
+
+def install(clock=None):
+    """Create the process-wide Pacer around `clock` and return it."""
+    global _pacer
+    _pacer = Pacer(clock)
+    return _pacer
+
+
+def activity(event=None):
+    """Note player input; called by presenter for every event."""
+    if _pacer is not None and (event is None or event.type in INPUT_EVENTS):
+        _pacer.activity()
+
+
+@contextlib.contextmanager
+def scene(name, idle_fps=None):
+    """Apply a scene's idle policy and account its wall and CPU time."""
+    if _pacer is None:
+        yield
+        return
+    _pacer.idle_fps = idle_fps
+    _pacer.activity()
+    wall, cpu = time.perf_counter(), time.process_time()
+    frames, idle_frames = _pacer.frames, _pacer.idle_frames
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        frames = _pacer.frames - frames
+        idle_frames = _pacer.idle_frames - idle_frames
+        _pacer.idle_fps = None
+        row = _scenes.setdefault(name, [0, 0.0, 0.0, 0, 0])
+        for i, v in enumerate((1, wall, cpu, frames, idle_frames)):
+            row[i] += v
+        log.info("%s: %.1f s, CPU %.1f s (%.0f%%), %d frames, %d idle",
+                 name, wall, cpu, 100 * cpu / wall if wall else 0, frames, idle_frames)
+
+
+def report():
+    lines = ["scene           visits    wall s     cpu s   cpu %   frames   idle %"]
+    for name, (visits, wall, cpu, frames, idle_frames) in _scenes.items():
+        lines.append("%-15s %6d %9.1f %9.1f %7.1f %8d %8.1f" % (
+            name, visits, wall, cpu, 100 * cpu / wall if wall else 0, frames,
+            100 * idle_frames / frames if frames else 0))
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _scenes:
+        print(report(), file=sys.stderr)
+
+
+if os.environ.get("PIXEL_PACING_REPORT"):
+    atexit.register(_report_at_exit)
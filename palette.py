@@ -0,0 +1,66 @@
+# palette.py
+# Pixel Adventures — 8-bit palettized sprites and palette-swap variants.
+#
+# Sprites are stored as 8-bit surfaces: one byte per pixel indexing a
+# 256-entry palette, a quarter of the memory of a 32-bit SRCALPHA surface.
+# Index 0 is always the transparent colour key. A colour variant of a sprite
+# is a copy of its pixel layout with some palette entries replaced, so new
+# variants never re-run the drawing code.
+#
+#   base = palette.indexed(surf, slots=[hair, outfit])  # hair -> 1, outfit -> 2
+#   red = palette.variant(base, {2: (200, 40, 40)})
+
+import pygame
+
+TRANSPARENT = 0
+KEY_COLOR = (255, 0, 255)
+
+
+def layout(size, colors=()):
+    """Blank 8-bit surface with `colors` at indices 1.. ready to draw into.
+
+    pygame.draw takes a palette index as its colour on these surfaces.
+    """
+    surf = pygame.Surface(size, 0, 8)
+    surf.set_palette([KEY_COLOR, *colors] + [(0, 0, 0)] * (255 - len(colors)))
+    surf.fill(TRANSPARENT)
+    surf.set_colorkey(TRANSPARENT)
+    return surf
+
+
+def indexed(surf, slots=()):
+    """8-bit copy of `surf`, whose pixels are either opaque or fully clear.
+
+    Colours in `slots` get indices 1, 2, ... in that order (whether or not
+    they occur), so callers know which entries to swap later; the other
+    colours follow in first-seen order.
+    """
+    w, h = surf.get_size()
+    rgba = pygame.image.tobytes(surf, "RGBA")
+    colors = {c: i for i, c in enumerate(slots, 1)}
+    pixels = bytearray(w * h)
+    for p in range(w * h):
+        r, g, b, a = rgba[p * 4:p * 4 + 4]
+        if not a:
+            continue
+        i = colors.get((r, g, b))
+        if i is None:
+            i = colors[(r, g, b)] = len(colors) + 1
+            if i > 255:
+                raise ValueError("more than 255 colours in a %dx%d sprite" % (w, h))
+        pixels[p] = i
+    out = pygame.image.frombytes(bytes(pixels), (w, h), "P")
+    palette = [KEY_COLOR] + [(0, 0, 0)] * 255
+    for c, i in colors.items():
+        palette[i] = c
+    out.set_palette(palette)
+    out.set_colorkey(TRANSPARENT)
+    return out
+
+
+def variant(base, colors):
+    """Copy of 8-bit `base` with palette index -> colour `colors` swapped in."""
+    surf = base.copy()
+    for i, c in colors.items():
+        surf.set_palette_at(i, c)
+    return surf
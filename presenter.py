@@ -0,0 +1,58 @@
+# presenter.py
+# Pixel Adventures — Shared end-of-frame presentation and debug hotkeys.
+# Every scene loop hands its finished virtual canvas to present() and offers
+# its events to handle_event() before acting on them.
+
+import contextlib
+import time
+
+import pygame
+import capture
+import drawstats
+import latency
+import pacing
+import profiling
+
+CAPTURE_KEY = pygame.K_F10
+PROFILE_KEY = pygame.K_F9
+
+_taps = []   # callables shown every presented canvas, see tap()
+
+
+def handle_event(e):
+    """Handle global debug hotkeys; True if the event was consumed."""
+    pacing.activity(e)
+    latency.event(e)
+    if e.type == pygame.KEYDOWN and e.key == CAPTURE_KEY:
+        capture.toggle()
+        return True
+    if e.type == pygame.KEYDOWN and e.key == PROFILE_KEY:
+        profiling.toggle()
+        return True
+    return False
+
+
+def present(screen, canvas):
+    """Scale the virtual canvas to the window and flip."""
+    start = time.perf_counter()
+    drawstats.frame()
+    capture.grab(canvas)
+    profiling.frame()
+    for fn in _taps:
+        fn(canvas)
+    if not pygame.display.get_active():
+        return  # minimized or hidden: nothing on screen would change
+    pygame.transform.scale(canvas, screen.get_size(), screen)
+    scaled = time.perf_counter()
+    pygame.display.flip()
+    latency.presented(start, scaled, time.perf_counter())
+
+
+@contextlib.contextmanager
+def tap(fn):
+    """Call fn(canvas) with every canvas presented inside the block."""
+    _taps.append(fn)
+    try:
+        yield
+    finally:
+        _taps.remove(fn)
@@ -0,0 +1,164 @@
+# profiling.py
+# Pixel Adventures — On-demand profiler capture of live frames.
+#
+# F9 (see presenter.py) profiles the next FRAMES presented frames of the
+# running scene with one profiler, so neither skews the other:
+#   sampler  (default) a thread records the main thread's stack every
+#            SAMPLE_INTERVAL seconds; the game runs at full speed, so this
+#            is what to read frame time from
+#   cprofile exact call counts and per-function times, at the cost of a
+#            hook on every call that inflates small, hot functions
+# When the frames are done (or the scene ends) the result is written to
+# OUT_DIR, named after the scene and the time:
+#   <scene>-<time>.collapsed  sampler: "outer;inner;leaf count" lines, for
+#                             flamegraph.pl / speedscope
+#   <scene>-<time>.pstats     cprofile: dump for pstats / snakeviz
+# While off, the only cost is frame() checking one global per frame.
+#
+# PIXEL_PROFILER=cprofile picks cProfile; PIXEL_PROFILE_FRAMES and
+# PIXEL_PROFILE_DIR override the defaults.
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+FRAMES = int(os.environ.get("PIXEL_PROFILE_FRAMES", 120))
+OUT_DIR = os.environ.get("PIXEL_PROFILE_DIR", "profiles")
+PROFILER = os.environ.get("PIXEL_PROFILER", "sampler")
+SAMPLE_INTERVAL = 0.001
+
+
+class StackSampler:
+    """Thread that counts the stacks a target thread is executing."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _work(self):
+        frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            f = frames().get(self.thread_id)
+            stack = []
+            while f is not None:
+                code = f.f_code
+                stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename),
+                                             code.co_firstlineno))
+                f = f.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write("%s %d\n" % (stack, count))
+
+
+class Capture:
+    """One profiling run over the next `frames` frames of `scene`.
+
+    `profiler` is "sampler" or "cprofile"; only that one runs.
+    """
+
+    def __init__(self, scene, frames=FRAMES, out_dir=OUT_DIR, profiler=PROFILER):
+        self.scene = scene or "unknown"
+        self.frames = frames
+        self.out_dir = out_dir
+        self.seen = 0
+        self.started = time.perf_counter()
+        self.sampler = self.profile = None
+        if profiler == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.sampler = StackSampler(threading.get_ident())
+            self.sampler.start()
+
+    def frame(self):
+        """Count one presented frame; True once the capture is complete."""
+        self.seen += 1
+        return self.seen >= self.frames
+
+    def finish(self):
+        """Stop profiling and write the result; return its path."""
+        if self.profile is not None:
+            self.profile.disable()
+        else:
+            self.sampler.stop()
+        elapsed = time.perf_counter() - self.started
+        os.makedirs(self.out_dir, exist_ok=True)
+        stem = os.path.join(self.out_dir, "%s-%s" % (self.scene, time.strftime("%Y%m%d-%H%M%S")))
+        if self.profile is not None:
+            path = stem + ".pstats"
+            self.profile.dump_stats(path)
+            detail = "cProfile"
+        else:
+            path = stem + ".collapsed"
+            self.sampler.write(path)
+            detail = "%d stack samples" % sum(self.sampler.stacks.values())
+        print("profile %s: %d frames in %.2f s, %s" % (path, self.seen, elapsed, detail),
+              file=sys.stderr)
+        return path
+
+
+# ─────────────────────────── process-wide capture ───────────────────────────
+
+_active = None
+_scene = None
+
+
+def active():
+    return _active is not None
+
+
+def start(frames=None):
+    """Profile the next `frames` frames of the current scene."""
+    global _active
+    if _active is None:
+        _active = Capture(_scene, frames or FRAMES)
+
+
+def stop():
+    global _active
+    if _active is not None:
+        cap, _active = _active, None
+        cap.finish()
+
+
+def toggle():
+    if _active is None:
+        start()
+    else:
+        stop()
+
+
+def frame():
+    """Called once per presented frame."""
+    if _active is not None and _active.frame():
+        stop()
+
+
+@contextlib.contextmanager
+def scene(name):
+    """Name captures after `name`; a capture still running ends with it."""
+    global _scene
+    _scene = name
+    try:
+        yield
+    finally:
+        stop()
+        _scene = None
@@ -0,0 +1,163 @@
+# quality.py
+# Pixel Adventures — Quality tiers: presets for the knobs that set visual cost.
+#
+#   stars           title screen starfield points
+#   dots            class-select background dots
+#   particles       scale on cinematic particle spawns (trail, debris, smoke)
+#   flame_chance    chance per tick that the destruction montage lights a fire
+#   town_npcs       townsfolk wandering Odelia
+#   gradient_step   rows per band of the cinematic sky gradient
+#
+# The tier is chosen once per process by install(), first match wins:
+#   1. PIXEL_QUALITY=<tier>
+#   2. "quality" in the config file (PIXEL_CONFIG, default settings.json next
+#      to this file), unless it is "auto"
+#   3. the tier calibrated on an earlier launch (quality.json in the cache
+#      directory, see userdirs.py)
+#   4. a short benchmark of typical frame work, whose result is saved for 3
+# Without install() (tools, benchmarks) every knob keeps its "high" value,
+# which is how the game looked before tiers existed.
+
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+
+import pygame
+
+import userdirs
+
+log = logging.getLogger("quality")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG = os.environ.get("PIXEL_CONFIG", os.path.join(HERE, "settings.json"))
+CALIBRATION = os.path.join(os.environ.get("PIXEL_CACHE_DIR") or userdirs.cache_dir(), "quality.json")
+
+TIERS = {
+    "low": {
+        "stars": 24, "dots": 24, "particles": 0.35, "flame_chance": 0.12,
+        "town_npcs": 2, "gradient_step": 4,
+    },
+    "medium": {
+        "stars": 40, "dots": 40, "particles": 0.65, "flame_chance": 0.18,
+        "town_npcs": 3, "gradient_step": 2,
+    },
+    "high": {
+        "stars": 60, "dots": 60, "particles": 1.0, "flame_chance": 0.25,
+        "town_npcs": 4, "gradient_step": 1,
+    },
+}
+DEFAULT = "high"
+
+# benchmark: median ms of one synthetic frame, and the slowest that still
+# gets each tier (checked best tier first)
+BENCH_FRAMES = 12
+THRESHOLDS_MS = (("high", 6.0), ("medium", 12.0))
+
+_tier = DEFAULT
+_source = "default"
+
+
+def tier():
+    return _tier
+
+
+def source():
+    """Where the current tier came from: env, config, calibrated, benchmark or default."""
+    return _source
+
+
+def get(knob):
+    return TIERS[_tier][knob]
+
+
+def settings():
+    return dict(TIERS[_tier])
+
+
+def set_tier(name, source="manual"):
+    global _tier, _source
+    if name not in TIERS:
+        raise ValueError("unknown quality tier %r" % (name,))
+    _tier, _source = name, source
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _machine():
+    return "%s %s %s" % (platform.node(), platform.machine(), platform.processor())
+
+
+def benchmark(frames=BENCH_FRAMES):
+    """Median milliseconds of a frame of typical work at virtual size."""
+    canvas = pygame.Surface((1024, 576))
+    window = pygame.Surface((1280, 720))
+    dot = pygame.Surface((2, 2), pygame.SRCALPHA)
+    dot.fill((150, 130, 100, 180))
+    times = []
+    for f in range(frames):
+        start = time.perf_counter()
+        for y in range(0, 576, 2):
+            pygame.draw.line(canvas, (y % 256, 80, 120), (0, y), (1023, y))
+        for i in range(600):
+            canvas.blit(dot, ((i * 37 + f) % 1020, (i * 11) % 570))
+        for i in range(40):
+            pygame.draw.rect(canvas, (255, 120, 0), ((i * 23) % 1000, (i * 17) % 560, 6, 10))
+        pygame.transform.scale(canvas, window.get_size(), window)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times[2:] or times)
+
+
+def pick(ms):
+    for name, limit in THRESHOLDS_MS:
+        if ms <= limit:
+            return name
+    return "low"
+
+
+def calibrate(path=CALIBRATION):
+    """Benchmark this machine, save the tier it earns and return it."""
+    ms = benchmark()
+    name = pick(ms)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"tier": name, "frame_ms": round(ms, 2), "machine": _machine()}, f)
+    except OSError as exc:
+        log.warning("could not save quality calibration: %s", exc)
+    log.info("calibrated quality %s (%.1f ms synthetic frame)", name, ms)
+    return name
+
+
+def install(config=CONFIG, calibration=CALIBRATION):
+    """Choose the process-wide tier (see the header) and return it."""
+    env = os.environ.get("PIXEL_QUALITY", "").strip().lower()
+    if env and env != "auto":
+        if env in TIERS:
+            set_tier(env, "env")
+            return _tier
+        log.warning("PIXEL_QUALITY: unknown quality %r, ignoring it", env)
+    settings = _read_json(config)
+    if not isinstance(settings, dict):
+        log.warning("%s: expected a JSON object, got %s; ignoring it", config, type(settings).__name__)
+        settings = {}
+    wanted = str(settings.get("quality", "auto")).strip().lower()
+    if wanted != "auto":
+        if wanted in TIERS:
+            set_tier(wanted, "config")
+            return _tier
+        log.warning("%s: unknown quality %r, calibrating instead", config, wanted)
+    saved = _read_json(calibration)
+    if isinstance(saved, dict) and saved.get("tier") in TIERS and saved.get("machine") == _machine():
+        set_tier(saved["tier"], "calibrated")
+    else:
+        set_tier(calibrate(calibration), "benchmark")
+    return _tier
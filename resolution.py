@@ -0,0 +1,145 @@
+# resolution.py
+# Pixel Adventures — Dynamic resolution scaling driven by measured frame time.
+#
+# A ResolutionController watches how long recent frames took to build (the
+# work between frame-rate delays, reported by pacing.Pacer) and moves the
+# virtual render size between preset tiers to stay inside the frame budget.
+# Scenes that support it ask size() for the canvas they should draw this
+# frame and draw their usual view into it scaled down, so the field of view
+# never changes; presenter.present() upscales the canvas to the display, so
+# a smaller tier shows the same view with bigger pixels. A scene that can't
+# rescale its view (the live cinematic) draws at the base size and holds
+# the tier with held() instead.
+#
+# On by default; PIXEL_DYNRES=0 disables it, PIXEL_RES_TIER=<n> pins a tier
+# and PIXEL_FRAME_BUDGET_MS overrides the budget (default: one 60 Hz frame).
+
+import contextlib
+import logging
+import os
+from collections import deque
+
+log = logging.getLogger("resolution")
+
+TIERS = (1.0, 0.875, 0.75, 0.625, 0.5)   # fraction of the base virtual size
+BUDGET_MS = 1000.0 / 60
+WINDOW = 20       # frames per decision
+PERCENTILE = 0.9  # judge the window by its slow end, not its mean
+DOWN_AT = 0.95    # drop a tier when the window is over this share of budget
+UP_AT = 0.7       # raise a tier when the bigger canvas is predicted under this
+HOLD = 30         # frames to wait after a change before judging again
+
+
+def scaled(size, scale):
+    """`size` scaled by `scale`, rounded down to even dimensions."""
+    return (max(2, int(size[0] * scale) & ~1), max(2, int(size[1] * scale) & ~1))
+
+
+class ResolutionController:
+    """Pick a resolution tier from recent frame work times.
+
+    Cost is assumed to follow pixel count, so the controller only moves up a
+    tier when the window scaled by the area ratio still fits comfortably.
+    """
+
+    def __init__(self, budget_ms=BUDGET_MS, tiers=TIERS, window=WINDOW, tier=0, pinned=False):
+        self.budget_ms = budget_ms
+        self.tiers = tuple(tiers)
+        self.tier = tier
+        self.pinned = pinned
+        self.changes = 0
+        self._samples = deque(maxlen=window)
+        self._hold = 0
+
+    @property
+    def scale(self):
+        return self.tiers[self.tier]
+
+    def size(self, base):
+        return base if self.tier == 0 else scaled(base, self.scale)
+
+    def reset(self):
+        """Forget the current window, e.g. across a scene change."""
+        self._samples.clear()
+        self._hold = 0
+
+    def observe(self, work_ms):
+        """Record one frame; True if the tier changed."""
+        self._samples.append(work_ms)
+        if self.pinned or len(self._samples) < self._samples.maxlen:
+            return False
+        if self._hold:
+            self._hold -= 1
+            return False
+        ordered = sorted(self._samples)
+        slow = ordered[int(len(ordered) * PERCENTILE) - 1]
+        tier = self.tier
+        if slow > self.budget_ms * DOWN_AT and tier < len(self.tiers) - 1:
+            tier += 1
+        elif tier > 0 and slow * (self.tiers[tier - 1] / self.scale) ** 2 < self.budget_ms * UP_AT:
+            tier -= 1
+        else:
+            return False
+        log.info("tier %d -> %d (%.0f%%), p%d %.1f ms of %.1f ms", self.tier, tier,
+                 self.tiers[tier] * 100, PERCENTILE * 100, slow, self.budget_ms)
+        self.tier = tier
+        self.changes += 1
+        self._samples.clear()
+        self._hold = HOLD
+        return True
+
+
+# ─────────────────────────── process-wide controller ─────────────────────────
+
+_controller = None
+
+
+def install(budget_ms=None):
+    """Create the process-wide controller from the environment."""
+    global _controller
+    if os.environ.get("PIXEL_DYNRES", "1") == "0":
+        _controller = None
+        return None
+    if budget_ms is None:
+        budget_ms = float(os.environ.get("PIXEL_FRAME_BUDGET_MS", BUDGET_MS))
+    pin = os.environ.get("PIXEL_RES_TIER")
+    if pin:
+        tier = max(0, min(len(TIERS) - 1, int(pin)))
+        _controller = ResolutionController(budget_ms, tier=tier, pinned=True)
+    else:
+        _controller = ResolutionController(budget_ms)
+    return _controller
+
+
+def controller():
+    return _controller
+
+
+def size(base):
+    """Canvas size to render `base`-sized content at this frame."""
+    return base if _controller is None else _controller.size(base)
+
+
+def observe(work_ms):
+    if _controller is not None:
+        _controller.observe(work_ms)
+
+
+def reset():
+    if _controller is not None:
+        _controller.reset()
+
+
+@contextlib.contextmanager
+def held():
+    """Keep the current tier inside the block, whatever the frames take."""
+    c = _controller
+    if c is None or c.pinned:
+        yield
+        return
+    c.pinned = True
+    try:
+        yield
+    finally:
+        c.pinned = False
+        c.reset()
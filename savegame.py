@@ -0,0 +1,249 @@
+# savegame.py
+# Pixel Adventures — Binary snapshots of the Odelia town state.
+#
+# A snapshot is everything odelia_world.World needs to carry on exactly
+# where it stopped: the chosen class, player, mode and building, the door
+# fade, every NPC (position, heading, timers, errand target) and the RNG.
+#
+# File layout (little endian):
+#   header   magic "PXSV", version, class JSON length, NPC count
+#   class    the chosen class dict as UTF-8 JSON
+#   world    WORLD record
+#   rng      random.Random state: 625 u32 words, gauss flag and value
+#   npcs     one NPC record each; owner -1 is the town, otherwise the index
+#            of the building whose interior it is in
+#
+# save() builds the bytes on the calling thread (so the snapshot is
+# consistent) and hands them to a writer thread, which writes a temporary
+# file and renames it over the old save, so a crash never leaves a torn
+# file. load() returns a ready World; the scene keeps its renderer and art.
+# The bytes of the last save() to each path are also kept in memory, so
+# load(session=True) resumes only what this process saved, without
+# touching the disk; a save left by an earlier run (another player on a
+# shared machine) is only read when asked for.
+#
+# Saves go to the user's data directory (userdirs.py); PIXEL_SAVE_DIR
+# overrides it.
+
+import atexit
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+from array import array
+
+import npcs
+import odelia_world
+import userdirs
+
+MAGIC = b"PXSV"
+VERSION = 1
+HEADER = struct.Struct("<4sHII")
+WORLD = struct.Struct("<dQiiiiddB?Bhdbhb")
+RNG_TAIL = struct.Struct("<?d")
+NPC = struct.Struct("<hBiiddddddddddBhhd?")
+
+SAVE_DIR = os.environ.get("PIXEL_SAVE_DIR") or os.path.join(userdirs.data_dir(), "saves")
+MODES = ("town", "interior")
+TRANSITIONS = ("to_interior", "to_town")
+KINDS = list(npcs.KINDS)
+KIND_INDEX = {k: i for i, k in enumerate(KINDS)}
+
+
+def save_path(name="odelia"):
+    return os.path.join(SAVE_DIR, name + ".sav")
+
+
+# ────────────────────────────── encoding ─────────────────────────────────────
+
+def snapshot(world):
+    """Encode `world` to bytes."""
+    index = {id(b): i for i, b in enumerate(world.buildings)}
+    cls = json.dumps(world.chosen_class, separators=(",", ":")).encode("utf-8")
+
+    everyone = [(-1, n) for n in world.npcs]
+    for i, b in enumerate(world.buildings):
+        everyone.extend((i, n) for n in b.interior.npcs)
+
+    tr = world.transition
+    p = world.player
+    version, words, gauss = world.rng.getstate()
+    rng = array("I", words).tobytes() + RNG_TAIL.pack(gauss is not None, gauss or 0.0)
+
+    out = bytearray(HEADER.size + len(cls) + WORLD.size + len(rng) + NPC.size * len(everyone))
+    HEADER.pack_into(out, 0, MAGIC, VERSION, len(cls), len(everyone))
+    o = HEADER.size
+    out[o:o + len(cls)] = cls
+    o += len(cls)
+    WORLD.pack_into(
+        out, o, world.time, world.ticks, p.x, p.y, p.w, p.h, world.anim_t, world.door_cooldown,
+        world.frame, world.moving, MODES.index(world.mode),
+        index[id(world.current)] if world.current is not None else -1,
+        world.fade,
+        TRANSITIONS.index(tr.kind) if tr else -1,
+        index[id(tr.building)] if tr else -1,
+        tr.dir if tr else 0)
+    o += WORLD.size
+    out[o:o + len(rng)] = rng
+    o += len(rng)
+
+    pack, kinds = NPC.pack_into, KIND_INDEX
+    for owner, n in everyone:
+        r = n.rect
+        cx, cy = n.field.target if n.field is not None else (-1, -1)
+        pack(out, o, owner, kinds[n.kind], r.x, r.y, n.pos.x, n.pos.y,
+             n.anchor.x, n.anchor.y, n.radius, n.speed, n.dir.x, n.dir.y, n.change, n.anim_t,
+             n.frame, cx, cy, n.linger, bool(n.errands))
+        o += NPC.size
+    return bytes(out)
+
+
+def restore(data):
+    """Decode bytes from snapshot() into a new World."""
+    magic, version, cls_len, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a save file")
+    if version != VERSION:
+        raise ValueError("unsupported save version %d" % version)
+    o = HEADER.size
+    chosen_class = json.loads(bytes(data[o:o + cls_len]).decode("utf-8"))
+    if "color" in chosen_class:
+        chosen_class["color"] = tuple(chosen_class["color"])
+    o += cls_len
+
+    w = odelia_world.World(chosen_class, seed=0, populate=False)
+    (w.time, w.ticks, px, py, pw, ph, w.anim_t, w.door_cooldown, w.frame, w.moving, mode,
+     current, w.fade, tr_kind, tr_building, tr_dir) = WORLD.unpack_from(data, o)
+    o += WORLD.size
+    w.player.update(px, py, pw, ph)
+    w.mode = MODES[mode]
+    w.current = w.buildings[current] if current >= 0 else None
+    w.transition = None
+    if tr_kind >= 0:
+        w.transition = odelia_world.Transition(TRANSITIONS[tr_kind], w.buildings[tr_building])
+        w.transition.dir = tr_dir
+
+    words = array("I")
+    words.frombytes(bytes(data[o:o + 625 * 4]))
+    o += 625 * 4
+    has_gauss, gauss = RNG_TAIL.unpack_from(data, o)
+    o += RNG_TAIL.size
+    w.rng.setstate((3, tuple(words), gauss if has_gauss else None))
+
+    # rebuild every NPC straight from its record, skipping __init__
+    nav = odelia_world.town_nav()
+    errands = odelia_world.errand_fields()
+    town = []
+    interiors = [[] for _ in w.buildings]
+    new, Vector2, Rect = npcs.NPC.__new__, npcs.pygame.Vector2, npcs.pygame.Rect
+    half = nav.cell // 2
+    for rec in NPC.iter_unpack(memoryview(data)[o:o + NPC.size * count]):
+        (owner, kind, rx, ry, px, py, ax, ay, radius, speed, dx, dy, change, anim_t,
+         frame, cx, cy, linger, runs_errands) = rec
+        n = new(npcs.NPC)
+        n.rect = Rect(rx, ry, 8, 8)
+        n.pos = Vector2(px, py)
+        n.kind = KINDS[kind]
+        n.rng = w.rng
+        n.anchor = Vector2(ax, ay)
+        n.radius = radius
+        n.speed = speed
+        n.dir = Vector2(dx, dy)
+        n.change = change
+        n.anim_t = anim_t
+        n.frame = frame
+        n.field = nav.field((cx * nav.cell + half, cy * nav.cell + half)) if cx >= 0 else None
+        n.errands = list(errands) if runs_errands else []
+        n.linger = linger
+        (town if owner < 0 else interiors[owner]).append(n)
+    w.npcs = town
+    for b, occupants in zip(w.buildings, interiors):
+        b.interior.npcs = occupants
+    return w
+
+
+# ─────────────────────────────── files ───────────────────────────────────────
+
+_queue = queue.SimpleQueue()
+_writer = None
+_lock = threading.Lock()
+_session = {}   # path -> bytes of the last save() to it by this process
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _work():
+    while True:
+        item = _queue.get()
+        if item is None:
+            return
+        path, data, done = item
+        try:
+            _write(path, data)
+        except OSError as exc:
+            print("save %s: %s" % (path, exc), file=sys.stderr)
+        finally:
+            done.set()
+
+
+def save(world, path=None):
+    """Snapshot `world` now and write it in the background.
+
+    Returns an Event that is set once the file is in place.
+    """
+    global _writer
+    path = path or save_path()
+    data = _session[path] = snapshot(world)
+    done = threading.Event()
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_work, name="savegame", daemon=True)
+            _writer.start()
+    _queue.put((path, data, done))
+    return done
+
+
+def flush():
+    """Wait for every queued save to reach the disk."""
+    global _writer
+    with _lock:
+        if _writer is None:
+            return
+        _queue.put(None)
+        _writer.join()
+        _writer = None
+
+
+def load(path=None, session=False):
+    """The World saved at `path`, or None if there is no usable save.
+
+    With `session`, only a save made by this process counts.
+    """
+    path = path or save_path()
+    data = _session.get(path)
+    if data is None:
+        if session:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+    try:
+        return restore(data)
+    except (ValueError, struct.error, IndexError, KeyError) as exc:
+        print("save %s unusable: %s" % (path, exc), file=sys.stderr)
+        return None
+
+
+atexit.register(flush)
@@ -0,0 +1,140 @@
+# scenes.py
+# Pixel Adventures — Scene manager that keeps scene assets alive across visits.
+#
+# Every scene module exposes `load(virtual_size)`, which builds its expensive
+# resources (canvas, text, icons, buildings ...) into a dict, and
+# `run(screen, clock, *args, virtual_size=..., assets=...)`, which only
+# creates per-visit state. The manager loads assets on first entry, hands the
+# same dict back on later visits, and drops least recently used scene assets
+# when the process goes over its memory budget.
+
+import logging
+import os
+import time
+from collections import deque
+
+import pygame
+
+import drawstats
+import gcwatch
+import latency
+import memstats
+import pacing
+import profiling
+import resolution
+
+log = logging.getLogger("scenes")
+
+TRANSITIONS_KEPT = 256   # most recent transitions kept in SceneManager.transitions
+
+
+def asset_bytes(obj, _seen=None):
+    """Rough pixel memory held by the surfaces reachable from `obj`."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, pygame.Surface):
+        return memstats.surface_bytes(obj)
+    if isinstance(obj, dict):
+        return sum(asset_bytes(v, _seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(asset_bytes(v, _seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return asset_bytes(vars(obj), _seen)
+    return 0
+
+
+class Scene:
+    __slots__ = ("name", "load", "run", "idle_fps", "assets", "bytes", "last_used")
+
+    def __init__(self, name, load, run, idle_fps=None):
+        self.name = name
+        self.load = load
+        self.run = run
+        self.idle_fps = idle_fps
+        self.assets = None
+        self.bytes = 0
+        self.last_used = 0.0
+
+
+class SceneManager:
+    """Owns scene lifecycles and their cached assets.
+
+    `budget_mb` (default: PIXEL_MEMORY_BUDGET_MB, unset means unlimited) is
+    compared against the process RSS at every transition.
+    """
+
+    def __init__(self, virtual_size, budget_mb=None):
+        self.virtual_size = virtual_size
+        if budget_mb is None and os.environ.get("PIXEL_MEMORY_BUDGET_MB"):
+            budget_mb = float(os.environ["PIXEL_MEMORY_BUDGET_MB"])
+        self.budget = int(budget_mb * 1024 * 1024) if budget_mb else None
+        self.scenes = {}
+        self.current = None
+        self.transitions = deque(maxlen=TRANSITIONS_KEPT)  # (from, to, load_ms, cached)
+
+    def register(self, name, load, run, idle_fps=None):
+        """`idle_fps` lets the scene throttle to that rate when nobody plays."""
+        self.scenes[name] = Scene(name, load, run, idle_fps)
+
+    def assets(self, name):
+        """Return the scene's assets, loading them if needed."""
+        scene = self.scenes[name]
+        if scene.assets is None:
+            scene.assets = scene.load(self.virtual_size)
+            scene.bytes = asset_bytes(scene.assets)
+        return scene.assets
+
+    def preload(self, *names):
+        for name in names:
+            self.assets(name)
+
+    def release(self, name):
+        scene = self.scenes[name]
+        if scene.assets is not None:
+            log.info("releasing %s assets (%.1f MB)", name, scene.bytes / (1024 * 1024))
+        scene.assets = None
+        scene.bytes = 0
+
+    def cached_bytes(self):
+        return sum(s.bytes for s in self.scenes.values())
+
+    def trim(self, keep=()):
+        """Release LRU scene assets while RSS is over budget."""
+        if self.budget is None:
+            return
+        rss = memstats.rss_bytes()
+        if rss is None:
+            return
+        loaded = sorted((s for s in self.scenes.values()
+                         if s.assets is not None and s.name not in keep),
+                        key=lambda s: s.last_used)
+        for scene in loaded:
+            if rss <= self.budget:
+                break
+            rss -= scene.bytes
+            self.release(scene.name)
+
+    def run(self, name, screen, clock, *args):
+        """Enter scene `name` and return whatever its loop returns."""
+        scene = self.scenes[name]
+        self.trim(keep=(name,))
+        cached = scene.assets is not None
+        start = time.perf_counter()
+        with memstats.scene(name), pacing.scene(name, scene.idle_fps), profiling.scene(name), \
+                latency.scene(name), gcwatch.scene(name), drawstats.scene(name):
+            assets = self.assets(name)
+            gcwatch.assets_ready()
+            resolution.reset()  # the load hitch says nothing about this scene
+            load_ms = (time.perf_counter() - start) * 1000
+            self.transitions.append((self.current, name, load_ms, cached))
+            log.info("%s -> %s: %.1f ms%s", self.current, name, load_ms, " (cached)" if cached else "")
+            self.current = name
+            try:
+                return scene.run(screen, clock, *args, virtual_size=self.virtual_size, assets=assets)
+            finally:
+                # scenes may build parts of their assets lazily while running
+                scene.bytes = asset_bytes(assets)
+                scene.last_used = time.perf_counter()
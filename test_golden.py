@@ -0,0 +1,23 @@
+# test_golden.py
+# Pixel Adventures — pytest entry for the golden-image frames (see golden.py).
+
+import pytest
+
+import golden
+
+GOLDEN = golden.load()
+pytestmark = pytest.mark.skipif(
+    GOLDEN["env"] != golden.environment(),
+    reason="golden frames were recorded with another pygame/SDL build")
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return golden.render()
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN["frames"]))
+def test_frame_matches_golden(frames, name):
+    assert name in frames, "no script renders %s any more" % name
+    assert not golden.check({name: frames[name]}, GOLDEN), \
+        "%s differs, see %s" % (name, golden.DIFF_DIR)
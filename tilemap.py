@@ -0,0 +1,206 @@
+# tilemap.py
+# Pixel Adventures — Tile grid of terrain types and collision flags.
+#
+# A Tilemap splits a world into TILE-pixel squares. Each tile has one byte
+# of terrain type, one byte of flags and the index of the building that
+# owns it, in flat row-major arrays (like navgrid). Walkers are smaller
+# than a tile, so a collision check reads at most two tiles, however many
+# fences, ponds and walls the world has. Terrain types only name a
+# look; odelia.py rasterizes them.
+#
+# Solids that don't line up with the grid (building walls) are added with
+# add_solid(): tiles they cover fully are SOLID, tiles they only cut into
+# are PARTIAL and keep the exact rects, so collision there matches the
+# drawn art instead of the whole tile.
+
+from array import array
+
+TILE = 20
+
+# terrain types
+GRASS, ROAD, PATH, WATER, FENCE = range(5)
+TERRAINS = ("grass", "road", "path", "water", "fence")
+
+# flags
+SOLID = 1   # nothing walks here
+DOOR = 2    # stepping in enters the building that owns the tile
+PARTIAL = 4  # nothing walks inside the tile's rects in Tilemap.shapes
+
+# terrain that blocks walkers wherever it is painted
+TERRAIN_FLAGS = {WATER: SOLID, FENCE: SOLID}
+
+
+class Tilemap:
+    """Terrain and flags of a `size` world, `fill` terrain everywhere."""
+
+    def __init__(self, size, tile=TILE, fill=GRASS):
+        self.tile = tile
+        self.size = size
+        self.cols = -(-size[0] // tile)
+        self.rows = -(-size[1] // tile)
+        n = self.cols * self.rows
+        self.terrain = bytearray([fill]) * n
+        self.flags = bytearray([TERRAIN_FLAGS.get(fill, 0)]) * n
+        self.owner = array("b", [-1]) * n
+        self.shapes = {}    # PARTIAL tile index -> [exact solid rects]
+        self.revision = 0   # bumped by every paint(), for caches of the art
+
+    def span(self, rect):
+        """(col0, row0, col1, row1) of the tiles `rect` overlaps, clipped to the map."""
+        t = self.tile
+        return (max(0, rect.left // t), max(0, rect.top // t),
+                min(self.cols - 1, (rect.right - 1) // t), min(self.rows - 1, (rect.bottom - 1) // t))
+
+    def paint(self, rect, terrain=None, flags=None, owner=None):
+        """Set the tiles `rect` overlaps.
+
+        `terrain` also sets its default flags unless `flags` is given;
+        `owner` ties the tiles to a building index.
+        """
+        if flags is None and terrain is not None:
+            flags = TERRAIN_FLAGS.get(terrain, 0)
+        c0, r0, c1, r1 = self.span(rect)
+        for ty in range(r0, r1 + 1):
+            row = ty * self.cols
+            for i in range(row + c0, row + c1 + 1):
+                if terrain is not None:
+                    self.terrain[i] = terrain
+                if flags is not None:
+                    self.flags[i] = flags
+                if owner is not None:
+                    self.owner[i] = owner
+        self.revision += 1
+
+    def add_solid(self, rect):
+        """Make exactly `rect` solid, whether or not it lines up with the tiles."""
+        t = self.tile
+        c0, r0, c1, r1 = self.span(rect)
+        for ty in range(r0, r1 + 1):
+            row = ty * self.cols
+            for tx in range(c0, c1 + 1):
+                i = row + tx
+                if rect.left <= tx * t and (tx + 1) * t <= rect.right and \
+                        rect.top <= ty * t and (ty + 1) * t <= rect.bottom:
+                    self.flags[i] |= SOLID
+                else:
+                    self.flags[i] |= PARTIAL
+                    self.shapes.setdefault(i, []).append(rect.copy())
+        self.revision += 1
+
+    def _push_shapes(self, rect, i0, i1, dx, dy):
+        """Move `rect` out of the exact solids of tiles i0 and i1."""
+        hit = False
+        for i in (i0, i1):
+            for r in self.shapes.get(i, ()):
+                if r.colliderect(rect):
+                    if dx > 0:
+                        rect.right = r.left
+                    elif dx < 0:
+                        rect.left = r.right
+                    elif dy > 0:
+                        rect.bottom = r.top
+                    else:
+                        rect.top = r.bottom
+                    hit = True
+        return hit
+
+    def at(self, x, y):
+        """Index of the tile under world point (x, y), -1 off the map."""
+        tx, ty = int(x) // self.tile, int(y) // self.tile
+        if 0 <= tx < self.cols and 0 <= ty < self.rows:
+            return ty * self.cols + tx
+        return -1
+
+    def owner_flagged(self, rect, flag):
+        """Owner of an owned tile under `rect` with `flag` set, else -1.
+
+        Like push_x() this assumes `rect` is no bigger than a tile, so it
+        spans at most two columns and two rows.
+        """
+        t = self.tile
+        left, right = max(0, rect.left // t), min(self.cols - 1, (rect.right - 1) // t)
+        top, bottom = max(0, rect.top // t), min(self.rows - 1, (rect.bottom - 1) // t)
+        if left > right or top > bottom:
+            return -1
+        flags, owner, cols = self.flags, self.owner, self.cols
+        for i in (top * cols + left, top * cols + right, bottom * cols + left, bottom * cols + right):
+            if flags[i] & flag and owner[i] >= 0:
+                return owner[i]
+        return -1
+
+    def push_x(self, rect, dx):
+        """Move `rect`, which just moved `dx` along x, out of solid tiles.
+
+        Only the column of its leading edge is checked: a move shorter than
+        a tile from a free spot can only run into that one. Returns True if
+        `rect` had to be moved back.
+        """
+        t = self.tile
+        if dx > 0:
+            tx = (rect.right - 1) // t
+        elif dx < 0:
+            tx = rect.left // t
+        else:
+            return False
+        if not 0 <= tx < self.cols:
+            return False
+        top, bottom = max(0, rect.top // t), min(self.rows - 1, (rect.bottom - 1) // t)
+        if top > bottom:
+            return False
+        flags, cols = self.flags, self.cols
+        i0, i1 = top * cols + tx, bottom * cols + tx
+        f = flags[i0] | flags[i1]
+        if f & SOLID:
+            if dx > 0:
+                rect.right = tx * t
+            else:
+                rect.left = (tx + 1) * t
+            return True
+        if f & PARTIAL:
+            return self._push_shapes(rect, i0, i1, dx, 0)
+        return False
+
+    def push_y(self, rect, dy):
+        """push_x() along y, checking the row of the leading edge."""
+        t = self.tile
+        if dy > 0:
+            ty = (rect.bottom - 1) // t
+        elif dy < 0:
+            ty = rect.top // t
+        else:
+            return False
+        if not 0 <= ty < self.rows:
+            return False
+        left, right = max(0, rect.left // t), min(self.cols - 1, (rect.right - 1) // t)
+        if left > right:
+            return False
+        flags, row = self.flags, ty * self.cols
+        i0, i1 = row + left, row + right
+        f = flags[i0] | flags[i1]
+        if f & SOLID:
+            if dy > 0:
+                rect.bottom = ty * t
+            else:
+                rect.top = (ty + 1) * t
+            return True
+        if f & PARTIAL:
+            return self._push_shapes(rect, i0, i1, 0, dy)
+        return False
+
+    def solid_rects(self):
+        """Runs of solid or partly solid tiles as (x, y, w, h) world rects, one row at a time."""
+        t, cols, flags = self.tile, self.cols, self.flags
+        blocked = SOLID | PARTIAL
+        rects = []
+        for ty in range(self.rows):
+            row = ty * cols
+            tx = 0
+            while tx < cols:
+                if flags[row + tx] & blocked:
+                    start = tx
+                    while tx < cols and flags[row + tx] & blocked:
+                        tx += 1
+                    rects.append((start * t, ty * t, (tx - start) * t, t))
+                else:
+                    tx += 1
+        return rects
@@ -0,0 +1,194 @@
+# timeline.py
+# Pixel Adventures — Keyframe timeline engine for cinematics.
+#
+# A Timeline is a list of shots laid end to end, a set of named tracks and a
+# set of emitters:
+#   * Tracks are piecewise curves over absolute time (camera, zoom, fades,
+#     actor positions ...). They are pre-sampled once into lookup tables, so
+#     reading a value during playback is an index, not an easing evaluation.
+#   * Emitters spawn simulated things (particles, flames) on fixed ticks.
+#     Each tick draws from its own RNG seeded by (emitter seed, tick), so the
+#     state at any moment only depends on the last `horizon` seconds of
+#     ticks. Seeking replays that window and nothing before it.
+
+import math
+import random
+from array import array
+
+LUT_RATE = 240  # track samples per second
+
+
+def linear(p):
+    return p
+
+
+def smooth(p):
+    # smoothstep-ish easing for camera moves
+    return p * p * (3 - 2 * p)
+
+
+def ramp(v0, v1, ease=linear, as_int=False):
+    """Segment function easing from `v0` to `v1` over the segment."""
+    def f(u, dur):
+        p = ease(max(0.0, min(1.0, u / dur))) if dur > 0 else 1.0
+        v = v0 + (v1 - v0) * p
+        return int(v) if as_int else v
+    return f
+
+
+def const(v):
+    return lambda u, dur: v
+
+
+class Shot:
+    __slots__ = ("name", "start", "duration", "index")
+
+    def __init__(self, name, start, duration, index):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.index = index
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+
+class Track:
+    """Piecewise curve over absolute time, baked to a lookup table.
+
+    Segments are ``(t0, t1, f)`` where ``f(u, t1 - t0)`` gives the value `u`
+    seconds into the segment. Outside every segment the track reads
+    `default`.
+    """
+
+    def __init__(self, name, default=0.0):
+        self.name = name
+        self.default = default
+        self.segments = []
+        self.lut = None
+        self.rate = LUT_RATE
+
+    def add(self, t0, t1, f):
+        self.segments.append((t0, t1, f))
+        return self
+
+    def evaluate(self, t):
+        """Exact (un-baked) value at `t`; later segments win on overlap."""
+        for t0, t1, f in reversed(self.segments):
+            if t0 <= t < t1:
+                return f(t - t0, t1 - t0)
+        return self.default
+
+    def bake(self, duration, rate=LUT_RATE):
+        self.rate = rate
+        n = int(math.ceil(duration * rate)) + 1
+        self.lut = array("d", (self.evaluate(i / rate) for i in range(n)))
+
+    def __call__(self, t):
+        i = int(t * self.rate + 1e-9)
+        lut = self.lut
+        if i < 0:
+            i = 0
+        elif i >= len(lut):
+            i = len(lut) - 1
+        return lut[i]
+
+
+class Emitter:
+    """Fixed-tick spawner active on ``[start, end)`` seconds.
+
+    `spawn(rng, k, t)` is called once per active tick with that tick's RNG.
+    `horizon` is how long (seconds) anything it spawns can influence later
+    state; the Timeline replays at least that much on seek. Emitters that keep
+    private state (e.g. live flames) provide `reset`.
+    """
+
+    def __init__(self, name, start, end, seed, spawn, horizon, reset=None, fps=60):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.k0 = int(round(start * fps))
+        self.k1 = int(round(end * fps))
+        self.seed = seed
+        self.spawn = spawn
+        self.horizon = horizon
+        self._reset = reset
+
+    def reset(self):
+        if self._reset:
+            self._reset()
+
+    def rng(self, k):
+        return random.Random(self.seed * 1000003 + k)
+
+
+class Timeline:
+    def __init__(self, fps):
+        self.fps = fps
+        self.shots = []
+        self.tracks = {}
+        self.emitters = []
+        self.duration = 0.0
+
+    # ── building ──────────────────────────────────────────────────────────
+    def shot(self, name, duration):
+        s = Shot(name, self.duration, duration, len(self.shots))
+        self.shots.append(s)
+        self.duration += duration
+        return s
+
+    def track(self, name, default=0.0):
+        if name not in self.tracks:
+            self.tracks[name] = Track(name, default)
+        return self.tracks[name]
+
+    def emitter(self, name, start, end, seed, spawn, horizon, reset=None):
+        e = Emitter(name, start, end, seed, spawn, horizon, reset, self.fps)
+        self.emitters.append(e)
+        return e
+
+    def bake(self):
+        for tr in self.tracks.values():
+            tr.bake(self.duration)
+        return self
+
+    # ── queries ───────────────────────────────────────────────────────────
+    def __getitem__(self, name):
+        return self.tracks[name]
+
+    def shot_at(self, t):
+        for s in self.shots:
+            if t < s.end:
+                return s
+        return self.shots[-1]
+
+    def shot_named(self, name):
+        for s in self.shots:
+            if s.name == name:
+                return s
+        raise KeyError(name)
+
+    def tick_at(self, t):
+        return int(t * self.fps + 1e-9)
+
+    @property
+    def horizon_ticks(self):
+        h = max((e.horizon for e in self.emitters), default=0.0)
+        return int(math.ceil(h * self.fps)) + 1
+
+    def run_ticks(self, k0, k1, step):
+        """Fire emitters for ticks ``k0 .. k1 - 1``; `step(k)` runs after each."""
+        fps = self.fps
+        for k in range(k0, k1):
+            t = k / fps
+            for e in self.emitters:
+                if e.k0 <= k < e.k1:
+                    e.spawn(e.rng(k), k, t)
+            step(k)
+
+    def replay_to(self, k, step):
+        """Reset emitters and rebuild their state up to (and including) tick `k`."""
+        for e in self.emitters:
+            e.reset()
+        self.run_ticks(max(0, k - self.horizon_ticks), k + 1, step)
@@ -3,8 +3,11 @@
 # Drawn at low "virtual" resolution and scaled to fill the screen.
 
 import math
-import random
 import pygame
+import ambient
+import memstats
+import presenter
+import quality
 
 VIRTUAL_SIZE = (1024, 576)   # internal pixel canvas (virtual)
 TITLE        = "Pixel Adventures"
@@ -18,42 +21,21 @@ def _make_text(text, size, color, shadow=True):
         out = pygame.Surface((surf.get_width()+1, surf.get_height()+1), pygame.SRCALPHA)
         out.blit(sh, (1, 1))
         out.blit(surf, (0, 0))
-        return out
-    return surf
+        return memstats.track(out, tag="text")
+    return memstats.track(surf, tag="text")
+
+class Starfield(ambient.AmbientField):
+    # parallax: slow, medium, fast layers
+    LAYERS = [(12, 0.35, (120,120,120)), (24, 0.45, (190,190,190)), (40, 0.20, (255,255,255))]
 
-class Starfield:
     def __init__(self, w, h, count=60):
-        self.w, self.h = w, h
-        # parallax: slow, medium, fast layers
-        self.layers = []
-        for speed, density, color in [(12, 0.35, (120,120,120)), (24, 0.45, (190,190,190)), (40, 0.20, (255,255,255))]:
-            n = max(1, int(count * density))
-            stars = [{
-                "x": random.randrange(0, w),
-                "y": random.randrange(0, h),
-                "spd": speed,
-                "col": color
-            } for _ in range(n)]
-            self.layers.append(stars)
-
-    def update(self, dt):
-        for stars in self.layers:
-            for s in stars:
-                s["y"] += s["spd"] * dt
-                if s["y"] >= self.h:
-                    s["y"] = -1
-                    s["x"] = random.randrange(0, self.w)
-
-    def draw(self, surf):
-        for stars in self.layers:
-            for s in stars:
-                surf.set_at((int(s["x"]), int(s["y"])), s["col"])
-
-def run(screen, clock, virtual_size=VIRTUAL_SIZE):
-    vw, vh = virtual_size
-    game_surf = pygame.Surface(virtual_size)  # low-res canvas
-    starfield = Starfield(vw, vh)
-    t = 0.0
+        super().__init__(w, h, self.LAYERS, count)
+
+def load(virtual_size=VIRTUAL_SIZE):
+    """Build the title screen's reusable resources."""
+    vw, vh = virtual_size
+    game_surf = memstats.track(pygame.Surface(virtual_size), tag="canvas")  # low-res canvas
+    starfield = Starfield(vw, vh, count=quality.get("stars"))
 
     title = _make_text(TITLE, 24, (255, 230, 120))
     subtitle = _make_text("Press [Z] or [ENTER] to start", 12, (240, 240, 240))
@@ -62,13 +44,34 @@ def run(screen, clock, virtual_size=VIRTUAL_SIZE):
     # simple bobbing "hero" placeholder (8x8)
     hero_frames = []
     for c in [(90,200,255), (70,170,235)]:
-        f = pygame.Surface((8, 8), pygame.SRCALPHA)
+        f = memstats.track(pygame.Surface((8, 8), pygame.SRCALPHA), tag="hero")
         f.fill((0,0,0,0))
         pygame.draw.rect(f, (30, 30, 70), (0, 0, 8, 8))  # border
         pygame.draw.rect(f, c, (1, 1, 6, 6))             # body
         pygame.draw.rect(f, (255,255,255), (3, 2, 2, 2)) # "eyes"
         hero_frames.append(f)
 
+    return {
+        "canvas": game_surf,
+        "starfield": starfield,
+        "title": title,
+        "subtitle": subtitle,
+        "exit_hint": exit_hint,
+        "hero_frames": hero_frames,
+    }
+
+def run(screen, clock, virtual_size=VIRTUAL_SIZE, assets=None):
+    vw, vh = virtual_size
+    if assets is None:
+        assets = load(virtual_size)
+    game_surf = assets["canvas"]
+    starfield = assets["starfield"]
+    title = assets["title"]
+    subtitle = assets["subtitle"]
+    exit_hint = assets["exit_hint"]
+    hero_frames = assets["hero_frames"]
+    t = 0.0
+
     frame_idx = 0
     frame_accum = 0.0
 
@@ -82,6 +85,8 @@ def run(screen, clock, virtual_size=VIRTUAL_SIZE):
 
         # --- input ------------------------------------------------------------
         for e in pygame.event.get():
+            if presenter.handle_event(e):
+                continue
             if e.type == pygame.QUIT:
                 return "quit"
             if e.type == pygame.KEYDOWN:
@@ -125,5 +130,4 @@ def run(screen, clock, virtual_size=VIRTUAL_SIZE):
         game_surf.blit(exit_hint, (ex, vh - 18))
 
         # --- scale to window --------------------------------------------------
-        pygame.transform.scale(game_surf, screen.get_size(), screen)
-        pygame.display.flip()
+        presenter.present(screen, game_surf)
@@ -0,0 +1,40 @@
+# userdirs.py
+# Pixel Adventures — Per-user directories for files the game writes.
+#
+# Saves and caches belong to the user running the game, not to the source
+# tree, which may be read-only, shared between accounts or under version
+# control. data_dir() holds saves, cache_dir() files the game can rebuild
+# (baked cinematics, the quality calibration):
+#   Windows  %APPDATA%\PixelAdventures, %LOCALAPPDATA%\PixelAdventures\Cache
+#   macOS    ~/Library/Application Support/PixelAdventures,
+#            ~/Library/Caches/PixelAdventures
+#   others   $XDG_DATA_HOME/pixel-adventures (default ~/.local/share),
+#            $XDG_CACHE_HOME/pixel-adventures (default ~/.cache)
+# The directories are created by whoever first writes into them.
+
+import os
+import sys
+
+APP = "PixelAdventures"
+
+
+def data_dir():
+    """Directory for the user's own files (saves)."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, APP)
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), APP)
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "pixel-adventures")
+
+
+def cache_dir():
+    """Directory for files the game can always rebuild."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, APP, "Cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Caches"), APP)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "pixel-adventures")